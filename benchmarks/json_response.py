@@ -0,0 +1,113 @@
+"""JSON 响应序列化基准测试
+
+按接口对比三种序列化路径的耗时，每个接口使用与滴答清单真实响应结构一致的模拟数据：
+- 默认：jsonable_encoder + JSONResponse（json.dumps）
+- orjson响应类：jsonable_encoder + FastJSONResponse
+- FastJSONRoute：没有响应模型的路由跳过 jsonable_encoder，直接用 orjson 序列化返回值
+
+用法:
+    python benchmarks/json_response.py --repeat 20
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from pydantic import BaseModel  # noqa: E402
+
+from benchmarks.task_memory import make_task  # noqa: E402
+from core.responses import FastJSONResponse, orjson  # noqa: E402
+from models import ApiResponse, UserSession  # noqa: E402
+
+PROJECT_IDS = [f"project{i:04d}" for i in range(50)]
+TAGS = [f"标签{i}" for i in range(30)]
+
+
+def focus_record(index: int) -> Dict[str, Any]:
+    """模拟 /pomodoros/timeline 中的一条专注记录"""
+    return {
+        "id": f"{index:024x}",
+        "type": 0,
+        "startTime": "2024-06-01T01:00:00.000+0000",
+        "endTime": "2024-06-01T01:25:00.000+0000",
+        "status": 1,
+        "pauseDuration": 30,
+        "note": "",
+        "tasks": [{
+            "taskId": f"{index:024x}",
+            "title": f"任务 {index}",
+            "projectName": "工作",
+            "startTime": "2024-06-01T01:00:00.000+0000",
+            "endTime": "2024-06-01T01:25:00.000+0000",
+        }],
+    }
+
+
+def build_payloads() -> Dict[str, Callable[[], Any]]:
+    """各接口的响应数据（返回值与路由函数的返回值一致）"""
+    tasks = [make_task(i, PROJECT_IDS, TAGS) for i in range(5000)]
+    completed = [make_task(i, PROJECT_IDS, TAGS) for i in range(50)]
+    timeline = [focus_record(i) for i in range(100)]
+    heatmap = [{"day": f"2024{m:02d}{d:02d}", "duration": d * 25} for m in range(1, 13) for d in range(1, 29)]
+    return {
+        "/tasks/all (5000 任务，解码后)": lambda: {"checkPoint": 1, "syncTaskBean": {"update": tasks}},
+        "/tasks/completed (50 任务)": lambda: completed,
+        "/pomodoros/timeline (100 记录)": lambda: timeline,
+        "/pomodoros/statistics/heatmap (1年)": lambda: heatmap,
+        "/tasks/summary (ApiResponse)": lambda: ApiResponse(
+            code=200, message="获取任务统计成功",
+            data={"total_tasks": 5000, "completed_tasks": 1700, "pending_tasks": 3300, "completion_rate": 34.0},
+        ),
+        "/auth/session (UserSession)": lambda: UserSession(session_id="s", token="t", csrf_token="c"),
+    }
+
+
+def measure(render: Callable[[Any], bytes], content: Any, repeat: int) -> float:
+    """返回单次序列化的平均耗时（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render(content)
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def route_render(content: Any) -> bytes:
+    """FastJSONRoute 的序列化路径：响应模型由 pydantic 序列化，其余直接交给 orjson"""
+    if isinstance(content, BaseModel):
+        return FastJSONResponse(content.model_dump(mode="json")).body
+    return FastJSONResponse(content).body
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="每个接口重复次数")
+    args = parser.parse_args()
+
+    if orjson is None:
+        print("未安装 orjson，无法对比（pip install \"didaapi[fast]\"）")
+        return
+
+    renders = {
+        "默认": lambda content: JSONResponse(jsonable_encoder(content)).body,
+        "orjson响应类": lambda content: FastJSONResponse(jsonable_encoder(content)).body,
+        "FastJSONRoute": route_render,
+    }
+
+    print(f"{'接口':<40}" + "".join(f"{name + '(ms)':>20}" for name in renders) + f"{'加速':>10}")
+    for name, payload in build_payloads().items():
+        content = payload()
+        # 各序列化路径的输出必须一致
+        outputs = [orjson.loads(render(content)) for render in renders.values()]
+        assert all(output == outputs[0] for output in outputs), name
+
+        timings = [measure(render, content, args.repeat) for render in renders.values()]
+        print(f"{name:<40}" + "".join(f"{ms:>20.3f}" for ms in timings) + f"{timings[0] / timings[-1]:>9.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""重复值共享内存基准测试
+
+对比任务存储（CompactTask）和导出流水线（展平后的行字典 + DataFrame）在
+不共享 / 使用 ValuePool 共享项目ID、时区、标签等重复值时的峰值RSS和常驻内存。
+每种形式在独立子进程中运行，避免互相影响。
+
+用法:
+    python benchmarks/string_interning.py --tasks 200000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.task_memory import CHUNK_SIZE, current_rss_mb, peak_rss_mb, write_payload  # noqa: E402
+
+MODES = ("store", "store_pooled", "export", "export_pooled")
+
+
+def run_mode(mode: str, path: Path) -> dict:
+    """在当前进程中按指定形式加载任务并返回内存指标"""
+    import pandas as pd
+
+    from models import CompactTask
+    from utils import JsonArrayStream, ValuePool
+
+    flatten = None
+    if mode.startswith("export"):
+        from services.export_service import ExportService
+        flatten = ExportService()._flatten_task
+
+    gc.collect()
+    baseline = current_rss_mb()
+    started = time.perf_counter()
+    pool = ValuePool() if mode.endswith("pooled") else None
+
+    async def chunks():
+        with open(path, "rb") as f:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+
+    async def load():
+        stream = JsonArrayStream(chunks(), ("syncTaskBean", "update"))
+        if flatten is None:
+            return [CompactTask.from_dict(task, pool) async for task in stream]
+        rows = [flatten(task, {}, pool) async for task in stream]
+        return pd.DataFrame(rows)
+
+    result = asyncio.run(load())
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return {
+        "mode": mode,
+        "tasks": len(result),
+        "seconds": round(elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "retained_mb": round(current_rss_mb() - baseline, 1),
+        "shared_values": len(pool) if pool is not None else 0,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=200_000, help="任务数量")
+    parser.add_argument("--mode", choices=MODES, help="只运行一种形式（由父进程调用）")
+    parser.add_argument("--payload", help="响应文件路径（由父进程调用）")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, Path(args.payload))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "batch_check.json"
+        write_payload(path, args.tasks)
+        print(f"任务数: {args.tasks}，响应大小: {path.stat().st_size / 1024 / 1024:.1f} MB")
+        print(f"{'形式':<16}{'耗时(秒)':>10}{'峰值RSS(MB)':>14}{'常驻增量(MB)':>14}{'共享值':>10}")
+        for mode in MODES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--payload", str(path)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<16}{result['seconds']:>10}{result['peak_rss_mb']:>14}"
+                  f"{result['retained_mb']:>14}{result['shared_values']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+"""任务内存占用基准测试
+
+对比 /batch/check/0 响应中的任务以原始字典和 CompactTask 两种形式常驻内存时的峰值RSS。
+每种形式在独立子进程中运行，避免互相影响。
+
+用法:
+    python benchmarks/task_memory.py --tasks 100000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+CHUNK_SIZE = 64 * 1024
+
+
+def make_task(index: int, project_ids: list, tags: list) -> dict:
+    """生成一个字段与滴答清单接口一致（约45个键）的任务"""
+    task_id = f"{index:024x}"
+    return {
+        "id": task_id,
+        "projectId": random.choice(project_ids),
+        "sortOrder": -index * 1099511627776,
+        "title": f"任务 {index} - 整理第 {index % 97} 周的会议纪要",
+        "content": "需要确认的事项：\n1. 预算\n2. 排期" if index % 3 == 0 else "",
+        "desc": "",
+        "timeZone": "Asia/Shanghai",
+        "isFloating": False,
+        "isAllDay": index % 2 == 0,
+        "reminder": "",
+        "reminders": [{"id": f"r{index}", "trigger": "TRIGGER:PT0S"}] if index % 5 == 0 else [],
+        "exDate": [],
+        "repeatTaskId": task_id if index % 11 == 0 else None,
+        "repeatFlag": "RRULE:FREQ=WEEKLY;INTERVAL=1" if index % 11 == 0 else "",
+        "repeatFrom": "2" if index % 11 == 0 else None,
+        "repeatFirstDate": "2024-01-01T00:00:00.000+0000" if index % 11 == 0 else None,
+        "priority": random.choice([0, 0, 1, 3, 5]),
+        "status": random.choice([0, 0, 2]),
+        "progress": 0,
+        "deleted": 0,
+        "startDate": "2024-06-01T01:00:00.000+0000",
+        "dueDate": "2024-06-02T01:00:00.000+0000",
+        "pinnedTime": None,
+        "completedTime": None,
+        "completedUserId": None,
+        "createdTime": "2024-05-20T08:30:00.000+0000",
+        "modifiedTime": "2024-05-21T09:15:00.000+0000",
+        "etag": f"{index:08x}",
+        "creator": 123456789,
+        "deletedBy": 0,
+        "deletedTime": 0,
+        "tags": random.sample(tags, k=index % 3),
+        "items": [],
+        "attachments": [],
+        "commentCount": 0,
+        "columnId": f"col{index % 4}",
+        "kind": "TEXT",
+        "imgMode": 0,
+        "parentId": f"{index - 1:024x}" if index % 7 == 1 else None,
+        "childIds": [f"{index + 1:024x}"] if index % 7 == 0 else [],
+        "pomodoroSummaries": [],
+        "focusSummaries": [],
+        "isDirty": False,
+        "local": False,
+        "annoyingAlert": 0,
+        "assignee": None,
+    }
+
+
+def write_payload(path: Path, count: int) -> None:
+    """生成 /batch/check/0 格式的响应文件"""
+    random.seed(42)
+    project_ids = [f"project{i:04d}" for i in range(50)]
+    tags = [f"标签{i}" for i in range(30)]
+    tasks = [make_task(i, project_ids, tags) for i in range(count)]
+    payload = {
+        "checkPoint": int(time.time() * 1000),
+        "syncTaskBean": {"update": tasks, "delete": [], "add": [], "empty": False},
+        "projectProfiles": [{"id": pid, "name": f"清单{pid[-4:]}"} for pid in project_ids],
+        "tags": [{"name": tag} for tag in tags],
+    }
+    path.write_text(json.dumps(payload, ensure_ascii=False), encoding="utf-8")
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+
+
+def peak_rss_mb() -> float:
+    # 使用 VmHWM 而不是 getrusage：ru_maxrss 会继承 fork 时父进程的峰值
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def run_mode(mode: str, path: Path) -> dict:
+    """在当前进程中以指定形式加载任务并返回内存指标"""
+    from models import CompactTask
+    from utils import JsonArrayStream
+
+    gc.collect()
+    baseline = current_rss_mb()
+    started = time.perf_counter()
+
+    if mode == "raw":
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        tasks = data["syncTaskBean"]["update"]
+    else:
+        async def chunks():
+            with open(path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    yield chunk
+
+        async def load():
+            stream = JsonArrayStream(chunks(), ("syncTaskBean", "update"))
+            return [CompactTask.from_dict(task) async for task in stream]
+
+        tasks = asyncio.run(load())
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    return {
+        "mode": mode,
+        "tasks": len(tasks),
+        "seconds": round(elapsed, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "retained_mb": round(current_rss_mb() - baseline, 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tasks", type=int, default=100_000, help="任务数量")
+    parser.add_argument("--mode", choices=["raw", "compact"], help="只运行一种形式（由父进程调用）")
+    parser.add_argument("--payload", help="响应文件路径（由父进程调用）")
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run_mode(args.mode, Path(args.payload))))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "batch_check.json"
+        write_payload(path, args.tasks)
+        print(f"任务数: {args.tasks}，响应大小: {path.stat().st_size / 1024 / 1024:.1f} MB")
+        print(f"{'形式':<10}{'耗时(秒)':>10}{'峰值RSS(MB)':>14}{'常驻增量(MB)':>14}")
+        for mode in ("raw", "compact"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--mode", mode, "--payload", str(path)],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            print(f"{mode:<10}{result['seconds']:>10}{result['peak_rss_mb']:>14}{result['retained_mb']:>14}")
+
+
+if __name__ == "__main__":
+    main()
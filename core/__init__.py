@@ -1,6 +1,7 @@
 # 核心模块
 from .config import config
 from .database import db
+from .cache import response_cache
 from . import urls
 
-__all__ = ['config', 'db', 'urls']
+__all__ = ['config', 'db', 'response_cache', 'urls']
@@ -0,0 +1,341 @@
+"""响应缓存模块
+
+为各服务提供进程内的 TTL 缓存，用于缓存滴答清单上游接口的响应。
+- 按键保存响应数据及过期时间，超出容量时按最近最少使用（LRU）淘汰
+- 同一个键的并发加载会合并为一次上游请求，避免重复请求
+- 支持 stale-while-revalidate：软过期后先返回旧数据，再在后台刷新
+- 可选的磁盘持久化：定期把新写入的缓存刷到 SQLite，启动时重新加载
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Dict, Optional, Set, Tuple
+
+from core.cache_store import CacheStore
+from core.config import config
+from utils import app_logger
+
+
+def session_scope(auth_token: str) -> str:
+    """
+    根据认证令牌生成缓存命名空间，避免在缓存键中保存原始令牌
+
+    Args:
+        auth_token: 认证令牌
+
+    Returns:
+        str: 16位十六进制摘要
+    """
+    return hashlib.sha256((auth_token or "").encode("utf-8")).hexdigest()[:16]
+
+
+def is_error_result(value: Any) -> bool:
+    """判断服务返回值是否为错误结果（错误结果不写入缓存）"""
+    return value is None or (isinstance(value, dict) and "error" in value)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """等待者都已取消时由回调取走加载异常，避免 "Task exception was never retrieved" 警告"""
+    if not task.cancelled():
+        task.exception()
+
+
+class ResponseCache:
+    """进程内的 TTL + LRU 响应缓存"""
+
+    def __init__(self, max_entries: int = 2048, store: Optional[CacheStore] = None,
+                 flush_interval: float = 30.0):
+        self.max_entries = max_entries
+        self.store = store
+        self.flush_interval = flush_interval
+        # key -> (写入时间戳, 过期时间戳, 数据)
+        self._entries: "OrderedDict[str, Tuple[float, float, Any]]" = OrderedDict()
+        self._lock = Lock()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        self._hits = 0
+        self._misses = 0
+        # 等待写入磁盘的键、已删除的键和被访问过的键
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._touched: Set[str] = set()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    def _lookup(self, key: str) -> Optional[Tuple[float, Any]]:
+        """查找未过期的缓存条目，返回 (缓存年龄, 数据)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._misses += 1
+                return None
+
+            stored_at, expires_at, value = entry
+            now = time.time()
+            if expires_at <= now:
+                del self._entries[key]
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self._touched.add(key)
+            self._hits += 1
+            return now - stored_at, value
+
+    def get(self, key: str) -> Optional[Any]:
+        """获取未过期的缓存数据，不存在或已过期时返回 None"""
+        entry = self._lookup(key)
+        return entry[1] if entry else None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        """写入缓存数据"""
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            now = time.time()
+            self._entries[key] = (now, now + ttl, value)
+            self._entries.move_to_end(key)
+            self._dirty.add(key)
+            self._deleted.discard(key)
+            while len(self._entries) > self.max_entries:
+                evicted_key, _ = self._entries.popitem(last=False)
+                self._dirty.discard(evicted_key)
+
+    def invalidate(self, prefix: str = "") -> int:
+        """
+        删除指定前缀的缓存数据
+
+        Args:
+            prefix: 缓存键前缀，为空时清空全部缓存
+
+        Returns:
+            int: 删除的条目数
+        """
+        with self._lock:
+            keys = [key for key in self._entries if key.startswith(prefix)]
+            for key in keys:
+                del self._entries[key]
+                self._dirty.discard(key)
+                self._deleted.add(key)
+            return len(keys)
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        """
+        读取缓存，未命中时调用 loader 加载并写入缓存
+
+        同一个键的并发请求只会触发一次 loader 调用；错误结果不会被缓存。
+
+        Args:
+            key: 缓存键
+            loader: 无参数的异步加载函数
+            ttl: 缓存有效期（秒）
+
+        Returns:
+            Any: 缓存数据或 loader 的返回值
+        """
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+        return await self._load(key, loader, ttl)
+
+    async def get_or_revalidate(
+        self,
+        key: str,
+        loader: Callable[[], Awaitable[Any]],
+        soft_ttl: float,
+        hard_ttl: float,
+        bypass: bool = False,
+    ) -> Any:
+        """
+        按 stale-while-revalidate 语义读取缓存
+
+        - 缓存年龄小于 soft_ttl：直接返回缓存
+        - 缓存年龄介于 soft_ttl 与 hard_ttl 之间：立即返回缓存，并在后台刷新
+        - 没有缓存、超过 hard_ttl 或 bypass=True：同步调用 loader 加载
+
+        Args:
+            key: 缓存键
+            loader: 无参数的异步加载函数
+            soft_ttl: 软过期时间（秒），超过后触发后台刷新
+            hard_ttl: 硬过期时间（秒），超过后不再返回旧数据
+            bypass: 是否跳过缓存直接加载
+
+        Returns:
+            Any: 缓存数据或 loader 的返回值
+        """
+        if not bypass:
+            entry = self._lookup(key)
+            if entry is not None:
+                age, value = entry
+                if age >= soft_ttl:
+                    self._schedule_refresh(key, loader, hard_ttl)
+                return value
+
+        return await self._load(key, loader, hard_ttl)
+
+    def _schedule_refresh(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> None:
+        """在后台刷新缓存，同一个键同时只会有一个刷新任务"""
+        if key in self._inflight:
+            return
+
+        async def refresh() -> None:
+            try:
+                await self._load(key, loader, ttl)
+                app_logger.debug(f"后台刷新缓存完成: {key}")
+            except Exception as e:
+                app_logger.warning(f"后台刷新缓存失败: {key}, {e}")
+
+        task = asyncio.create_task(refresh())
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def _load(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        """
+        调用 loader 加载数据并写入缓存，同一个键的并发加载只执行一次
+
+        加载在独立的任务中进行，调用方被取消时只是停止等待，其他等待者仍然拿到结果并写入缓存。
+        """
+        inflight = self._inflight.get(key)
+        if inflight is None:
+            inflight = asyncio.create_task(self._run_loader(key, loader, ttl))
+            # 避免没有等待者时出现 "exception was never retrieved" 警告
+            inflight.add_done_callback(_retrieve_exception)
+            self._inflight[key] = inflight
+        return await asyncio.shield(inflight)
+
+    async def _run_loader(self, key: str, loader: Callable[[], Awaitable[Any]], ttl: float) -> Any:
+        try:
+            value = await loader()
+            if not is_error_result(value):
+                self.set(key, value, ttl)
+            return value
+        except Exception as e:
+            app_logger.error(f"加载缓存数据失败: {key}, {e}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    # ================================
+    # 磁盘持久化
+    # ================================
+
+    def load_persisted(self) -> int:
+        """
+        从磁盘存储加载未过期的缓存条目
+
+        Returns:
+            int: 加载的条目数
+        """
+        if self.store is None:
+            return 0
+
+        entries = self.store.load_entries()
+        with self._lock:
+            # 存储按最近访问时间升序返回，依次插入后最近访问的条目位于 LRU 队尾
+            for key, stored_at, expires_at, value in entries[-self.max_entries:]:
+                self._entries[key] = (stored_at, expires_at, value)
+                self._entries.move_to_end(key)
+        return min(len(entries), self.max_entries)
+
+    def flush(self) -> int:
+        """
+        把新写入、删除和访问过的缓存同步到磁盘存储，并执行容量淘汰
+
+        Returns:
+            int: 写入磁盘的条目数
+        """
+        if self.store is None:
+            return 0
+
+        with self._lock:
+            dirty = [(key, *self._entries[key]) for key in self._dirty if key in self._entries]
+            deleted = list(self._deleted)
+            touched = [key for key in self._touched if key in self._entries and key not in self._dirty]
+            self._dirty.clear()
+            self._deleted.clear()
+            self._touched.clear()
+
+        if deleted:
+            self.store.delete(deleted)
+        saved = self.store.save_entries(dirty) if dirty else 0
+        if touched:
+            self.store.touch(touched)
+        if dirty or deleted:
+            self.store.evict()
+        return saved
+
+    async def start_persistence(self) -> int:
+        """
+        加载磁盘缓存并启动定期刷盘任务
+
+        Returns:
+            int: 从磁盘加载的条目数
+        """
+        if self.store is None:
+            return 0
+
+        loaded = await asyncio.to_thread(self.load_persisted)
+
+        async def flush_loop() -> None:
+            while True:
+                await asyncio.sleep(self.flush_interval)
+                try:
+                    await asyncio.to_thread(self.flush)
+                except Exception as e:
+                    app_logger.error(f"缓存刷盘失败: {e}")
+
+        self._flush_task = asyncio.create_task(flush_loop())
+        return loaded
+
+    async def stop_persistence(self) -> None:
+        """停止定期刷盘任务并把剩余缓存写入磁盘"""
+        if self.store is None:
+            return
+
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取缓存统计信息"""
+        with self._lock:
+            total = self._hits + self._misses
+            stats = {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": round(self._hits / total * 100, 2) if total else 0,
+            }
+        if self.store is not None:
+            stats["disk"] = self.store.stats()
+        return stats
+
+
+def _create_response_cache() -> ResponseCache:
+    """根据配置创建响应缓存实例"""
+    cache_config = config.get('cache', {})
+    store = None
+    if cache_config.get('persist', True):
+        store = CacheStore(
+            db_path=cache_config.get('persist_path', 'output/databases/response_cache.db'),
+            max_bytes=cache_config.get('persist_max_mb', 64) * 1024 * 1024,
+            compress_level=cache_config.get('compress_level', 6),
+        )
+    return ResponseCache(
+        max_entries=cache_config.get('max_entries', 2048),
+        store=store,
+        flush_interval=cache_config.get('flush_interval', 30),
+    )
+
+
+# 全局响应缓存实例
+response_cache = _create_response_cache()
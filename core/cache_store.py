@@ -0,0 +1,258 @@
+"""响应缓存持久化存储模块
+
+将响应缓存以压缩后的二进制块保存到 SQLite 数据库中，服务重启后可以重新加载，
+避免冷启动时集中请求滴答清单上游接口。
+- 缓存数据按内容哈希（SHA-256）去重，多个键引用相同内容时只保存一份
+- 数据使用 zlib 压缩保存
+- 总大小超过上限时按最近访问时间（LRU）淘汰
+"""
+import hashlib
+import json
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterable, List, Optional, Tuple
+
+from core.payload import UpstreamPayload
+from utils import app_logger
+
+# 原始响应数据块的前缀标记，普通 JSON 数据不会以 0 字节开头
+_PAYLOAD_MARKER = b"\x00"
+
+
+class CacheStore:
+    """基于 SQLite 的响应缓存持久化存储类"""
+
+    def __init__(self, db_path: str = "output/databases/response_cache.db",
+                 max_bytes: int = 64 * 1024 * 1024, compress_level: int = 6):
+        self.db_path = Path(db_path)
+        self.max_bytes = max_bytes
+        self.compress_level = compress_level
+        # 确保数据库目录存在
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """获取数据库连接"""
+        return sqlite3.connect(self.db_path)
+
+    def init_database(self) -> None:
+        """初始化缓存表"""
+        with self.get_connection() as conn:
+            # 按内容哈希去重的数据块表
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_blobs (
+                    hash TEXT PRIMARY KEY,
+                    data BLOB NOT NULL,  -- zlib压缩后的JSON数据
+                    size INTEGER NOT NULL
+                )
+            """)
+
+            # 缓存键表，引用数据块
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    key TEXT PRIMARY KEY,
+                    blob_hash TEXT NOT NULL,
+                    stored_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_cache_entries_last_access ON cache_entries(last_access)"
+            )
+            conn.commit()
+
+    def encode(self, value: Any) -> Optional[Tuple[str, bytes]]:
+        """
+        序列化并压缩缓存数据
+
+        Returns:
+            Optional[Tuple[str, bytes]]: (内容哈希, 压缩数据)，无法序列化时返回 None
+        """
+        if isinstance(value, UpstreamPayload):
+            # 原始响应按 "标记 + 内容类型 + 0字节 + 原始数据" 保存，不经过 JSON 序列化
+            raw = _PAYLOAD_MARKER + value.content_type.encode('utf-8') + b"\x00" + value.content
+        else:
+            try:
+                raw = json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            except (TypeError, ValueError):
+                return None
+        return hashlib.sha256(raw).hexdigest(), zlib.compress(raw, self.compress_level)
+
+    def decode(self, data: bytes) -> Any:
+        """解压并反序列化缓存数据"""
+        raw = zlib.decompress(data)
+        if raw.startswith(_PAYLOAD_MARKER):
+            content_type, _, content = raw[1:].partition(b"\x00")
+            return UpstreamPayload(content, content_type.decode('utf-8'))
+        return json.loads(raw.decode('utf-8'))
+
+    def save_entries(self, entries: Iterable[Tuple[str, float, float, Any]]) -> int:
+        """
+        保存缓存条目
+
+        Args:
+            entries: (缓存键, 写入时间戳, 过期时间戳, 数据) 列表
+
+        Returns:
+            int: 成功保存的条目数
+        """
+        now = time.time()
+        saved = 0
+        try:
+            with self.get_connection() as conn:
+                for key, stored_at, expires_at, value in entries:
+                    encoded = self.encode(value)
+                    if encoded is None:
+                        continue
+                    blob_hash, data = encoded
+                    conn.execute(
+                        "INSERT OR IGNORE INTO cache_blobs (hash, data, size) VALUES (?, ?, ?)",
+                        (blob_hash, data, len(data))
+                    )
+                    conn.execute("""
+                        INSERT OR REPLACE INTO cache_entries
+                        (key, blob_hash, stored_at, expires_at, last_access)
+                        VALUES (?, ?, ?, ?, ?)
+                    """, (key, blob_hash, stored_at, expires_at, now))
+                    saved += 1
+                conn.commit()
+        except Exception as e:
+            app_logger.error(f"保存缓存条目失败: {e}")
+        return saved
+
+    def touch(self, keys: Iterable[str]) -> None:
+        """更新缓存条目的最近访问时间"""
+        now = time.time()
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    "UPDATE cache_entries SET last_access = ? WHERE key = ?",
+                    [(now, key) for key in keys]
+                )
+                conn.commit()
+        except Exception as e:
+            app_logger.error(f"更新缓存访问时间失败: {e}")
+
+    def delete(self, keys: Iterable[str]) -> None:
+        """删除缓存条目"""
+        try:
+            with self.get_connection() as conn:
+                conn.executemany("DELETE FROM cache_entries WHERE key = ?", [(key,) for key in keys])
+                conn.commit()
+        except Exception as e:
+            app_logger.error(f"删除缓存条目失败: {e}")
+
+    def load_entries(self) -> List[Tuple[str, float, float, Any]]:
+        """
+        加载所有未过期的缓存条目
+
+        Returns:
+            List[Tuple[str, float, float, Any]]: 按最近访问时间升序排列的
+            (缓存键, 写入时间戳, 过期时间戳, 数据) 列表
+        """
+        entries = []
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute("""
+                    SELECT e.key, e.stored_at, e.expires_at, b.data
+                    FROM cache_entries e JOIN cache_blobs b ON e.blob_hash = b.hash
+                    WHERE e.expires_at > ?
+                    ORDER BY e.last_access ASC
+                """, (time.time(),))
+                for key, stored_at, expires_at, data in cursor:
+                    try:
+                        entries.append((key, stored_at, expires_at, self.decode(data)))
+                    except Exception as e:
+                        app_logger.warning(f"缓存条目解码失败，已跳过: {key}, {e}")
+        except Exception as e:
+            app_logger.error(f"加载缓存条目失败: {e}")
+        return entries
+
+    def evict(self) -> int:
+        """
+        清理过期条目，并在总大小超过上限时按最近访问时间淘汰
+
+        Returns:
+            int: 淘汰的条目数
+        """
+        evicted = 0
+        try:
+            with self.get_connection() as conn:
+                evicted += conn.execute(
+                    "DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)
+                ).rowcount
+                self._delete_orphan_blobs(conn)
+
+                excess = self._total_size(conn) - self.max_bytes
+                if excess > 0:
+                    cutoff = self._eviction_cutoff(conn, excess)
+                    if cutoff is not None:
+                        evicted += conn.execute(
+                            "DELETE FROM cache_entries WHERE (last_access, key) <= (?, ?)", cutoff
+                        ).rowcount
+                        self._delete_orphan_blobs(conn)
+
+                conn.commit()
+        except Exception as e:
+            app_logger.error(f"淘汰缓存条目失败: {e}")
+        return evicted
+
+    def _eviction_cutoff(self, conn: sqlite3.Connection, excess: int) -> Optional[Tuple[float, str]]:
+        """
+        按最近访问时间计算需要淘汰到哪个条目为止
+
+        数据块可能被多个缓存键引用，只有引用它的条目全部淘汰后才会释放空间。
+
+        Returns:
+            Optional[Tuple[float, str]]: 最后一个需要淘汰的条目的 (最近访问时间, 缓存键)，
+            按 (last_access, key) 排序不大于它的条目都需要淘汰
+        """
+        references = dict(conn.execute(
+            "SELECT blob_hash, COUNT(*) FROM cache_entries GROUP BY blob_hash"
+        ))
+        freed = 0
+        cutoff = None
+        cursor = conn.execute("""
+            SELECT e.last_access, e.key, e.blob_hash, b.size
+            FROM cache_entries e JOIN cache_blobs b ON e.blob_hash = b.hash
+            ORDER BY e.last_access ASC, e.key ASC
+        """)
+        for last_access, key, blob_hash, size in cursor:
+            cutoff = (last_access, key)
+            references[blob_hash] -= 1
+            if references[blob_hash] == 0:
+                freed += size
+                if freed >= excess:
+                    break
+        return cutoff
+
+    def _delete_orphan_blobs(self, conn: sqlite3.Connection) -> None:
+        """删除不再被任何缓存键引用的数据块"""
+        conn.execute("""
+            DELETE FROM cache_blobs
+            WHERE hash NOT IN (SELECT DISTINCT blob_hash FROM cache_entries)
+        """)
+
+    def _total_size(self, conn: sqlite3.Connection) -> int:
+        """获取数据块总大小（字节）"""
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM cache_blobs").fetchone()[0]
+
+    def stats(self) -> dict:
+        """获取持久化存储统计信息"""
+        try:
+            with self.get_connection() as conn:
+                entries = conn.execute("SELECT COUNT(*) FROM cache_entries").fetchone()[0]
+                blobs = conn.execute("SELECT COUNT(*) FROM cache_blobs").fetchone()[0]
+                return {
+                    "path": str(self.db_path),
+                    "entries": entries,
+                    "blobs": blobs,
+                    "size_bytes": self._total_size(conn),
+                    "max_bytes": self.max_bytes,
+                }
+        except Exception as e:
+            app_logger.error(f"获取缓存存储统计失败: {e}")
+            return {"path": str(self.db_path), "error": str(e)}
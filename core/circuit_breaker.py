@@ -0,0 +1,242 @@
+"""上游接口熔断器模块
+
+按 core/urls.py 中的端点分组（任务、番茄专注、统计、习惯等）为上游接口设置熔断器：
+- 关闭（closed）：正常放行请求，连续失败达到阈值后打开
+- 打开（open）：直接拒绝请求（快速失败），不再等待上游超时
+- 半开（half_open）：冷却时间过后放行少量探测请求，探测成功达到次数后关闭，失败则重新打开
+
+熔断期间可以返回最近一次成功的响应（StaleSnapshots）。快照只对显式标记的请求保存
+（extensions={"stale_fallback": True}），按会话和端点保存一份原始字节，只在内存中保留，
+不写入响应缓存，也不持久化到磁盘。
+"""
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+from core.config import config
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(httpx.RequestError):
+    """熔断器处于打开状态，请求被直接拒绝"""
+
+    def __init__(self, group: str, retry_in: float, request: Optional[httpx.Request] = None):
+        super().__init__(f"上游接口分组 {group} 已熔断，{retry_in:.1f} 秒后重试", request=request)
+        self.group = group
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    """单个端点分组的熔断器"""
+
+    def __init__(self, group: str, failure_threshold: int = 5, recovery_timeout: float = 30.0,
+                 half_open_max_calls: int = 1, success_threshold: int = 2):
+        self.group = group
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.success_threshold = success_threshold
+        self._state = CLOSED
+        self._failures = 0
+        self._successes = 0
+        self._probes = 0
+        self._opened_at = 0.0
+        self._open_count = 0
+        self._rejected = 0
+        self._lock = Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        """打开状态超过冷却时间后转为半开"""
+        if self._state == OPEN and now - self._opened_at >= self.recovery_timeout:
+            self._state = HALF_OPEN
+            self._successes = 0
+            self._probes = 0
+        return self._state
+
+    def retry_in(self) -> float:
+        """距离下一次允许探测还需等待的秒数"""
+        with self._lock:
+            if self._state != OPEN:
+                return 0.0
+            return max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """
+        判断是否放行请求
+
+        半开状态下放行的请求作为探测请求，调用方必须随后调用
+        record_success / record_failure / release 之一。
+        """
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return True
+            self._rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        """记录一次成功请求"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+                self._successes += 1
+                if self._successes >= self.success_threshold:
+                    self._state = CLOSED
+                    self._failures = 0
+            else:
+                self._failures = 0
+
+    def record_failure(self) -> None:
+        """记录一次失败请求"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._trip()
+                return
+            self._failures += 1
+            if self._state == CLOSED and self._failures >= self.failure_threshold:
+                self._trip()
+
+    def release(self) -> None:
+        """请求被取消时归还半开状态的探测名额，不计入成功或失败"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes = max(0, self._probes - 1)
+
+    def _trip(self) -> None:
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes = 0
+        self._successes = 0
+        self._open_count += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """获取熔断器状态"""
+        state = self.state
+        return {
+            "state": state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in(), 1),
+            "open_count": self._open_count,
+            "rejected": self._rejected,
+        }
+
+
+class StaleSnapshots:
+    """
+    熔断降级使用的响应快照
+
+    按 (会话, 端点分组, 端点名) 保存最近一次成功的原始响应，键不包含查询参数，
+    只适用于响应与查询参数无关的端点。超过 max_body_bytes 的响应不保存，
+    条目数超过 max_entries 时按最近写入时间淘汰。
+    """
+
+    def __init__(self, ttl: float = 86400.0, max_entries: int = 64, max_body_bytes: int = 256 * 1024):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_body_bytes = max_body_bytes
+        # 键 -> (写入时间, 内容类型, 原始响应体)
+        self._snapshots: "OrderedDict[Tuple[str, str, str], Tuple[float, Optional[str], bytes]]" = OrderedDict()
+        self._skipped = 0
+        self._served = 0
+
+    def put(self, key: Tuple[str, str, str], content_type: Optional[str], body: bytes) -> bool:
+        """保存快照，响应体超过上限时跳过"""
+        if len(body) > self.max_body_bytes:
+            self.discard(key)
+            return False
+        self._snapshots[key] = (time.monotonic(), content_type, body)
+        self._snapshots.move_to_end(key)
+        while len(self._snapshots) > self.max_entries:
+            self._snapshots.popitem(last=False)
+        return True
+
+    def discard(self, key: Tuple[str, str, str]) -> None:
+        """响应过大不保存，同时移除该键已有的旧快照"""
+        self._skipped += 1
+        self._snapshots.pop(key, None)
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[Tuple[Optional[str], bytes]]:
+        """获取未过期的快照 (内容类型, 原始响应体)"""
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+        stored_at, content_type, body = snapshot
+        if time.monotonic() - stored_at > self.ttl:
+            del self._snapshots[key]
+            return None
+        self._served += 1
+        return content_type, body
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._snapshots),
+            "max_entries": self.max_entries,
+            "size_bytes": sum(len(body) for _, _, body in self._snapshots.values()),
+            "skipped_oversized": self._skipped,
+            "served": self._served,
+        }
+
+
+class CircuitBreakerRegistry:
+    """按端点分组管理熔断器"""
+
+    def __init__(self, breaker_config: Optional[Dict[str, Any]] = None):
+        self.breaker_config = breaker_config or {}
+        self.enabled = self.breaker_config.get('enabled', True)
+        self.groups = self.breaker_config.get(
+            'groups', ['task_apis', 'pomodoro_apis', 'statistics_apis', 'habit_apis']
+        )
+        self.serve_stale = self.breaker_config.get('serve_stale', True)
+        self.stale_ttl = self.breaker_config.get('stale_ttl', 86400)
+        self.snapshots = StaleSnapshots(
+            ttl=self.stale_ttl,
+            max_entries=self.breaker_config.get('stale_max_entries', 64),
+            max_body_bytes=self.breaker_config.get('stale_max_body_kb', 256) * 1024,
+        )
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    def breaker_for(self, group: Optional[str]) -> Optional[CircuitBreaker]:
+        """获取分组的熔断器，分组未启用熔断时返回 None"""
+        if not self.enabled or group not in self.groups:
+            return None
+
+        breaker = self._breakers.get(group)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                group,
+                failure_threshold=self.breaker_config.get('failure_threshold', 5),
+                recovery_timeout=self.breaker_config.get('recovery_timeout', 30),
+                half_open_max_calls=self.breaker_config.get('half_open_max_calls', 1),
+                success_threshold=self.breaker_config.get('success_threshold', 2),
+            )
+            self._breakers[group] = breaker
+        return breaker
+
+    def stats(self) -> Dict[str, Any]:
+        """获取所有熔断器状态"""
+        return {
+            "enabled": self.enabled,
+            "groups": {
+                group: self._breakers[group].stats() if group in self._breakers else {"state": CLOSED}
+                for group in self.groups
+            },
+            "stale_snapshots": self.snapshots.stats(),
+        }
+
+
+# 全局熔断器注册表
+circuit_breakers = CircuitBreakerRegistry(config.get('circuit_breaker', {}))
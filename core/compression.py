@@ -0,0 +1,222 @@
+"""响应压缩中间件模块
+
+根据请求的 Accept-Encoding 协商压缩算法，支持 zstd、brotli 和 gzip：
+- zstd、brotli 为可选依赖（pip install "didaapi[compression]"），未安装时只使用 gzip
+- 小于 minimum_size 的响应不压缩
+- 已压缩的内容类型（xlsx、zip、图片等）和 Server-Sent Events 不压缩
+- 各算法的压缩级别在 [compression] 配置中设置
+"""
+import zlib
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import config
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+DEFAULT_EXCLUDED_TYPES = [
+    "application/vnd.openxmlformats-officedocument",
+    "application/zip",
+    "application/gzip",
+    "application/x-7z-compressed",
+    "application/pdf",
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "text/event-stream",
+]
+
+
+class _Compressor:
+    """流式压缩器的统一接口"""
+
+    def __init__(self, compress: Callable[[bytes], bytes], flush: Callable[[], bytes]):
+        self.compress = compress
+        self.flush = flush
+
+
+def _gzip_compressor(level: int) -> _Compressor:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+def _brotli_compressor(level: int) -> _Compressor:
+    compressor = brotli.Compressor(quality=level)
+    return _Compressor(compressor.process, compressor.finish)
+
+
+def _zstd_compressor(level: int) -> _Compressor:
+    compressor = zstandard.ZstdCompressor(level=level).compressobj()
+    return _Compressor(compressor.compress, compressor.flush)
+
+
+def available_encodings() -> Dict[str, Callable[[int], _Compressor]]:
+    """当前环境可用的压缩算法"""
+    encodings = {"gzip": _gzip_compressor}
+    if brotli is not None:
+        encodings["br"] = _brotli_compressor
+    if zstandard is not None:
+        encodings["zstd"] = _zstd_compressor
+    return encodings
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    解析 Accept-Encoding 请求头
+
+    Returns:
+        Dict[str, float]: 编码名 -> q 值，q=0 的编码表示客户端拒绝
+    """
+    accepted = {}
+    for part in header.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name] = quality
+    return accepted
+
+
+class CompressionMiddleware:
+    """按 Accept-Encoding 协商压缩响应体的 ASGI 中间件"""
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024, levels: Optional[Dict[str, int]] = None,
+                 preference: Optional[List[str]] = None, excluded_types: Optional[List[str]] = None):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = {"gzip": 6, "br": 4, "zstd": 3, **(levels or {})}
+        self.encodings = available_encodings()
+        self.preference = [name for name in (preference or ["zstd", "br", "gzip"]) if name in self.encodings]
+        self.excluded_types = excluded_types if excluded_types is not None else DEFAULT_EXCLUDED_TYPES
+
+    def select_encoding(self, accept_encoding: str) -> Optional[str]:
+        """按 q 值和服务端偏好顺序选择压缩算法"""
+        accepted = parse_accept_encoding(accept_encoding)
+        wildcard = accepted.get("*", 0.0)
+        candidates = [
+            (accepted.get(name, wildcard), -index, name)
+            for index, name in enumerate(self.preference)
+        ]
+        candidates = [candidate for candidate in candidates if candidate[0] > 0]
+        return max(candidates)[2] if candidates else None
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """包装单个请求的 send，决定是否压缩并输出压缩后的响应体"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.start_message: Optional[Message] = None
+        self.compressor: Optional[_Compressor] = None
+        self.passthrough = False
+
+    def _should_skip(self, headers: Headers) -> bool:
+        if "content-encoding" in headers:
+            return True
+        content_type = headers.get("content-type", "").lower()
+        return any(content_type.startswith(excluded) for excluded in self.middleware.excluded_types)
+
+    def _start_compression(self, headers: MutableHeaders) -> None:
+        level = self.middleware.levels[self.encoding]
+        self.compressor = self.middleware.encodings[self.encoding](level)
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if "content-length" in headers:
+            del headers["content-length"]
+        # 压缩后原来的强 ETag 不再对应响应体，改为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            self.start_message = message
+            headers = Headers(raw=message["headers"])
+            status = message["status"]
+            self.passthrough = status < 200 or status in (204, 304) or self._should_skip(headers)
+            if self.passthrough:
+                await self._send(message)
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None:
+            headers = MutableHeaders(raw=self.start_message["headers"])
+            if not more_body and len(body) < self.middleware.minimum_size:
+                # 响应体太小，压缩收益不足
+                self.passthrough = True
+                await self._send(self.start_message)
+                await self._send(message)
+                return
+
+            self._start_compression(headers)
+            if not more_body:
+                compressed = self.compressor.compress(body) + self.compressor.flush()
+                headers["Content-Length"] = str(len(compressed))
+                await self._send(self.start_message)
+                await self._send({"type": "http.response.body", "body": compressed})
+                return
+            await self._send(self.start_message)
+
+        chunk = self.compressor.compress(body)
+        if not more_body:
+            chunk += self.compressor.flush()
+        if chunk or not more_body:
+            await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+
+
+def compression_options() -> Tuple[bool, Dict[str, Any]]:
+    """读取 [compression] 配置，返回 (是否启用, 中间件参数)"""
+    compression_config = config.get('compression', {})
+    options = {
+        "minimum_size": compression_config.get('minimum_size', 1024),
+        "levels": {
+            "gzip": compression_config.get('gzip_level', 6),
+            "br": compression_config.get('brotli_quality', 4),
+            "zstd": compression_config.get('zstd_level', 3),
+        },
+        "preference": compression_config.get('encodings', ["zstd", "br", "gzip"]),
+    }
+    if 'excluded_types' in compression_config:
+        options["excluded_types"] = compression_config['excluded_types']
+    return compression_config.get('enabled', True), options
@@ -0,0 +1,244 @@
+"""上游HTTP客户端模块
+
+所有访问滴答清单上游接口的服务都通过 create_http_client 创建 httpx 客户端。
+客户端使用 UpstreamTransport 包装底层连接池，统一处理：
+- 发送请求前的限流，以及上游返回的 429 / Retry-After
+- 幂等请求的指数退避重试（GET，或通过 extensions={"idempotent": True} 标记的请求）
+- 已配置端点的对冲请求
+- 按端点分组熔断：熔断期间快速失败，标记了 extensions={"stale_fallback": True} 的幂等请求
+  可以返回最近一次成功的响应
+"""
+import asyncio
+from http.cookies import SimpleCookie
+from typing import Optional, Tuple
+
+import httpx
+
+from core import urls
+from core.cache import session_scope
+from core.circuit_breaker import CircuitBreaker, CircuitBreakerRegistry, CircuitOpenError, circuit_breakers
+from core.config import config
+from core.rate_limiter import RateLimiter, parse_retry_after, rate_limiter
+from core.retry import RetryManager, retry_manager
+from utils import app_logger
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+def request_session(request: httpx.Request) -> Optional[str]:
+    """从请求的 Cookie 中提取会话标识（认证令牌摘要）"""
+    cookie_header = request.headers.get('cookie')
+    if not cookie_header:
+        return None
+
+    cookie = SimpleCookie()
+    try:
+        cookie.load(cookie_header)
+    except Exception:
+        return None
+
+    morsel = cookie.get('t')
+    return session_scope(morsel.value) if morsel else None
+
+
+def _close_response_later(task: asyncio.Task) -> None:
+    """对冲请求被取消时，如果已经拿到响应则关闭，避免连接泄漏"""
+    if task.cancelled() or task.exception() is not None:
+        return
+    asyncio.ensure_future(task.result().aclose())
+
+
+class UpstreamTransport(httpx.AsyncBaseTransport):
+    """带限流、重试和对冲请求的上游传输层"""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None,
+                 limiter: Optional[RateLimiter] = None,
+                 retries: Optional[RetryManager] = None,
+                 breakers: Optional[CircuitBreakerRegistry] = None):
+        self.transport = transport or httpx.AsyncHTTPTransport()
+        self.limiter = limiter or rate_limiter
+        self.retries = retries or retry_manager
+        self.breakers = breakers or circuit_breakers
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        # 按 core/urls.py 登记的端点确定分组和端点名，未登记时使用主机名
+        matched = urls.match_api_endpoint(request.url.path)
+        group, endpoint = matched if matched else (None, request.url.host)
+        idempotent = request.method in IDEMPOTENT_METHODS or request.extensions.get('idempotent', False)
+
+        breaker = self.breakers.breaker_for(group)
+        if breaker is None:
+            return await self._send(request, endpoint, idempotent)
+        if not breaker.allow_request():
+            return self._serve_stale(request, breaker, endpoint, idempotent)
+
+        try:
+            response = await self._send(request, endpoint, idempotent)
+        except httpx.TransportError:
+            breaker.record_failure()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+            # 只为显式标记的请求保存快照，其他请求（包括流式读取的大响应）不读取响应体
+            if (response.status_code == 200 and idempotent and self.breakers.serve_stale
+                    and request.extensions.get('stale_fallback', False)):
+                await self._remember(request, breaker.group, endpoint, response)
+        return response
+
+    async def _send(self, request: httpx.Request, endpoint: str, idempotent: bool) -> httpx.Response:
+        if not idempotent or not self.retries.enabled:
+            return await self._send_throttled(request)
+        return await self._send_with_retry(request, endpoint)
+
+    def _stale_key(self, request: httpx.Request, group: str, endpoint: str) -> Optional[Tuple[str, str, str]]:
+        """熔断降级使用的快照键（不含查询参数），没有会话标识的请求不保存"""
+        session = request_session(request)
+        if not session:
+            return None
+        return session, group, endpoint
+
+    async def _remember(self, request: httpx.Request, group: str, endpoint: str,
+                        response: httpx.Response) -> None:
+        """保存最近一次成功的响应，供熔断期间降级返回"""
+        key = self._stale_key(request, group, endpoint)
+        if key is None:
+            return
+        content_length = response.headers.get('content-length')
+        if content_length and content_length.isdigit() and int(content_length) > self.breakers.snapshots.max_body_bytes:
+            # 不读取过大的响应体
+            self.breakers.snapshots.discard(key)
+            return
+        self.breakers.snapshots.put(key, response.headers.get('content-type'), await response.aread())
+
+    def _serve_stale(self, request: httpx.Request, breaker: CircuitBreaker, endpoint: str,
+                     idempotent: bool) -> httpx.Response:
+        """熔断期间返回最近一次成功的响应，没有可用数据时快速失败"""
+        cached = None
+        if idempotent and self.breakers.serve_stale and request.extensions.get('stale_fallback', False):
+            key = self._stale_key(request, breaker.group, endpoint)
+            cached = self.breakers.snapshots.get(key) if key else None
+        if cached is None:
+            raise CircuitOpenError(breaker.group, breaker.retry_in(), request=request)
+
+        app_logger.warning(f"上游接口分组 {breaker.group} 已熔断，返回缓存的响应: {request.method} {request.url.path}")
+        content_type, body = cached
+        headers = {"x-circuit-breaker": "stale"}
+        if content_type:
+            headers["content-type"] = content_type
+        return httpx.Response(200, headers=headers, content=body, request=request)
+
+    async def _send_with_retry(self, request: httpx.Request, endpoint: str) -> httpx.Response:
+        """发送幂等请求，遇到网络错误或可重试状态码时按退避策略重试"""
+        policy = self.retries.policy_for(endpoint)
+        budget = self.retries.budget_for(endpoint)
+        hedge_delay = self.retries.hedge_delay_for(endpoint)
+        budget.record_request()
+
+        attempt = 1
+        while True:
+            try:
+                if hedge_delay is not None:
+                    response = await self._send_hedged(request, hedge_delay)
+                else:
+                    response = await self._send_throttled(request)
+            except httpx.TransportError as e:
+                if attempt >= policy.max_attempts or not budget.try_spend():
+                    raise
+                reason = f"{type(e).__name__}: {e}"
+            else:
+                if (response.status_code not in policy.retry_statuses
+                        or attempt >= policy.max_attempts
+                        or not budget.try_spend()):
+                    return response
+                reason = f"HTTP {response.status_code}"
+                await response.aclose()
+
+            delay = policy.backoff(attempt)
+            app_logger.warning(
+                f"上游请求失败（{reason}），{delay:.2f} 秒后第 {attempt} 次重试: {request.method} {request.url.path}"
+            )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _send_hedged(self, request: httpx.Request, hedge_delay: float) -> httpx.Response:
+        """
+        发送对冲请求
+
+        首个请求在 hedge_delay 秒内未返回时再发送一个相同的请求，
+        返回先成功的响应并取消另一个。
+        """
+        primary = asyncio.create_task(self._send_throttled(request))
+        done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+        if done:
+            return primary.result()
+
+        app_logger.debug(f"请求超过 {hedge_delay} 秒未返回，发送对冲请求: {request.method} {request.url.path}")
+        pending = {primary, asyncio.create_task(self._send_throttled(request))}
+        winner: Optional[httpx.Response] = None
+        last_error: Optional[BaseException] = None
+        try:
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                    elif winner is None:
+                        winner = task.result()
+                    else:
+                        await task.result().aclose()
+        finally:
+            for task in pending:
+                task.add_done_callback(_close_response_later)
+                task.cancel()
+
+        if winner is None:
+            raise last_error
+        return winner
+
+    async def _send_throttled(self, request: httpx.Request) -> httpx.Response:
+        """限流后发送请求，上游返回429时按 Retry-After 退避重发"""
+        host = request.url.host
+        session = request_session(request)
+
+        attempt = 0
+        while True:
+            waited = await self.limiter.acquire(host, session)
+            if waited > 0.5:
+                app_logger.debug(f"上游请求限流等待 {waited:.2f} 秒: {request.method} {request.url.path}")
+
+            response = await self.transport.handle_async_request(request)
+            if response.status_code != 429 or attempt >= self.limiter.max_throttle_retries:
+                return response
+
+            # 429 表示请求未被处理，退避后可以安全重发
+            retry_after = parse_retry_after(response.headers.get('retry-after'))
+            await response.aclose()
+            delay = self.limiter.on_throttled(host, session, retry_after)
+            attempt += 1
+            app_logger.warning(
+                f"上游返回429，{delay:.1f} 秒后第 {attempt} 次重试: {request.method} {request.url.path}"
+            )
+
+    async def aclose(self) -> None:
+        await self.transport.aclose()
+
+
+def create_http_client(timeout: Optional[float] = None) -> httpx.AsyncClient:
+    """
+    创建访问滴答清单上游接口的 httpx 客户端
+
+    Args:
+        timeout: 请求超时时间（秒），默认使用 request_config.timeout
+
+    Returns:
+        httpx.AsyncClient: 带限流、重试和熔断的异步客户端
+    """
+    if timeout is None:
+        timeout = config.get('request_config.timeout', 30.0)
+    return httpx.AsyncClient(timeout=timeout, transport=UpstreamTransport())
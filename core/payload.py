@@ -0,0 +1,89 @@
+"""上游原始响应模块
+
+直接透传给客户端的接口（如 /tasks/all、/projects/all、/habits/all）不需要修改数据，
+服务层返回 UpstreamPayload 保存上游的原始字节和内容类型，由路由原样返回，
+避免对数MB的数据先完整解析再重新序列化。只有确实需要处理数据时才调用 json() 解析。
+
+透传响应带有根据内容哈希计算的强 ETag，客户端携带 If-None-Match 轮询时，
+数据未变化则返回 304，不再传输响应体。
+"""
+import hashlib
+import json
+from typing import Any, Optional
+
+import httpx
+from fastapi.responses import Response
+
+DEFAULT_CONTENT_TYPE = "application/json"
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    判断 If-None-Match 请求头是否匹配 ETag（弱比较，忽略 W/ 前缀）
+
+    Args:
+        if_none_match: If-None-Match 请求头，可以包含多个以逗号分隔的 ETag 或 *
+        etag: 当前响应的 ETag
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+class UpstreamPayload:
+    """上游接口的原始响应数据"""
+
+    __slots__ = ("content", "content_type", "_decoded", "_etag")
+
+    def __init__(self, content: bytes, content_type: Optional[str] = None):
+        self.content = content
+        self.content_type = content_type or DEFAULT_CONTENT_TYPE
+        self._decoded: Any = None
+        self._etag: Optional[str] = None
+
+    @classmethod
+    def from_response(cls, response: httpx.Response) -> "UpstreamPayload":
+        """根据 httpx 响应创建（content 已经是解压后的字节）"""
+        return cls(response.content, response.headers.get("content-type"))
+
+    @property
+    def size(self) -> int:
+        """原始数据字节数"""
+        return len(self.content)
+
+    @property
+    def etag(self) -> str:
+        """根据内容哈希计算的强 ETag"""
+        if self._etag is None:
+            self._etag = f'"{hashlib.blake2b(self.content, digest_size=16).hexdigest()}"'
+        return self._etag
+
+    def to_response(self, if_none_match: Optional[str] = None) -> Response:
+        """
+        生成透传响应
+
+        Args:
+            if_none_match: 请求的 If-None-Match 头，与当前 ETag 匹配时返回 304
+        """
+        headers = {"ETag": self.etag, "Cache-Control": "private, no-cache"}
+        if etag_matches(if_none_match, self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=self.content, media_type=self.content_type, headers=headers)
+
+    def json(self) -> Any:
+        """解析为 JSON 数据，解析结果会被复用"""
+        if self._decoded is None:
+            self._decoded = json.loads(self.content)
+        return self._decoded
+
+    def __repr__(self) -> str:
+        return f"UpstreamPayload(content_type={self.content_type!r}, size={self.size})"
@@ -0,0 +1,190 @@
+"""上游请求限流模块
+
+基于令牌桶算法，对滴答清单等上游服务按主机和按会话两级限流：
+- 主机级令牌桶限制整个服务对同一上游主机的总请求速率
+- 会话级令牌桶限制单个登录会话的请求速率，避免一个导出任务占满主机配额
+- 收到 429 / Retry-After 时暂停对应令牌桶，所有等待中的请求一起退避
+"""
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import config
+
+
+def parse_retry_after(value: Optional[str], default: float = 1.0) -> float:
+    """
+    解析 Retry-After 响应头
+
+    Args:
+        value: 响应头的值，可以是秒数或 HTTP 日期
+        default: 无法解析时使用的默认秒数
+
+    Returns:
+        float: 需要等待的秒数
+    """
+    if not value:
+        return default
+
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+        return max(0.0, retry_at.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return default
+
+
+class TokenBucket:
+    """异步令牌桶"""
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+
+    def _refill(self, now: float) -> None:
+        """按流逝时间补充令牌"""
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> float:
+        """
+        获取一个令牌，令牌不足或处于退避期时等待
+
+        Returns:
+            float: 实际等待的秒数
+        """
+        started_at = time.monotonic()
+        self._waiting += 1
+        try:
+            while True:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    await asyncio.sleep(self._blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return time.monotonic() - started_at
+
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self._waiting -= 1
+
+    def block(self, seconds: float) -> None:
+        """在指定时间内暂停发放令牌（用于响应 Retry-After）"""
+        self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+        self._tokens = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """获取令牌桶状态"""
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "tokens": round(self._tokens, 2),
+            "queue_depth": self._waiting,
+            "blocked_seconds": round(max(0.0, self._blocked_until - now), 2),
+        }
+
+
+class RateLimiter:
+    """按上游主机和会话两级限流的限流器"""
+
+    def __init__(self, limit_config: Optional[Dict[str, Any]] = None):
+        self.limit_config = limit_config or {}
+        self.enabled = self.limit_config.get('enabled', True)
+        self.max_retry_after = self.limit_config.get('max_retry_after', 60)
+        self.max_throttle_retries = self.limit_config.get('max_throttle_retries', 2)
+        self._host_buckets: Dict[str, TokenBucket] = {}
+        self._session_buckets: Dict[Tuple[str, str], TokenBucket] = {}
+
+    def _host_limits(self, host: str) -> Tuple[float, float]:
+        """获取主机级限流参数 (每秒请求数, 突发容量)，支持按主机覆盖"""
+        override = self.limit_config.get('hosts', {}).get(host, {})
+        rate = override.get('rate', self.limit_config.get('host_rate', 10))
+        burst = override.get('burst', self.limit_config.get('host_burst', 20))
+        return rate, burst
+
+    def _host_bucket(self, host: str) -> TokenBucket:
+        bucket = self._host_buckets.get(host)
+        if bucket is None:
+            bucket = TokenBucket(*self._host_limits(host))
+            self._host_buckets[host] = bucket
+        return bucket
+
+    def _session_bucket(self, host: str, session: str) -> TokenBucket:
+        key = (host, session)
+        bucket = self._session_buckets.get(key)
+        if bucket is None:
+            bucket = TokenBucket(
+                self.limit_config.get('session_rate', 5),
+                self.limit_config.get('session_burst', 10),
+            )
+            self._session_buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, host: str, session: Optional[str] = None) -> float:
+        """
+        请求上游前获取令牌，先占用会话配额再占用主机配额
+
+        Args:
+            host: 上游主机名
+            session: 会话标识（认证令牌摘要），为空时只做主机级限流
+
+        Returns:
+            float: 总等待秒数
+        """
+        if not self.enabled:
+            return 0.0
+
+        waited = 0.0
+        if session:
+            waited += await self._session_bucket(host, session).acquire()
+        waited += await self._host_bucket(host).acquire()
+        return waited
+
+    def on_throttled(self, host: str, session: Optional[str], retry_after: float) -> float:
+        """
+        上游返回 429 时暂停对应令牌桶
+
+        有会话标识时只暂停该会话，否则暂停整个主机。
+
+        Returns:
+            float: 实际退避的秒数（不超过 max_retry_after）
+        """
+        delay = min(retry_after, self.max_retry_after)
+        if session:
+            self._session_bucket(host, session).block(delay)
+        else:
+            self._host_bucket(host).block(delay)
+        return delay
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各令牌桶状态及排队深度"""
+        hosts = {host: bucket.stats() for host, bucket in self._host_buckets.items()}
+        sessions = {
+            f"{host}:{session}": bucket.stats()
+            for (host, session), bucket in self._session_buckets.items()
+        }
+        return {
+            "enabled": self.enabled,
+            "queue_depth": sum(item["queue_depth"] for item in [*hosts.values(), *sessions.values()]),
+            "hosts": hosts,
+            "sessions": sessions,
+        }
+
+
+# 全局限流器实例
+rate_limiter = RateLimiter(config.get('rate_limit', {}))
@@ -0,0 +1,138 @@
+"""JSON 响应模块
+
+提供基于 orjson 的 FastJSONResponse，作为 main.app 的默认响应类。
+orjson 是可选依赖（pip install "didaapi[fast]"），未安装或在配置中关闭
+（[response] fast_json = false）时回退到 FastAPI 默认的 JSONResponse。
+
+直接返回滴答清单原始字典的路由，序列化耗时主要花在 FastAPI 的 jsonable_encoder 上。
+各路由器使用 FastJSONRoute 作为路由类：没有响应模型的路由直接用 orjson 序列化返回值，
+跳过 jsonable_encoder。
+"""
+import functools
+import inspect
+from decimal import Decimal
+from enum import Enum
+from pathlib import PurePath
+from typing import Any, Callable, Type
+from uuid import UUID
+
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from core.config import config
+from utils import app_logger
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - 可选依赖
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """orjson 无法直接序列化的类型，与 FastAPI 的 jsonable_encoder 保持一致"""
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    if isinstance(value, Decimal):
+        return int(value) if value.as_integer_ratio()[1] == 1 else float(value)
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (PurePath, UUID)):
+        return str(value)
+    if isinstance(value, bytes):
+        return value.decode("utf-8")
+    raise TypeError(f"无法序列化类型 {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用 orjson 序列化的 JSON 响应
+
+    datetime / date / time（包括 UserSession 中带时区的时间）序列化为 ISO 8601 字符串，
+    与 FastAPI 默认编码器输出一致；字典的非字符串键会转换为字符串。
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def fast_json_enabled() -> bool:
+    """是否启用 orjson 序列化"""
+    return orjson is not None and config.get('response.fast_json', True)
+
+
+def default_response_class() -> Type[JSONResponse]:
+    """根据配置和 orjson 是否安装选择默认响应类"""
+    if not config.get('response.fast_json', True):
+        return JSONResponse
+    if orjson is None:
+        app_logger.warning("未安装 orjson，使用默认 JSONResponse（pip install \"didaapi[fast]\" 启用快速JSON响应）")
+        return JSONResponse
+    return FastJSONResponse
+
+
+def render_json(content: Any) -> bytes:
+    """
+    把内容序列化为 JSON 字节，启用 orjson 时与 FastJSONResponse 输出一致
+
+    用于需要先得到响应体（例如计算 ETag）再生成响应的场景。
+    """
+    if fast_json_enabled():
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return JSONResponse(jsonable_encoder(content)).body
+
+
+def _wrap_endpoint(endpoint: Callable[..., Any], status_code: Any) -> Callable[..., Any]:
+    """包装路由函数，把返回值直接渲染为 FastJSONResponse"""
+
+    def to_response(result: Any) -> Any:
+        if isinstance(result, Response):
+            return result
+        if status_code is not None:
+            return FastJSONResponse(result, status_code=status_code)
+        return FastJSONResponse(result)
+
+    if inspect.iscoroutinefunction(endpoint):
+        @functools.wraps(endpoint)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return to_response(await endpoint(*args, **kwargs))
+    else:
+        @functools.wraps(endpoint)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return to_response(endpoint(*args, **kwargs))
+
+    wrapper.__fast_json__ = True
+    return wrapper
+
+
+class FastJSONRoute(APIRoute):
+    """
+    没有响应模型的路由直接用 orjson 序列化返回值
+
+    带响应模型（response_model 或返回值注解）的路由、指定了非 JSON 响应类的路由保持 FastAPI 默认行为。
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any):
+        response_model = kwargs.get('response_model')
+        response_class = kwargs.get('response_class')
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        has_model = (
+            (response_model is not None and not isinstance(response_model, DefaultPlaceholder))
+            or inspect.signature(endpoint).return_annotation is not inspect.Signature.empty
+        )
+        is_json = response_class is None or (
+            inspect.isclass(response_class) and issubclass(response_class, JSONResponse)
+        )
+        if fast_json_enabled() and not has_model and is_json and not getattr(endpoint, '__fast_json__', False):
+            endpoint = _wrap_endpoint(endpoint, kwargs.get('status_code'))
+
+        super().__init__(path, endpoint, **kwargs)
+
@@ -0,0 +1,135 @@
+"""上游请求重试策略模块
+
+为幂等的上游请求（GET，或显式标记为幂等的请求）提供：
+- 指数退避 + 全抖动（full jitter）的重试间隔
+- 按端点划分的重试预算，防止上游故障时重试流量成倍放大
+- 可选的对冲请求（hedged request）：首个请求超过指定时间未返回时再发一个副本，取先返回的结果
+"""
+import random
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Tuple
+
+from core.config import config
+
+
+@dataclass
+class RetryPolicy:
+    """重试策略"""
+
+    max_attempts: int = 3
+    base_delay: float = 0.3
+    max_delay: float = 5.0
+    retry_statuses: Tuple[int, ...] = (500, 502, 503, 504)
+
+    @classmethod
+    def from_config(cls, policy_config: Dict[str, Any], default: Optional["RetryPolicy"] = None) -> "RetryPolicy":
+        """根据配置创建重试策略，未配置的字段沿用 default"""
+        default = default or cls()
+        return cls(
+            max_attempts=policy_config.get('max_attempts', default.max_attempts),
+            base_delay=policy_config.get('base_delay', default.base_delay),
+            max_delay=policy_config.get('max_delay', default.max_delay),
+            retry_statuses=tuple(policy_config.get('retry_statuses', default.retry_statuses)),
+        )
+
+    def backoff(self, attempt: int) -> float:
+        """
+        计算第 attempt 次重试前的等待时间（全抖动指数退避）
+
+        Args:
+            attempt: 重试序号，从1开始
+
+        Returns:
+            float: 等待秒数
+        """
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+
+@dataclass
+class RetryBudget:
+    """
+    重试预算
+
+    每个请求向预算存入 ratio 个额度，每次重试消耗1个额度，额度上限为 max_tokens。
+    上游持续故障时额度很快耗尽，重试流量最多只占正常流量的 ratio 比例。
+    """
+
+    ratio: float = 0.2
+    max_tokens: float = 10.0
+    tokens: float = field(init=False)
+    retries: int = field(default=0, init=False)
+    rejected: int = field(default=0, init=False)
+
+    def __post_init__(self) -> None:
+        self.tokens = self.max_tokens
+
+    def record_request(self) -> None:
+        """记录一次请求，存入重试额度"""
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        """尝试消耗一次重试额度"""
+        if self.tokens >= 1:
+            self.tokens -= 1
+            self.retries += 1
+            return True
+        self.rejected += 1
+        return False
+
+
+class RetryManager:
+    """按端点管理重试策略、重试预算和对冲配置"""
+
+    def __init__(self, retry_config: Optional[Dict[str, Any]] = None):
+        self.retry_config = retry_config or {}
+        self.enabled = self.retry_config.get('enabled', True)
+        self.default_policy = RetryPolicy.from_config(self.retry_config)
+        self.hedge_config = self.retry_config.get('hedge', {})
+        self._policies: Dict[str, RetryPolicy] = {}
+        self._budgets: Dict[str, RetryBudget] = {}
+
+    def policy_for(self, endpoint: str) -> RetryPolicy:
+        """获取端点的重试策略，支持在 [retry.endpoints.<端点名>] 中覆盖"""
+        policy = self._policies.get(endpoint)
+        if policy is None:
+            override = self.retry_config.get('endpoints', {}).get(endpoint, {})
+            policy = RetryPolicy.from_config(override, self.default_policy)
+            self._policies[endpoint] = policy
+        return policy
+
+    def budget_for(self, endpoint: str) -> RetryBudget:
+        """获取端点的重试预算"""
+        budget = self._budgets.get(endpoint)
+        if budget is None:
+            budget = RetryBudget(
+                ratio=self.retry_config.get('budget_ratio', 0.2),
+                max_tokens=self.retry_config.get('budget_max', 10),
+            )
+            self._budgets[endpoint] = budget
+        return budget
+
+    def hedge_delay_for(self, endpoint: str) -> Optional[float]:
+        """获取端点的对冲延迟（秒），未启用对冲时返回 None"""
+        if not self.hedge_config.get('enabled', False):
+            return None
+        if endpoint not in self.hedge_config.get('endpoints', []):
+            return None
+        return self.hedge_config.get('delay', 0.8)
+
+    def stats(self) -> Dict[str, Any]:
+        """获取各端点的重试预算使用情况"""
+        return {
+            "enabled": self.enabled,
+            "endpoints": {
+                endpoint: {
+                    "tokens": round(budget.tokens, 2),
+                    "retries": budget.retries,
+                    "rejected": budget.rejected,
+                }
+                for endpoint, budget in self._budgets.items()
+            },
+        }
+
+
+# 全局重试管理器实例
+retry_manager = RetryManager(config.get('retry', {}))
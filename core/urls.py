@@ -2,6 +2,8 @@
 统一的URL和外部链接管理
 所有外部API链接和相关URL都在此文件中统一管理
 """
+import re
+from typing import Optional, Tuple
 
 # ================================
 # 微信开放平台相关链接
@@ -354,3 +356,41 @@ def get_api_endpoints() -> dict:
         "user_apis": DIDA_USER_APIS,
         "custom_apis": CUSTOM_APIS
     }
+
+
+# 匹配端点时的分组顺序（同一路径登记在多个分组时，靠前的分组优先）
+_ENDPOINT_MATCH_ORDER = (
+    ("pomodoro_apis", DIDA_POMODORO_APIS),
+    ("focus_apis", DIDA_FOCUS_APIS),
+    ("statistics_apis", DIDA_STATISTICS_APIS),
+    ("habit_apis", DIDA_HABIT_APIS),
+    ("task_apis", DIDA_TASK_APIS),
+    ("project_apis", DIDA_PROJECT_APIS),
+    ("user_apis", DIDA_USER_APIS),
+    ("auth_apis", DIDA_AUTH_APIS),
+)
+
+
+def match_api_endpoint(path: str) -> Optional[Tuple[str, str]]:
+    """
+    根据请求路径匹配本文件中登记的滴答清单API端点
+
+    Args:
+        path: 请求路径，例如 /api/v2/pomodoros/statistics/heatmap/20231201/20231207
+
+    Returns:
+        Optional[Tuple[str, str]]: (分组名, 端点名)，例如 ("pomodoro_apis", "focus_heatmap")；
+        未登记的路径返回 None
+    """
+    # 去掉 /api/v2、/api/v3 等版本前缀
+    path = re.sub(r'^/api/v\d+', '', path) or '/'
+
+    best = None
+    for group, endpoints in _ENDPOINT_MATCH_ORDER:
+        for name, endpoint in endpoints.items():
+            if path != endpoint and not path.startswith(endpoint.rstrip('/') + '/'):
+                continue
+            if best is None or len(endpoint) > len(best[2]):
+                best = (group, name, endpoint)
+
+    return (best[0], best[1]) if best else None
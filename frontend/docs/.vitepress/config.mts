@@ -50,7 +50,13 @@ export default defineConfig({
             { text: '获取所有任务', link: '/api/tasks/get-all-tasks' },
             { text: '获取已完成任务', link: '/api/tasks/get-completed-tasks' },
             { text: '获取垃圾桶任务', link: '/api/tasks/get-trash-tasks' },
-            { text: '获取任务统计', link: '/api/tasks/get-tasks-summary' }
+            { text: '获取任务统计', link: '/api/tasks/get-tasks-summary' },
+            { text: '搜索任务', link: '/api/tasks/search-tasks' },
+            { text: '获取任务层级', link: '/api/tasks/get-task-hierarchy' },
+            { text: '获取时间窗口内的任务', link: '/api/tasks/get-tasks-window' },
+            { text: '按标签/项目获取任务', link: '/api/tasks/get-tasks-by-group' },
+            { text: '获取任务变化', link: '/api/tasks/get-task-changes' },
+            { text: '订阅任务变化', link: '/api/tasks/task-events' }
           ]
         },
         {
@@ -74,6 +80,8 @@ export default defineConfig({
           collapsed: false,
           items: [
             { text: '获取番茄专注概览', link: '/api/pomodoros' },
+            { text: '获取专注看板数据', link: '/api/pomodoros/focus-dashboard' },
+            { text: '获取本地专注统计', link: '/api/pomodoros/focus-analytics' },
             { text: '番茄钟控制接口', link: '/api/pomodoros/focus-operations' },
             { text: '番茄钟自动化操作', link: '/api/pomodoros/focus-control-shortcuts' }
           ]
@@ -110,7 +118,8 @@ export default defineConfig({
           collapsed: false,
           items: [
             { text: '导出任务到Excel', link: '/api/custom/export-tasks-excel' },
-            { text: '导出专注记录到Excel', link: '/api/custom/export-focus-excel' }
+            { text: '导出专注记录到Excel', link: '/api/custom/export-focus-excel' },
+            { text: '批量调用接口', link: '/api/custom/batch' }
           ]
         }
       ]
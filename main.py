@@ -7,9 +7,12 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
-from core import config, db
-from routers import auth, tasks, system, projects, statistics, pomodoros, habits, users, export
-from services import wechat_service
+from core import config, db, response_cache
+from core.compression import CompressionMiddleware, compression_options
+from core.responses import default_response_class
+from routers import auth, tasks, system, projects, statistics, pomodoros, habits, users, export, batch
+from services import sync_scheduler, task_watcher, wechat_service
+from services.sync_scheduler import ActivityMiddleware
 from utils import app_logger
 
 
@@ -23,10 +26,21 @@ async def lifespan(app: FastAPI):
     db.init_database()
     app_logger.info("数据库初始化完成")
 
+    # 从磁盘恢复响应缓存
+    restored = await response_cache.start_persistence()
+    app_logger.info(f"响应缓存已恢复，共 {restored} 条")
+
+    # 启动后台同步
+    if config.get('sync_scheduler.enabled', True):
+        sync_scheduler.start()
+
     yield
 
     # 关闭时执行
     app_logger.info("滴答清单API服务关闭中...")
+    await sync_scheduler.stop()
+    await task_watcher.stop()
+    await response_cache.stop_persistence()
     await wechat_service.close()
     app_logger.info("服务已关闭")
 
@@ -47,6 +61,7 @@ app = FastAPI(
     """,
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=default_response_class(),
     lifespan=lifespan
 )
 
@@ -59,6 +74,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 添加响应压缩中间件（按 Accept-Encoding 协商 zstd / brotli / gzip）
+compression_enabled, compression_kwargs = compression_options()
+if compression_enabled:
+    app.add_middleware(CompressionMiddleware, **compression_kwargs)
+
+# 记录用户活动，后台同步按活动情况调整刷新频率
+app.add_middleware(ActivityMiddleware, scheduler=sync_scheduler)
+
 # 创建静态文件目录
 static_dir = "static"
 if not os.path.exists(static_dir):
@@ -78,6 +101,7 @@ app.include_router(habits.router)
 app.include_router(users.router)
 app.include_router(export.router)
 app.include_router(system.router)
+app.include_router(batch.router)
 
 
 @app.get("/", summary="根路径", description="API服务根路径，返回基本信息")
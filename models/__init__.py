@@ -9,6 +9,7 @@ from .base import (
     ApiResponse,
     TaskItem,
     TasksResponse,
+    CompactTask,
     AuthSession,
     # 项目管理相关模型
     ProjectItem,
@@ -27,7 +28,10 @@ from .base import (
     FocusControlOptions,
     FocusStopOptions,
     # 习惯管理相关模型
-    HabitItem
+    HabitItem,
+    # 批量请求相关模型
+    BatchOperation,
+    BatchRequest
 )
 
 __all__ = [
@@ -40,6 +44,7 @@ __all__ = [
     'ApiResponse',
     'TaskItem',
     'TasksResponse',
+    'CompactTask',
     'AuthSession',
     # 项目管理相关模型
     'ProjectItem',
@@ -58,5 +63,8 @@ __all__ = [
     'FocusControlOptions',
     'FocusStopOptions',
     # 习惯管理相关模型
-    'HabitItem'
+    'HabitItem',
+    # 批量请求相关模型
+    'BatchOperation',
+    'BatchRequest'
 ]
@@ -1,8 +1,10 @@
 """数据模型定义"""
 from datetime import datetime, timezone, timedelta
-from typing import Optional, Union
+from typing import Any, Dict, List, Optional, Union
 from pydantic import BaseModel, Field, ConfigDict
 
+from utils.interning import ValuePool
+
 # 中国时区
 CHINA_TZ = timezone(timedelta(hours=8))
 
@@ -86,6 +88,94 @@ class TasksResponse(BaseModel):
     raw_response: Optional[Union[dict, list]] = Field(None, description="原始响应数据")
 
 
+class CompactTask:
+    """
+    紧凑的任务表示
+
+    滴答清单的原始任务是约45个键的字典，统计、索引等场景只用到其中一部分字段。
+    CompactTask 使用 __slots__ 只保存这些字段，列表字段转换为元组，
+    大量任务常驻内存时占用明显低于原始字典。
+
+    创建时传入 ValuePool，取值重复度高的字段（项目ID、时区、标签等）会共享同一个对象。
+    """
+
+    # (属性名, 原始字段名)
+    FIELDS = (
+        ('id', 'id'),
+        ('project_id', 'projectId'),
+        ('parent_id', 'parentId'),
+        ('child_ids', 'childIds'),
+        ('title', 'title'),
+        ('content', 'content'),
+        ('desc', 'desc'),
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('progress', 'progress'),
+        ('deleted', 'deleted'),
+        ('tags', 'tags'),
+        ('kind', 'kind'),
+        ('sort_order', 'sortOrder'),
+        ('column_id', 'columnId'),
+        ('start_date', 'startDate'),
+        ('due_date', 'dueDate'),
+        ('completed_time', 'completedTime'),
+        ('created_time', 'createdTime'),
+        ('modified_time', 'modifiedTime'),
+        ('time_zone', 'timeZone'),
+        ('is_all_day', 'isAllDay'),
+        ('is_floating', 'isFloating'),
+        ('repeat_flag', 'repeatFlag'),
+        ('repeat_from', 'repeatFrom'),
+        ('etag', 'etag'),
+    )
+    TUPLE_FIELDS = ('child_ids', 'tags')
+    # 取值种类少、在任务间大量重复的字段
+    SHARED_FIELDS = ('project_id', 'kind', 'column_id', 'time_zone', 'repeat_flag', 'repeat_from')
+
+    __slots__ = tuple(attr for attr, _ in FIELDS)
+
+    def __init__(self, **values: Any):
+        for attr, _ in self.FIELDS:
+            setattr(self, attr, values.get(attr))
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], pool: Optional[ValuePool] = None) -> "CompactTask":
+        """
+        从滴答清单原始任务字典创建，只读取需要的字段
+
+        Args:
+            data: 原始任务字典
+            pool: 共享重复值的 ValuePool，为 None 时不共享
+        """
+        task = cls.__new__(cls)
+        for attr, key in cls.FIELDS:
+            setattr(task, attr, data.get(key))
+        for attr in cls.TUPLE_FIELDS:
+            setattr(task, attr, tuple(getattr(task, attr) or ()))
+        if pool is not None:
+            for attr in cls.SHARED_FIELDS:
+                setattr(task, attr, pool(getattr(task, attr)))
+            task.tags = pool.tuple(task.tags)
+        return task
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换回滴答清单原始字段名的字典，省略空值"""
+        data = {}
+        for attr, key in self.FIELDS:
+            value = getattr(self, attr)
+            if value is None:
+                continue
+            data[key] = list(value) if attr in self.TUPLE_FIELDS else value
+        return data
+
+    @property
+    def is_completed(self) -> bool:
+        return self.status == 2
+
+    def __repr__(self) -> str:
+        return f"CompactTask(id={self.id!r}, title={self.title!r}, status={self.status!r})"
+
+
 class AuthSession(BaseModel):
     """认证会话模型"""
     session_id: str = Field(..., description="会话ID")
@@ -433,3 +523,33 @@ class HabitWeekStatisticsResponse(BaseModel):
     message: str = Field(..., description="响应消息")
     week_statistics: Optional[dict] = Field(None, description="本周打卡统计")
     raw_response: Optional[Union[dict, list]] = Field(None, description="原始响应数据")
+
+
+# ================================
+# 批量请求相关模型
+# ================================
+
+class BatchOperation(BaseModel):
+    """批量请求中的单个接口调用"""
+    id: Optional[str] = Field(None, description="调用标识，结果中原样返回，默认为 path")
+    path: str = Field(..., description="本服务的 GET 接口路径，例如 /users/profile")
+    params: Dict[str, Any] = Field(default_factory=dict, description="查询参数")
+
+
+class BatchRequest(BaseModel):
+    """批量请求模型"""
+    model_config = ConfigDict(
+        json_schema_extra={
+            "example": {
+                "operations": [
+                    {"id": "profile", "path": "/users/profile"},
+                    {"id": "projects", "path": "/projects/all"},
+                    {"id": "summary", "path": "/tasks/summary"},
+                    {"id": "habits", "path": "/habits/statistics/week/current"},
+                    {"id": "focus", "path": "/pomodoros/general"}
+                ]
+            }
+        }
+    )
+
+    operations: List[BatchOperation] = Field(..., min_length=1, description="要执行的接口调用列表")
@@ -1,4 +1,4 @@
 # 路由模块初始化文件
-from . import auth, tasks, projects, statistics, pomodoros, habits, users, export, system
+from . import auth, tasks, projects, statistics, pomodoros, habits, users, export, system, batch
 
-__all__ = ['auth', 'tasks', 'projects', 'statistics', 'pomodoros', 'habits', 'users', 'export', 'system']
+__all__ = ['auth', 'tasks', 'projects', 'statistics', 'pomodoros', 'habits', 'users', 'export', 'system', 'batch']
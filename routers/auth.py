@@ -1,12 +1,13 @@
 """认证相关API路由"""
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
+from core.responses import FastJSONRoute
 from models import WeChatQRResponse, WeChatValidateResponse, ApiResponse, PasswordLoginRequest
 from services import wechat_service
 from utils import app_logger
 import os
 
-router = APIRouter(prefix="/auth", tags=["认证"])
+router = APIRouter(prefix="/auth", tags=["认证"], route_class=FastJSONRoute)
 
 
 @router.get("/wechat/login",
@@ -0,0 +1,138 @@
+"""批量请求API路由"""
+import asyncio
+import posixpath
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+import httpx
+from fastapi import APIRouter, Request
+from fastapi.responses import Response
+
+from core import config
+from core.responses import FastJSONRoute, render_json
+from models import BatchOperation, BatchRequest
+from utils import app_logger
+
+router = APIRouter(prefix="/batch", tags=["批量请求"], route_class=FastJSONRoute)
+
+batch_config = config.get('batch', {})
+
+# 流式推送和文件下载接口：ASGITransport 会先缓冲完整的响应体（SSE 永远不会结束），直接拒绝
+_STREAMING_PATHS = frozenset({
+    "/tasks/events",
+    "/habits/export",
+    "/custom/export/tasks/excel",
+    "/custom/export/focus/excel",
+})
+
+
+def _route_path(path: str) -> str:
+    """调用路径实际匹配的路由：去掉查询参数，解码 %XX，合并重复的 /，解析 . 和 ..，去掉结尾的 /"""
+    route = unquote(path.split("?", 1)[0])
+    return posixpath.normpath(re.sub(r"/{2,}", "/", route))
+
+
+def _validate_path(path: str) -> Optional[str]:
+    """检查调用路径，返回错误信息"""
+    if not path.startswith("/") or path.startswith("//"):
+        return "path 必须是以 / 开头的本服务接口路径"
+    route = _route_path(path)
+    if route == "/batch" or route.startswith("/batch/"):
+        return "不支持嵌套批量请求"
+    if route in _STREAMING_PATHS:
+        return "不支持流式推送或文件下载接口"
+    return None
+
+
+async def _run_operation(client: httpx.AsyncClient, operation: BatchOperation,
+                         semaphore: asyncio.Semaphore, timeout: float) -> Tuple[Dict[str, Any], Optional[bytes]]:
+    """
+    执行一个接口调用
+
+    Returns:
+        Tuple[Dict[str, Any], Optional[bytes]]: (调用信息, 响应体原始 JSON 字节)
+    """
+    meta: Dict[str, Any] = {"id": operation.id or operation.path, "path": operation.path}
+    body = None
+    started = time.perf_counter()
+
+    error = _validate_path(operation.path)
+    if error:
+        meta.update(status=400, error=error)
+    else:
+        try:
+            async with semaphore:
+                response = await asyncio.wait_for(
+                    client.get(operation.path, params=operation.params), timeout=timeout
+                )
+            meta["status"] = response.status_code
+            content_type = response.headers.get("content-type", "")
+            if response.content and "json" in content_type:
+                body = response.content
+            elif response.content:
+                meta["error"] = f"不支持的响应类型: {content_type}"
+        except asyncio.TimeoutError:
+            meta.update(status=504, error=f"调用超时（{timeout} 秒）")
+        except Exception as e:
+            app_logger.error(f"批量请求调用 {operation.path} 时发生错误: {e}")
+            meta.update(status=500, error=f"服务器内部错误: {str(e)}")
+
+    meta["took_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return meta, body
+
+
+def _render_results(results: List[Tuple[Dict[str, Any], Optional[bytes]]], took_ms: float) -> bytes:
+    """拼接批量响应，各接口的响应体按原始字节嵌入，不重新解析和序列化"""
+    items = [
+        render_json(meta)[:-1] + b',"body":' + (body if body is not None else b"null") + b"}"
+        for meta, body in results
+    ]
+    head = render_json({"count": len(results), "took_ms": took_ms})[:-1]
+    return head + b',"results":[' + b",".join(items) + b"]}"
+
+
+@router.post("",
+            summary="批量调用接口",
+            description="一次请求并发执行多个本服务的 GET 接口，返回每个调用的状态、耗时和响应")
+async def run_batch(batch: BatchRequest, request: Request):
+    """
+    批量调用接口
+
+    看板类页面通常需要同时请求 /users/profile、/projects/all、/tasks/summary、
+    /habits/statistics/week/current、/pomodoros/general 等多个接口，
+    使用本接口时客户端只需一次往返：
+
+    - 各调用在服务内部并发执行（最多 [batch] max_concurrency 个），共享上游连接池、缓存和限流
+    - 结果按请求顺序返回，每项包含 id、path、status（HTTP 状态码）、took_ms 和 body（接口原始响应）
+    - 单个调用失败或超时（[batch] timeout 秒）不影响其他调用
+    - 只支持 GET 接口，且响应需为 JSON；不支持嵌套调用 /batch，也不支持 /tasks/events 等流式推送和文件下载接口
+
+    **注意**: 各接口的认证要求与单独调用时相同
+    """
+    max_operations = batch_config.get('max_operations', 20)
+    if len(batch.operations) > max_operations:
+        return {"error": "too_many_operations", "message": f"一次最多执行 {max_operations} 个调用"}
+
+    try:
+        started = time.perf_counter()
+        app_logger.info(f"请求批量调用，共 {len(batch.operations)} 个: {[op.path for op in batch.operations]}")
+
+        semaphore = asyncio.Semaphore(batch_config.get('max_concurrency', 8))
+        timeout = batch_config.get('timeout', 30)
+        transport = httpx.ASGITransport(app=request.app)
+        # 内部调用不需要压缩响应
+        async with httpx.AsyncClient(transport=transport, base_url="http://batch.internal",
+                                     headers={"Accept-Encoding": "identity"}) as client:
+            results = await asyncio.gather(*(
+                _run_operation(client, operation, semaphore, timeout) for operation in batch.operations
+            ))
+
+        took_ms = round((time.perf_counter() - started) * 1000, 1)
+        app_logger.info(f"批量调用完成，共 {len(results)} 个，耗时 {took_ms}ms")
+        return Response(_render_results(results, took_ms), media_type="application/json")
+
+    except Exception as e:
+        app_logger.error(f"批量调用时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
@@ -1,13 +1,14 @@
 """自定义导出功能API路由"""
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
+from core.responses import FastJSONRoute
 import io
 import urllib.parse
 from services.export_service import export_service
 from services.dida_service import dida_service
 from utils import app_logger
 
-router = APIRouter(prefix="/custom", tags=["自定义接口"])
+router = APIRouter(prefix="/custom", tags=["自定义接口"], route_class=FastJSONRoute)
 
 
 @router.get("/export/tasks/excel",
@@ -118,10 +119,10 @@ async def get_export_info():
         
         # 获取全部任务统计
         try:
-            all_tasks_result = await dida_service.get_all_tasks()
-            if all_tasks_result and 'error' not in all_tasks_result:
-                tasks = all_tasks_result.get('syncTaskBean', {}).get('update', [])
-                stats["all_tasks_count"] = len(tasks)
+            async with dida_service.stream_all_tasks() as tasks:
+                async for _ in tasks:
+                    pass
+                stats["all_tasks_count"] = tasks.count
         except Exception as e:
             app_logger.warning(f"获取全部任务统计失败: {e}")
         
@@ -1,17 +1,22 @@
 """习惯管理相关API路由"""
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Header
 from fastapi.responses import Response
+from core.responses import FastJSONRoute
+from core.payload import UpstreamPayload
 # 不再需要响应模型导入
 from services import habit_service, dida_service
 from utils import app_logger
 
-router = APIRouter(prefix="/habits", tags=["习惯管理"])
+router = APIRouter(prefix="/habits", tags=["习惯管理"], route_class=FastJSONRoute)
 
 
 @router.get("/all",
            summary="获取所有习惯",
            description="获取当前用户的所有习惯列表")
-async def get_all_habits():
+async def get_all_habits(
+    if_none_match: Optional[str] = Header(None, description="上次响应的 ETag，数据未变化时返回 304")
+):
     """
     获取所有习惯
     
@@ -19,6 +24,9 @@ async def get_all_habits():
     - 习惯ID、名称、图标、颜色
     - 习惯状态、激励语句、总打卡次数
     - 创建时间、修改时间、类型、目标值等信息
+
+    响应体为滴答清单返回的原始字节，不经过解析和重新序列化。
+    响应带有 ETag，请求携带 If-None-Match 且数据未变化时返回 304。
     
     **注意**: 需要先完成微信登录获取认证会话
     """
@@ -36,7 +44,12 @@ async def get_all_habits():
         csrf_token = current_session['csrf_token']
         
         # 调用习惯服务
-        result = await habit_service.get_habits(auth_token, csrf_token)
+        result = await habit_service.get_habits(auth_token, csrf_token, raw=True)
+
+        if isinstance(result, UpstreamPayload):
+            app_logger.info(f"习惯获取完成，响应大小: {result.size} 字节")
+            # 直接返回原始响应，数据未变化时返回 304
+            return result.to_response(if_none_match)
         
         if not result:
             return {"error": "service_error", "message": "获取习惯列表失败，请稍后重试"}
@@ -4,8 +4,10 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import APIRouter, Depends, Query
+from core import config
+from core.responses import FastJSONRoute
 
-from services import pomodoro_service, dida_service
+from services import pomodoro_service, dida_service, focus_archive
 from models import (
     FocusStartOptions,
     FocusControlOptions,
@@ -13,8 +15,8 @@ from models import (
 )
 from utils import app_logger
 
-pomodoro_router = APIRouter(prefix="/pomodoros", tags=["番茄专注"])
-stopwatch_router = APIRouter(prefix="/pomodoros", tags=["正计时专注"])
+pomodoro_router = APIRouter(prefix="/pomodoros", tags=["番茄专注"], route_class=FastJSONRoute)
+stopwatch_router = APIRouter(prefix="/pomodoros", tags=["正计时专注"], route_class=FastJSONRoute)
 
 
 router = pomodoro_router
@@ -77,6 +79,118 @@ async def get_pomodoro_general():
         return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
 
 
+@pomodoro_router.get("/dashboard",
+           summary="获取专注看板数据",
+           description="并发获取概览、详情分布、热力图、时间分布和按小时分布，一次返回专注页面需要的全部数据")
+async def get_focus_dashboard(
+    start_date: str = Query(..., description="开始日期，格式: YYYYMMDD", example="20250601"),
+    end_date: str = Query(..., description="结束日期，格式: YYYYMMDD", example="20250630")
+):
+    """
+    获取专注看板数据
+
+    相当于同时调用以下接口（同一日期范围）：
+    - /pomodoros/general → general
+    - /pomodoros/distribution → distribution
+    - /pomodoros/heatmap → heatmap
+    - /pomodoros/time-distribution → time_distribution
+    - /pomodoros/hour-distribution → hour_distribution
+
+    各部分并发请求并沿用单独接口的缓存。超过 [pomodoro_dashboard] part_timeout 秒仍未完成的部分
+    返回 timeout 错误，不影响其他部分；parts 中记录每部分的状态（ok / error / timeout）和耗时。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取专注看板数据，日期范围: {start_date} - {end_date}")
+
+        # 验证日期格式
+        try:
+            datetime.strptime(start_date, "%Y%m%d")
+            datetime.strptime(end_date, "%Y%m%d")
+        except ValueError:
+            return {"error": "invalid_date_format", "message": "日期格式错误，请使用 YYYYMMDD 格式"}
+
+        tokens, error = _get_auth_tokens()
+        if error:
+            return error
+        auth_token, csrf_token = tokens
+
+        result = await pomodoro_service.get_focus_dashboard(
+            auth_token, csrf_token, start_date, end_date,
+            part_timeout=config.get('pomodoro_dashboard.part_timeout', 10),
+        )
+
+        failed = [name for name, part in result["parts"].items() if part["status"] != "ok"]
+        if failed:
+            app_logger.info(f"专注看板数据获取完成，未成功的部分: {failed}，耗时 {result['took_ms']}ms")
+        else:
+            app_logger.info(f"专注看板数据获取完成，耗时 {result['took_ms']}ms")
+
+        return result
+
+    except Exception as e:
+        app_logger.error(f"获取专注看板数据时发生未知错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@pomodoro_router.get("/analytics",
+           summary="获取本地专注统计",
+           description="根据本地同步的专注记录计算热力图、时段分布和任务/项目分布，支持自定义桶大小")
+async def get_focus_analytics(
+    start_date: str = Query(..., description="开始日期，格式: YYYYMMDD", example="20250101"),
+    end_date: str = Query(..., description="结束日期，格式: YYYYMMDD", example="20251231"),
+    bucket_days: int = Query(1, description="热力图每个桶的天数，如 7 为按周汇总", example=7),
+    bucket_minutes: int = Query(60, description="时段分布每个桶的分钟数，需能整除 1440", example=30),
+    refresh: bool = Query(False, description="是否立即从上游同步最新的专注记录")
+):
+    """
+    获取本地专注统计
+
+    专注记录时间线增量同步到本地存档后，由本地计算以下统计（时长单位为分钟）：
+    - heatmap: 每 bucket_days 天的专注时长（对应 /pomodoros/heatmap）
+    - clock: 一天内每 bucket_minutes 分钟的专注时长（对应 /pomodoros/hour-distribution）
+    - clock_by_day: 每天、每个时段的专注时长（对应 /pomodoros/time-distribution）
+    - tasks / projects: 按任务、项目汇总的专注时长（对应 /pomodoros/distribution）
+
+    跨越零点或桶边界的专注按实际时间拆分到各个桶。存档超过 [focus_archive] max_age 秒时先同步上游，
+    通常只需请求一页时间线；archive 中返回存档的记录数、是否已同步全部历史等状态。
+
+    **注意**: 需要先完成微信登录获取认证会话；首次调用会同步全部历史记录，耗时较长
+    """
+    try:
+        app_logger.info(f"请求获取本地专注统计，日期范围: {start_date} - {end_date}，"
+                        f"桶大小: {bucket_days} 天 / {bucket_minutes} 分钟")
+
+        # 验证日期格式
+        try:
+            datetime.strptime(start_date, "%Y%m%d")
+            datetime.strptime(end_date, "%Y%m%d")
+        except ValueError:
+            return {"error": "invalid_date_format", "message": "日期格式错误，请使用 YYYYMMDD 格式"}
+
+        tokens, error = _get_auth_tokens()
+        if error:
+            return error
+        auth_token, csrf_token = tokens
+
+        result = await focus_archive.get_focus_analytics(
+            auth_token, csrf_token, start_date, end_date,
+            bucket_days=bucket_days, bucket_minutes=bucket_minutes, refresh=refresh,
+        )
+
+        if 'error' in result:
+            app_logger.info(f"本地专注统计获取失败: {result.get('error')}")
+        else:
+            app_logger.info(f"本地专注统计获取完成，存档记录 {result['archive']['records']} 条")
+
+        return result
+
+    except Exception as e:
+        app_logger.error(f"获取本地专注统计时发生未知错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
 @stopwatch_router.get("/distribution",
            summary="获取专注详情分布",
            description="获取指定日期范围内的专注时长分布统计")
@@ -1,15 +1,21 @@
 """清单管理相关API路由"""
-from fastapi import APIRouter
+from typing import Optional
+from fastapi import APIRouter, Query, Header
+from core.responses import FastJSONRoute
+from core.payload import UpstreamPayload
 from services import project_service, dida_service
 from utils import app_logger
 
-router = APIRouter(prefix="/projects", tags=["清单管理"])
+router = APIRouter(prefix="/projects", tags=["清单管理"], route_class=FastJSONRoute)
 
 
 @router.get("/all",
            summary="获取所有项目/清单",
            description="获取当前用户的所有项目/清单列表")
-async def get_all_projects():
+async def get_all_projects(
+    refresh: bool = Query(False, description="跳过缓存，强制从滴答清单获取最新数据"),
+    if_none_match: Optional[str] = Header(None, description="上次响应的 ETag，数据未变化时返回 304")
+):
     """
     获取所有项目/清单
     
@@ -18,6 +24,11 @@ async def get_all_projects():
     - 项目权限、类型、用户数量
     - 创建时间、修改时间等信息
     
+    - **refresh**: 为 true 时跳过缓存，强制从滴答清单获取最新数据
+
+    响应体为滴答清单返回的原始字节，不经过解析和重新序列化。
+    响应带有 ETag，请求携带 If-None-Match 且数据未变化时返回 304。
+
     **注意**: 需要先完成微信登录获取认证会话
     """
     try:
@@ -34,7 +45,12 @@ async def get_all_projects():
         csrf_token = current_session['csrf_token']
 
         # 调用项目服务
-        result = await project_service.get_projects(auth_token, csrf_token)
+        result = await project_service.get_projects(auth_token, csrf_token, refresh=refresh, raw=True)
+
+        if isinstance(result, UpstreamPayload):
+            app_logger.info(f"项目获取完成，响应大小: {result.size} 字节")
+            # 直接返回原始响应，数据未变化时返回 304
+            return result.to_response(if_none_match)
 
         if not result:
             return {"error": "service_error", "message": "获取项目列表失败，请稍后重试"}
@@ -1,10 +1,11 @@
 """统计相关API路由"""
 from fastapi import APIRouter, Query
+from core.responses import FastJSONRoute
 from datetime import datetime
 from services import statistics_service, dida_service
 from utils import app_logger
 
-router = APIRouter(prefix="/statistics", tags=["统计分析"])
+router = APIRouter(prefix="/statistics", tags=["统计分析"], route_class=FastJSONRoute)
 
 
 @router.get("/ranking",
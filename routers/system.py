@@ -1,11 +1,19 @@
 """系统相关API路由"""
 from fastapi import APIRouter
+from core.responses import FastJSONRoute
 from typing import Dict, Any
-from core import urls
+from core import urls, response_cache
+from core.circuit_breaker import circuit_breakers
+from core.rate_limiter import rate_limiter
+from core.retry import retry_manager
 from models import ApiResponse
+from services import (
+    task_store, task_search_index, hierarchy_index, interval_index, tag_index, project_index, task_watcher,
+    sync_scheduler, focus_archive
+)
 from utils import app_logger
 
-router = APIRouter(prefix="/system", tags=["系统管理"])
+router = APIRouter(prefix="/system", tags=["系统管理"], route_class=FastJSONRoute)
 
 
 @router.get("/urls",
@@ -178,6 +186,21 @@ async def get_system_info() -> ApiResponse:
                     "total_api_endpoints": len(urls.DIDA_AUTH_APIS) + len(urls.DIDA_TASK_APIS) + len(urls.DIDA_PROJECT_APIS) + len(urls.DIDA_STATISTICS_APIS) + len(urls.DIDA_POMODORO_APIS) + len(urls.DIDA_HABIT_APIS),
                     "management_file": "core/urls.py"
                 },
+                "response_cache": response_cache.stats(),
+                "rate_limiter": rate_limiter.stats(),
+                "retry": retry_manager.stats(),
+                "circuit_breakers": circuit_breakers.stats(),
+                "task_store": {
+                    **task_store.stats(),
+                    "search": task_search_index.stats(),
+                    "hierarchy": hierarchy_index.stats(),
+                    "intervals": interval_index.stats(),
+                    "tags": tag_index.stats(),
+                    "projects": project_index.stats(),
+                    "watcher": task_watcher.stats(),
+                },
+                "sync_scheduler": sync_scheduler.stats(),
+                "focus_archive": focus_archive.stats(),
                 "config": {
                     "app": config.app,
                     "request_config": config.get('request_config', {}),
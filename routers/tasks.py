@@ -1,11 +1,23 @@
 """任务相关API路由"""
-from fastapi import APIRouter, HTTPException, Query, Body
+from fastapi import APIRouter, HTTPException, Query, Body, Header
+from fastapi.responses import StreamingResponse
+from core.responses import FastJSONRoute, render_json
 from typing import Optional
+from core.payload import UpstreamPayload
 from models import ApiResponse
+from core import config
 from services import dida_service
-from utils import app_logger
+from services.task_search import search_tasks
+from services.task_store import task_store
+from services.task_watcher import task_watcher
+from services.task_indexes import (
+    get_ancestors, get_project_counts, get_project_tasks, get_subtree, get_summary, get_tag_counts, get_tag_tasks,
+    get_window
+)
+from utils import TaskQuery, app_logger
+from utils.task_query import parse_query_time
 
-router = APIRouter(prefix="/tasks", tags=["任务管理"])
+router = APIRouter(prefix="/tasks", tags=["任务管理"], route_class=FastJSONRoute)
 
 
 @router.post("/set-auth",
@@ -56,8 +68,17 @@ async def set_auth_session(
 
 @router.get("/all",
            summary="获取所有任务",
-           description="获取当前用户的所有任务列表")
-async def get_all_tasks():
+           description="获取当前用户的所有任务列表，支持字段投影和服务端筛选")
+async def get_all_tasks(
+    fields: Optional[str] = Query(None, description="只返回指定字段，逗号分隔，例如 id,title,status（总是包含 id）"),
+    project_id: Optional[str] = Query(None, alias="projectId", description="按项目ID筛选，多个用逗号分隔"),
+    status: Optional[str] = Query(None, description="按状态筛选：0=未完成，2=已完成，-1=已放弃，多个用逗号分隔"),
+    tag: Optional[str] = Query(None, description="按标签筛选（不区分大小写），多个用逗号分隔，任一匹配即可"),
+    priority: Optional[str] = Query(None, description="按优先级筛选：0=无，1=低，3=中，5=高，多个用逗号分隔"),
+    due_from: Optional[str] = Query(None, description="截止时间不早于，格式：YYYYMMDD、YYYY-MM-DD 或 ISO 8601"),
+    due_to: Optional[str] = Query(None, description="截止时间不晚于，格式同 due_from，只有日期时包含当天"),
+    if_none_match: Optional[str] = Header(None, description="上次响应的 ETag，数据未变化时返回 304")
+):
     """
     获取所有任务
     
@@ -67,23 +88,38 @@ async def get_all_tasks():
     - 优先级、创建时间、修改时间
     - 项目ID、标签等信息
     
+    不带查询参数时，响应体为滴答清单返回的原始字节，不经过解析和重新序列化。
+
+    带有 fields 或筛选参数时，在服务端流式遍历任务，只保留匹配的任务和指定字段，
+    响应结构与原始响应一致（syncTaskBean.update 为筛选后的任务）。
+    多个筛选条件同时满足才匹配，设置了截止时间窗口时没有截止时间的任务不匹配。
+
+    响应带有 ETag，请求携带 If-None-Match 且数据未变化时返回 304。
+
     **注意**: 需要先调用 `/tasks/set-auth` 设置认证会话
     """
     try:
+        try:
+            query = TaskQuery.from_params(fields, project_id, status, tag, priority, due_from, due_to)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"查询参数错误: {e}")
+
+        if not query.is_empty:
+            return await _query_all_tasks(query, if_none_match)
+
         app_logger.info("请求获取所有任务")
         
-        result = await dida_service.get_all_tasks()
+        result = await dida_service.get_all_tasks(raw=True)
+
+        if isinstance(result, UpstreamPayload):
+            app_logger.info(f"任务获取完成，响应大小: {result.size} 字节")
+            # 直接返回原始响应，数据未变化时返回 304
+            return result.to_response(if_none_match)
 
         if not result:
             return {"error": "获取任务失败，请稍后重试"}
 
-        # 记录日志
-        if 'error' in result:
-            app_logger.info(f"获取任务失败: {result.get('error')}")
-        else:
-            app_logger.info(f"任务获取完成")
-
-        # 直接返回原始响应
+        app_logger.info(f"获取任务失败: {result.get('error')}")
         return result
         
     except HTTPException:
@@ -96,6 +132,30 @@ async def get_all_tasks():
         )
 
 
+async def _query_all_tasks(query: TaskQuery, if_none_match: Optional[str]):
+    """流式遍历所有任务，按条件筛选并投影字段"""
+    app_logger.info("请求获取所有任务（服务端筛选）")
+
+    if not dida_service.get_session_status()["has_session"]:
+        return {"error": "no_auth_session", "message": "未设置认证会话，请先登录"}
+
+    matched = []
+    try:
+        async with dida_service.stream_all_tasks() as tasks:
+            async for task in tasks:
+                if query.matches(task):
+                    matched.append(query.project(task))
+            rest = tasks.rest
+    except Exception as e:
+        app_logger.info(f"获取任务失败: {e}")
+        return {"error": str(e)}
+
+    rest.setdefault('syncTaskBean', {})['update'] = matched
+    payload = UpstreamPayload(render_json(rest))
+    app_logger.info(f"任务筛选完成，匹配任务数: {len(matched)}/{tasks.count}，响应大小: {payload.size} 字节")
+    return payload.to_response(if_none_match)
+
+
 @router.get("/summary",
            response_model=ApiResponse,
            summary="获取任务统计",
@@ -109,44 +169,24 @@ async def get_tasks_summary() -> ApiResponse:
     - 已完成任务数
     - 未完成任务数
     - 完成率等
+    - 按项目（by_project）、按优先级（by_priority）的任务数
+
+    计数随任务同步增量维护，读取不需要遍历任务，可以每隔几秒轮询；
+    数据超过 [task_store] max_age 秒时先同步。
     """
     try:
         app_logger.info("请求获取任务统计")
-        
-        result = await dida_service.get_all_tasks()
-
-        if not result or "error" in result:
-            return {"error": "获取任务统计失败", "details": result}
-
-        # 统计任务信息 - 从原始响应中提取
-        total_tasks = 0
-        completed_tasks = 0
-        pending_tasks = 0
-
-        # 解析原始响应数据
-        if isinstance(result, dict) and 'syncTaskBean' in result:
-            task_data = result['syncTaskBean']
-            if 'update' in task_data:
-                raw_tasks = task_data['update']
-                total_tasks = len(raw_tasks)
-
-                for task in raw_tasks:
-                    if task.get('status') == 2:  # 已完成
-                        completed_tasks += 1
-                    else:  # 未完成
-                        pending_tasks += 1
-
-        completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-        
+
+        try:
+            summary = await get_summary()
+        except Exception as e:
+            app_logger.info(f"获取任务统计失败: {e}")
+            return {"error": "获取任务统计失败", "details": {"error": str(e)}}
+
         return ApiResponse(
             code=200,
             message="获取任务统计成功",
-            data={
-                "total_tasks": total_tasks,
-                "completed_tasks": completed_tasks,
-                "pending_tasks": pending_tasks,
-                "completion_rate": round(completion_rate, 2)
-            }
+            data=summary
         )
 
     except HTTPException:
@@ -159,6 +199,151 @@ async def get_tasks_summary() -> ApiResponse:
         )
 
 
+@router.get("/search",
+           summary="搜索任务",
+           description="在本地全文索引中搜索任务标题、内容和检查项，结果按相关度排序")
+async def search_all_tasks(
+    q: str = Query(..., min_length=1, description="搜索关键词，多个关键词用空格分隔，需全部匹配"),
+    limit: int = Query(config.get('task_store.search_limit', 20), ge=1, le=200, description="返回条数")
+):
+    """
+    搜索任务
+
+    在本地 SQLite FTS5 索引中搜索，索引由任务同步增量维护（数据超过
+    [task_store] max_age 秒时先同步）：
+    - 中文按二元组分词，可以搜索词语的任意部分
+    - 英文不区分大小写，最后一个单词按前缀匹配
+    - 标题匹配的权重高于检查项和内容
+
+    返回的每个任务包含 score（相关度得分，越高越相关）。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求搜索任务: {q}")
+        result = await search_tasks(q, limit)
+        app_logger.info(f"任务搜索完成，结果数: {result['count']}，耗时: {result['took_ms']}ms")
+        return result
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"搜索任务时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/window",
+           summary="获取时间窗口内的任务",
+           description="获取开始/截止时间区间与指定时间窗口重叠的任务，适用于日历视图")
+async def get_tasks_in_window(
+    window_from: str = Query(..., alias="from", description="窗口开始，格式：YYYYMMDD、YYYY-MM-DD 或 ISO 8601"),
+    window_to: str = Query(..., alias="to", description="窗口结束，格式同 from，只有日期时包含当天")
+):
+    """
+    获取时间窗口内的任务
+
+    从本地区间索引中查询 startDate..dueDate 与窗口重叠的任务，按开始时间排序：
+    - 只有开始时间或截止时间的任务按单个时间点计算，都没有的任务不返回
+    - 重复任务使用当前或下一次重复的时间（按任务时区展开重复规则）
+    - 每个任务带有 occurrenceStart / occurrenceEnd，表示参与匹配的时间区间
+
+    只有日期的参数按中国时区的整天计算。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        try:
+            window_start = parse_query_time(window_from)
+            window_end = parse_query_time(window_to, end_of_day=True)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"时间格式错误: {e}")
+        if window_start > window_end:
+            raise HTTPException(status_code=400, detail="from 不能晚于 to")
+
+        app_logger.info(f"请求获取时间窗口内的任务: {window_from} ~ {window_to}")
+        result = await get_window(window_start, window_end)
+        app_logger.info(f"时间窗口任务获取完成，任务数: {result['count']}")
+        return result
+    except HTTPException:
+        raise
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取时间窗口内的任务时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/changes",
+           summary="获取任务变化",
+           description="获取指定游标之后新增、修改和删除的任务，用于增量同步")
+async def get_task_changes(
+    since: Optional[int] = Query(None, description="上次响应的 cursor，不传时返回全部任务")
+):
+    """
+    获取任务变化
+
+    服务端按任务ID和 etag 比较每次同步的任务列表，记录新增、修改和删除的任务：
+    - 首次请求不传 since，返回 reset=true 和全部任务（在 added 中）
+    - 之后使用上次响应的 cursor 作为 since，只返回这之后的变化
+    - since 已过期（超出保留的记录数、切换过会话、服务重启）时同样返回 reset=true 和全部任务
+
+    多次变化会合并：新增后又修改仍在 added 中，新增后又删除则不返回。
+    数据超过 [task_store] max_age 秒时先同步。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取任务变化，since: {since}")
+        result = await task_store.changes_since(since)
+        app_logger.info(
+            f"任务变化获取完成，reset: {result['reset']}，新增 {len(result['added'])}，"
+            f"修改 {len(result['modified'])}，删除 {len(result['deleted'])}"
+        )
+        return result
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取任务变化时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/events",
+           summary="订阅任务变化",
+           description="通过 Server-Sent Events 实时推送任务变化，多个客户端共享同一个后台轮询")
+async def stream_task_events(
+    since: Optional[int] = Query(None, description="上次收到的 cursor，不传时先推送全部任务"),
+    last_event_id: Optional[str] = Header(None, alias="Last-Event-ID", description="浏览器断线重连时自动发送的游标")
+):
+    """
+    订阅任务变化（text/event-stream）
+
+    连接后先推送 since 之后的变化，之后每当任务发生变化推送一条 changes 事件，
+    事件 id 为新的 cursor，data 与 /tasks/changes 的响应格式相同。
+
+    - 有订阅者时服务端在后台轮询上游，有变化时间隔为 [task_watcher] min_interval 秒，
+      连续无变化时逐渐放宽到 max_interval 秒；上游请求数与订阅的客户端数量无关
+    - 浏览器 EventSource 断线重连时自动带上 Last-Event-ID，只补发断线期间的变化
+    - 空闲时每 heartbeat 秒发送一行注释保持连接
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    if since is None and last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+    try:
+        await task_store.ensure_synced()
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"订阅任务变化时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+    app_logger.info(f"新的任务变化订阅，since: {since}")
+    return StreamingResponse(
+        task_watcher.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/completed",
            summary="获取已完成/已放弃任务",
            description="获取已完成或已放弃的任务列表，支持分页获取")
@@ -274,3 +459,151 @@ async def get_trash_tasks(
     except Exception as e:
         app_logger.error(f"获取垃圾桶任务时发生未知错误: {e}")
         return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/tags",
+           summary="获取各标签的任务数",
+           description="获取每个标签的任务总数和未完成任务数")
+async def get_tags_summary():
+    """
+    获取各标签的任务数
+
+    从本地倒排索引中读取计数，不需要遍历全部任务，适合侧边栏频繁刷新。
+    标签不区分大小写，按名称排序。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info("请求获取各标签的任务数")
+        return await get_tag_counts()
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取各标签的任务数时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/tags/{tag}",
+           summary="获取标签下的任务",
+           description="获取带有指定标签的任务列表")
+async def get_tasks_by_tag(
+    tag: str,
+    status: Optional[int] = Query(None, description="按状态筛选：0=未完成，2=已完成")
+):
+    """
+    获取标签下的任务
+
+    从本地倒排索引中查询，标签不区分大小写，任务按 sortOrder 排序。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取标签下的任务: {tag}")
+        return await get_tag_tasks(tag, status)
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取标签下的任务时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/projects",
+           summary="获取各项目的任务数",
+           description="获取每个项目（清单）的任务总数和未完成任务数")
+async def get_projects_summary():
+    """
+    获取各项目的任务数
+
+    从本地倒排索引中读取计数，不需要遍历全部任务，适合侧边栏频繁刷新。
+    只包含有任务的项目，项目名称来自任务同步时的 projectProfiles。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info("请求获取各项目的任务数")
+        return await get_project_counts()
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取各项目的任务数时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/projects/{project_id}",
+           summary="获取项目中的任务",
+           description="获取指定项目（清单）中的任务列表")
+async def get_tasks_by_project(
+    project_id: str,
+    status: Optional[int] = Query(None, description="按状态筛选：0=未完成，2=已完成")
+):
+    """
+    获取项目中的任务
+
+    从本地倒排索引中查询，任务按 sortOrder 排序。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取项目中的任务: {project_id}")
+        return await get_project_tasks(project_id, status)
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取项目中的任务时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/{task_id}/subtree",
+           summary="获取子任务树",
+           description="获取任务的全部子孙任务，按先序遍历排列")
+async def get_task_subtree(
+    task_id: str,
+    max_depth: Optional[int] = Query(None, ge=1, description="最大深度，不传时返回全部层级")
+):
+    """
+    获取子任务树
+
+    从本地层级索引中查询任务的全部子孙任务，耗时与子树大小成正比：
+    - 按先序遍历排列，同一父任务下按 sortOrder 排序
+    - 每个任务带有 depth 字段，直接子任务为 1
+    - 数据中存在循环引用时，每个任务只出现一次
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取子任务树: {task_id}")
+        result = await get_subtree(task_id, max_depth)
+        if result is None:
+            return {"error": "task_not_found", "message": f"任务不存在: {task_id}"}
+        app_logger.info(f"子任务树获取完成，子孙任务数: {result['count']}")
+        return result
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取子任务树时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
+
+
+@router.get("/{task_id}/ancestors",
+           summary="获取祖先任务",
+           description="获取任务从直接父任务到根任务的路径")
+async def get_task_ancestors(task_id: str):
+    """
+    获取祖先任务
+
+    从本地层级索引中沿 parentId 向上查询，按从直接父任务到根任务的顺序返回。
+    数据中存在循环引用时在回到已访问的任务前停止。
+
+    **注意**: 需要先完成微信登录获取认证会话
+    """
+    try:
+        app_logger.info(f"请求获取祖先任务: {task_id}")
+        result = await get_ancestors(task_id)
+        if result is None:
+            return {"error": "task_not_found", "message": f"任务不存在: {task_id}"}
+        return result
+    except ValueError as e:
+        return {"error": "no_auth_session", "message": str(e)}
+    except Exception as e:
+        app_logger.error(f"获取祖先任务时发生错误: {e}")
+        return {"error": "server_error", "message": f"服务器内部错误: {str(e)}"}
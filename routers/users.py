@@ -1,15 +1,18 @@
 """用户相关API路由"""
-from fastapi import APIRouter
+from fastapi import APIRouter, Query
+from core.responses import FastJSONRoute
 from services import user_service, dida_service
 from utils import app_logger
 
-router = APIRouter(prefix="/users", tags=["用户信息"])
+router = APIRouter(prefix="/users", tags=["用户信息"], route_class=FastJSONRoute)
 
 
 @router.get("/profile",
            summary="获取用户信息",
            description="获取当前登录用户的详细信息")
-async def get_user_profile():
+async def get_user_profile(
+    refresh: bool = Query(False, description="跳过缓存，强制从滴答清单获取最新数据")
+):
     """
     获取用户信息
     
@@ -20,6 +23,8 @@ async def get_user_profile():
     - 邮箱验证状态、性别、语言设置
     - 用户代码等基本信息
     
+    - **refresh**: 为 true 时跳过缓存，强制从滴答清单获取最新数据
+
     **注意**: 需要先完成微信登录获取认证会话
     """
     try:
@@ -36,7 +41,7 @@ async def get_user_profile():
         csrf_token = current_session['csrf_token']
         
         # 调用用户服务
-        result = await user_service.get_user_profile(auth_token, csrf_token)
+        result = await user_service.get_user_profile(auth_token, csrf_token, refresh=refresh)
         
         if not result:
             return {"error": "service_error", "message": "获取用户信息失败，请稍后重试"}
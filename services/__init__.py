@@ -7,6 +7,13 @@ from .pomodoro_service import pomodoro_service
 from .habit_service import habit_service
 from .user_service import user_service
 from .export_service import export_service
+from .range_fetcher import range_fetcher
+from .task_store import task_store
+from .task_search import task_search_index
+from .task_indexes import hierarchy_index, interval_index, tag_index, project_index, counter_index
+from .task_watcher import task_watcher
+from .sync_scheduler import sync_scheduler
+from .focus_archive import focus_archive
 
 __all__ = [
     'wechat_service',
@@ -16,5 +23,16 @@ __all__ = [
     'pomodoro_service',
     'habit_service',
     'user_service',
-    'export_service'
+    'export_service',
+    'range_fetcher',
+    'task_store',
+    'task_search_index',
+    'hierarchy_index',
+    'interval_index',
+    'tag_index',
+    'project_index',
+    'counter_index',
+    'task_watcher',
+    'sync_scheduler',
+    'focus_archive'
 ]
@@ -1,10 +1,12 @@
 """滴答清单API服务模块"""
 import uuid
 import time
-from typing import Optional, Dict, Any, List
-import httpx
-from utils import app_logger
+from contextlib import asynccontextmanager
+from typing import Optional, Dict, Any, List, AsyncIterator
+from core.http_client import create_http_client
+from utils import app_logger, JsonArrayStream
 from core import config, db, urls
+from core.payload import UpstreamPayload
 from models import TasksResponse, TaskItem
 
 
@@ -13,7 +15,7 @@ class DidaAPIService:
     
     def __init__(self):
         self.request_config = config.get('request_config', {})
-        self.client = httpx.AsyncClient(timeout=self.request_config.get('timeout', 30.0))
+        self.client = create_http_client(self.request_config.get('timeout', 30.0))
         
         # 从数据库获取当前活跃的认证会话
         self.current_session = None
@@ -116,10 +118,13 @@ class DidaAPIService:
         
         return cookies
 
-    async def get_all_tasks(self) -> dict:
+    async def get_all_tasks(self, raw: bool = False) -> dict:
         """
         获取所有任务
 
+        Args:
+            raw: 为 True 时返回 UpstreamPayload（上游原始字节），不解析 JSON
+
         Returns:
             dict: 原始响应数据
         """
@@ -138,17 +143,24 @@ class DidaAPIService:
             app_logger.debug(f"请求头: {headers}")
 
             # 发送请求
-            response = await self.client.get(url, headers=headers, cookies=cookies)
+            # 原样透传的响应不保存熔断降级快照
+            response = await self.client.get(
+                url, headers=headers, cookies=cookies, extensions={"stale_fallback": False}
+            )
 
             # 记录响应信息
             app_logger.info(f"任务响应状态码: {response.status_code}")
             app_logger.debug(f"任务响应头: {dict(response.headers)}")
 
             if response.status_code == 200:
+                if raw:
+                    payload = UpstreamPayload.from_response(response)
+                    app_logger.info(f"成功获取任务数据，响应大小: {payload.size} 字节")
+                    return payload
+
                 # 解析响应数据
                 response_data = response.json()
-                app_logger.info(f"成功获取任务数据，响应长度: {len(str(response_data))}")
-                app_logger.debug(f"任务响应数据: {response_data}")
+                app_logger.info(f"成功获取任务数据，响应大小: {len(response.content)} 字节")
 
                 # 直接返回原始响应
                 return response_data
@@ -161,6 +173,42 @@ class DidaAPIService:
             app_logger.error(f"获取任务时发生错误: {e}")
             return {"error": str(e)}
 
+    @asynccontextmanager
+    async def stream_all_tasks(self) -> AsyncIterator[JsonArrayStream]:
+        """
+        流式获取所有任务
+
+        逐个解析 syncTaskBean.update 中的任务，不把整个响应体读入内存，
+        适用于统计、导出等只需要遍历任务的场景。
+
+        用法::
+
+            async with dida_service.stream_all_tasks() as tasks:
+                async for task in tasks:
+                    ...
+                tasks.rest  # checkPoint、projectProfiles 等其他字段
+
+        Raises:
+            ValueError: 未设置认证会话，或响应体不是合法的 JSON 对象
+            httpx.HTTPStatusError: 上游返回非200状态码
+        """
+        url = urls.build_dida_api_url(urls.DIDA_TASK_APIS["get_all_tasks"])
+        headers = self._get_auth_headers()
+        cookies = self._get_auth_cookies()
+
+        app_logger.info(f"流式请求获取所有任务: {url}")
+        async with self.client.stream(
+            "GET", url, headers=headers, cookies=cookies, extensions={"stale_fallback": False}
+        ) as response:
+            if response.status_code != 200:
+                await response.aread()
+                app_logger.error(f"获取任务失败，状态码: {response.status_code}")
+                response.raise_for_status()
+
+            stream = JsonArrayStream(response.aiter_bytes(), ("syncTaskBean", "update"))
+            yield stream
+            app_logger.info(f"流式获取任务完成，任务数: {stream.count}，响应大小: {stream.bytes_read} 字节")
+
     async def get_completed_tasks(self, to: Optional[str] = None, status: str = "Completed") -> dict:
         """
         获取已完成或已放弃的任务（支持分页）
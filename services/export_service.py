@@ -3,14 +3,29 @@ import io
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import pandas as pd
-from utils import app_logger
+from utils import ValuePool, app_logger
 from services.dida_service import dida_service
 from services.pomodoro_service import pomodoro_service
 from core import urls
 
 
+# 空列表的文本表示，所有任务共享同一个字符串对象
+_EMPTY_LIST_TEXT = '[]'
+
+
+def _list_text(value: Any) -> str:
+    """列表字段转为文本，与 str() 结果一致"""
+    if isinstance(value, list) and not value:
+        return _EMPTY_LIST_TEXT
+    return str(value)
+
+
 class ExportService:
     """任务导出服务类"""
+
+    # 取值种类少、在任务间大量重复的列，展平时共享同一个对象
+    SHARED_COLUMNS = ('项目ID', '时区', '重复标志', '重复来源', '首次重复日期', '提醒设置',
+                      '标签列表', '列ID', '类型', '创建者ID', '删除者ID')
     
     def __init__(self):
         self.dida_service = dida_service
@@ -25,13 +40,13 @@ class ExportService:
         try:
             app_logger.info("开始导出任务到Excel")
             
-            # 获取所有任务数据
-            all_tasks_data = await self._get_all_tasks_data()
+            # 获取所有任务数据（流式解析后直接展平）
+            all_tasks_df = await self._get_all_tasks_frame()
             completed_tasks_data = await self._get_completed_tasks_data()
             abandoned_tasks_data = await self._get_abandoned_tasks_data()
             trash_tasks_data = await self._get_trash_tasks_data()
 
-            if not all_tasks_data and not completed_tasks_data and not abandoned_tasks_data and not trash_tasks_data:
+            if all_tasks_df.empty and not completed_tasks_data and not abandoned_tasks_data and not trash_tasks_data:
                 return {"error": "无法获取任务数据"}
             
             # 创建Excel文件
@@ -39,11 +54,9 @@ class ExportService:
             
             with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
                 # 处理全部任务
-                if all_tasks_data:
-                    all_tasks_df = self._process_all_tasks(all_tasks_data)
-                    if not all_tasks_df.empty:
-                        all_tasks_df.to_excel(writer, sheet_name='全部任务', index=False)
-                        app_logger.info(f"全部任务工作表创建完成，共 {len(all_tasks_df)} 条记录")
+                if not all_tasks_df.empty:
+                    all_tasks_df.to_excel(writer, sheet_name='全部任务', index=False)
+                    app_logger.info(f"全部任务工作表创建完成，共 {len(all_tasks_df)} 条记录")
                 
                 # 处理已完成任务
                 if completed_tasks_data:
@@ -131,16 +144,28 @@ class ExportService:
             app_logger.error(f"导出专注记录到Excel时发生错误: {e}")
             return {"error": str(e)}
     
-    async def _get_all_tasks_data(self) -> Optional[Dict]:
-        """获取所有任务数据"""
+    async def _get_all_tasks_frame(self) -> pd.DataFrame:
+        """
+        流式获取所有任务并展平为表格
+
+        任务逐个解析并展平，不保存完整的原始响应。projectProfiles 位于任务列表之后，
+        因此项目名称在遍历结束后统一填充。项目ID、时区等重复值在本次导出内共享。
+        """
         try:
-            result = await self.dida_service.get_all_tasks()
-            if result and 'error' not in result:
-                return result
-            return None
+            processed_tasks = []
+            pool = ValuePool()
+            async with self.dida_service.stream_all_tasks() as tasks:
+                async for task in tasks:
+                    processed_tasks.append(self._flatten_task(task, {}, pool))
+                projects = {p['id']: p['name'] for p in tasks.rest.get('projectProfiles', [])}
+
+            df = pd.DataFrame(processed_tasks)
+            if not df.empty:
+                df['项目名称'] = df['项目ID'].map(projects).fillna('')
+            return df
         except Exception as e:
             app_logger.error(f"获取所有任务数据失败: {e}")
-            return None
+            return pd.DataFrame()
     
     async def _get_completed_tasks_data(self) -> Optional[List]:
         """获取已完成任务数据（分页获取所有数据）"""
@@ -299,23 +324,6 @@ class ExportService:
             app_logger.error(f"获取专注记录时间线数据失败: {e}")
             return None
     
-    def _process_all_tasks(self, data: Dict) -> pd.DataFrame:
-        """处理全部任务数据"""
-        try:
-            tasks = data.get('syncTaskBean', {}).get('update', [])
-            projects = {p['id']: p['name'] for p in data.get('projectProfiles', [])}
-            
-            processed_tasks = []
-            for task in tasks:
-                processed_task = self._flatten_task(task, projects)
-                processed_tasks.append(processed_task)
-            
-            return pd.DataFrame(processed_tasks)
-            
-        except Exception as e:
-            app_logger.error(f"处理全部任务数据失败: {e}")
-            return pd.DataFrame()
-    
     def _process_completed_tasks(self, data: List) -> pd.DataFrame:
         """处理已完成任务数据"""
         try:
@@ -375,8 +383,15 @@ class ExportService:
             app_logger.error(f"处理专注记录时间线数据失败: {e}")
             return pd.DataFrame()
     
-    def _flatten_task(self, task: Dict, projects: Dict) -> Dict:
-        """展平任务数据，包含所有字段"""
+    def _flatten_task(self, task: Dict, projects: Dict, pool: Optional[ValuePool] = None) -> Dict:
+        """
+        展平任务数据，包含所有字段
+
+        Args:
+            task: 原始任务字典
+            projects: 项目ID -> 项目名称
+            pool: 共享重复值的 ValuePool，为 None 时不共享
+        """
         try:
             flattened = {
                 # 基本信息
@@ -417,16 +432,16 @@ class ExportService:
                 
                 # 提醒设置
                 '提醒设置': task.get('reminder', ''),
-                '提醒列表': str(task.get('reminders', [])),
-                '排除日期': str(task.get('exDate', [])),
+                '提醒列表': _list_text(task.get('reminders', [])),
+                '排除日期': _list_text(task.get('exDate', [])),
                 
                 # 层级关系
                 '父任务ID': task.get('parentId', ''),
-                '子任务ID列表': str(task.get('childIds', [])),
+                '子任务ID列表': _list_text(task.get('childIds', [])),
                 
                 # 其他属性
-                '标签列表': str(task.get('tags', [])),
-                '子项目': str(task.get('items', [])),
+                '标签列表': _list_text(task.get('tags', [])),
+                '子项目': _list_text(task.get('items', [])),
                 '附件数量': len(task.get('attachments', [])),
                 '评论数量': task.get('commentCount', 0),
                 '列ID': task.get('columnId', ''),
@@ -441,13 +456,17 @@ class ExportService:
                 '实体标签': task.get('etag', ''),
                 
                 # 专注相关
-                '番茄钟摘要': str(task.get('pomodoroSummaries', [])),
-                '专注摘要': str(task.get('focusSummaries', [])),
+                '番茄钟摘要': _list_text(task.get('pomodoroSummaries', [])),
+                '专注摘要': _list_text(task.get('focusSummaries', [])),
                 
                 # 附件详情
-                '附件详情': str(task.get('attachments', [])),
+                '附件详情': _list_text(task.get('attachments', [])),
             }
-            
+
+            if pool is not None:
+                for column in self.SHARED_COLUMNS:
+                    flattened[column] = pool(flattened[column])
+
             return flattened
             
         except Exception as e:
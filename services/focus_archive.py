@@ -0,0 +1,406 @@
+"""本地专注记录存档模块
+
+上游的热力图、时间分布、按小时分布和详情分布接口只提供固定的统计口径，每次查询都要请求上游。
+FocusArchive 把专注记录时间线（/pomodoros/timeline）增量同步到本地 SQLite，
+统计由 utils/focus_analytics.py 在本地计算，支持任意日期范围和桶大小：
+
+- 时间线按开始时间倒序分页（每页约 31 条），同步时从最新一页开始向前翻页，
+  遇到没有任何新增、修改或删除的一页即停止，日常同步通常只需请求一页
+- 历史记录尚未完整时，从本地最早的记录继续向前补齐，直到上游返回不足一页（每次最多 max_pages 页）
+- 每页覆盖的时间区间内本地有而上游没有的记录视为已删除
+- 专注片段按会话（session_scope）在内存中缓存为 NumPy 数组，记录变化后重新加载
+
+同步失败但本地已有数据时返回已有数据并在 archive.stale 中标记。
+"""
+import asyncio
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from core import config
+from core.cache import session_scope
+from services.pomodoro_service import pomodoro_service
+from utils import app_logger
+from utils.date_range import parse_date
+from utils.focus_analytics import DEFAULT_MAX_CELLS, FocusSegments, SegmentRow, analyze
+from utils.task_query import parse_dida_time
+
+# 时间线每页的记录数，少于该数量说明已经到达最早的记录
+TIMELINE_PAGE_SIZE = 31
+
+
+def _to_ms(value: Optional[str]) -> Optional[int]:
+    parsed = parse_dida_time(value)
+    return int(parsed.timestamp() * 1000) if parsed else None
+
+
+def record_segments(record: Dict[str, Any]) -> List[SegmentRow]:
+    """
+    拆分专注记录为专注片段
+
+    记录中的 tasks 为各任务的专注时间段（不含暂停），没有关联任务时整条记录作为一个片段。
+    """
+    segments = []
+    for task in record.get('tasks') or []:
+        start, end = _to_ms(task.get('startTime')), _to_ms(task.get('endTime'))
+        if start is not None and end is not None and end > start:
+            segments.append((start, end, task.get('taskId'), task.get('title'), task.get('projectName')))
+    if not record.get('tasks'):
+        start, end = _to_ms(record.get('startTime')), _to_ms(record.get('endTime'))
+        if start is not None and end is not None and end > start:
+            segments.append((start, end, None, None, None))
+    return segments
+
+
+class FocusArchive:
+    """基于 SQLite 的专注记录存档"""
+
+    def __init__(self, db_path: str = "output/databases/focus_records.db",
+                 max_age: float = 300.0, max_pages: int = 200, max_cells: int = DEFAULT_MAX_CELLS):
+        self.db_path = Path(db_path)
+        self.max_age = max_age
+        self.max_pages = max_pages
+        self.max_cells = max_cells
+        self._lock = asyncio.Lock()
+        # 会话 -> 记录版本号，有变化时递增
+        self._revisions: Dict[str, int] = {}
+        # 会话 -> (版本号, 专注片段)
+        self._segments: Dict[str, Tuple[int, FocusSegments]] = {}
+        # 已经使用过存档的会话
+        self._active: Set[str] = set()
+        self._requests = 0
+        self._syncs = 0
+        self._pages = 0
+        # 确保数据库目录存在
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.init_database()
+
+    def get_connection(self) -> sqlite3.Connection:
+        """获取数据库连接"""
+        return sqlite3.connect(self.db_path)
+
+    def init_database(self) -> None:
+        """初始化存档表"""
+        with self.get_connection() as conn:
+            # 专注记录（时间线原始数据）
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS focus_records (
+                    scope TEXT NOT NULL,
+                    id TEXT NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    etag TEXT,
+                    data TEXT NOT NULL,  -- 原始JSON数据
+                    PRIMARY KEY (scope, id)
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_focus_records_start ON focus_records(scope, start_ms)"
+            )
+
+            # 专注片段（统计使用）
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS focus_segments (
+                    scope TEXT NOT NULL,
+                    record_id TEXT NOT NULL,
+                    start_ms INTEGER NOT NULL,
+                    end_ms INTEGER NOT NULL,
+                    task_id TEXT,
+                    title TEXT,
+                    project TEXT
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_focus_segments_record ON focus_segments(scope, record_id)"
+            )
+
+            # 同步状态
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS focus_sync_state (
+                    scope TEXT PRIMARY KEY,
+                    complete INTEGER NOT NULL DEFAULT 0,  -- 是否已同步到最早的记录
+                    synced_at REAL
+                )
+            """)
+            conn.commit()
+
+    # ================================
+    # 数据库操作（在线程中执行）
+    # ================================
+
+    def _load_state(self, scope: str) -> Dict[str, Any]:
+        with self.get_connection() as conn:
+            row = conn.execute(
+                "SELECT complete, synced_at FROM focus_sync_state WHERE scope = ?", (scope,)
+            ).fetchone()
+            records, oldest = conn.execute(
+                "SELECT COUNT(*), MIN(start_ms) FROM focus_records WHERE scope = ?", (scope,)
+            ).fetchone()
+        return {
+            "complete": bool(row and row[0]),
+            "synced_at": row[1] if row else None,
+            "records": records,
+            "oldest_ms": oldest,
+        }
+
+    def _has_state(self, scope: str) -> bool:
+        with self.get_connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM focus_sync_state WHERE scope = ?", (scope,)
+            ).fetchone() is not None
+
+    def _save_state(self, scope: str, complete: bool) -> None:
+        with self.get_connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO focus_sync_state (scope, complete, synced_at) VALUES (?, ?, ?)",
+                (scope, int(complete), time.time()),
+            )
+            conn.commit()
+
+    def _save_page(self, scope: str, records: List[Dict[str, Any]],
+                   lower: Optional[int], upper: Optional[int]) -> int:
+        """
+        保存一页时间线记录
+
+        Args:
+            lower / upper: 该页覆盖的开始时间区间（开区间，None 表示不限），
+                区间内本地有而本页没有的记录视为已删除
+
+        Returns:
+            int: 新增、修改和删除的记录数
+        """
+        changed = 0
+        with self.get_connection() as conn:
+            in_window = {row[0] for row in conn.execute(
+                "SELECT id FROM focus_records WHERE scope = ? AND start_ms > ? AND start_ms < ?",
+                (scope, lower if lower is not None else -2 ** 62, upper if upper is not None else 2 ** 62),
+            )}
+            ids = [record.get('id') for record in records if record.get('id')]
+            etags = dict(conn.execute(
+                f"SELECT id, etag FROM focus_records WHERE scope = ? AND id IN ({','.join('?' * len(ids))})",
+                (scope, *ids),
+            )) if ids else {}
+
+            for record in records:
+                record_id = record.get('id')
+                start, end = _to_ms(record.get('startTime')), _to_ms(record.get('endTime'))
+                if not record_id or start is None:
+                    continue
+                if record_id in etags and etags[record_id] == record.get('etag'):
+                    continue
+
+                changed += 1
+                conn.execute(
+                    "INSERT OR REPLACE INTO focus_records (scope, id, start_ms, end_ms, etag, data) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (scope, record_id, start, end if end is not None else start, record.get('etag'),
+                     json.dumps(record, ensure_ascii=False, separators=(',', ':'))),
+                )
+                conn.execute("DELETE FROM focus_segments WHERE scope = ? AND record_id = ?", (scope, record_id))
+                conn.executemany(
+                    "INSERT INTO focus_segments (scope, record_id, start_ms, end_ms, task_id, title, project) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(scope, record_id, *segment) for segment in record_segments(record)],
+                )
+
+            deleted = in_window.difference(ids)
+            for record_id in deleted:
+                conn.execute("DELETE FROM focus_records WHERE scope = ? AND id = ?", (scope, record_id))
+                conn.execute("DELETE FROM focus_segments WHERE scope = ? AND record_id = ?", (scope, record_id))
+            conn.commit()
+        return changed + len(deleted)
+
+    def _load_segments(self, scope: str) -> FocusSegments:
+        with self.get_connection() as conn:
+            rows: Iterable[SegmentRow] = conn.execute(
+                "SELECT start_ms, end_ms, task_id, title, project FROM focus_segments WHERE scope = ?", (scope,)
+            )
+            return FocusSegments.from_rows(rows)
+
+    # ================================
+    # 同步
+    # ================================
+
+    async def _fetch_page(self, auth_token: str, csrf_token: str, to_ms: Optional[int]) -> List[Dict[str, Any]]:
+        result = await pomodoro_service.get_focus_timeline(auth_token, csrf_token, to_ms)
+        self._pages += 1
+        if not isinstance(result, list):
+            error = result.get('error') if isinstance(result, dict) else "empty result"
+            raise RuntimeError(f"获取专注记录时间线失败: {error}")
+        return result
+
+    async def _walk(self, scope: str, auth_token: str, csrf_token: str, to_ms: Optional[int],
+                    budget: int, stop_when_unchanged: bool) -> Tuple[int, int, bool]:
+        """
+        从 to_ms 开始向更早的记录翻页
+
+        Returns:
+            Tuple[int, int, bool]: (变化的记录数, 请求的页数, 是否已到达最早的记录)
+        """
+        changed = pages = 0
+        while pages < budget:
+            records = await self._fetch_page(auth_token, csrf_token, to_ms)
+            pages += 1
+            starts = [ms for ms in (_to_ms(record.get('startTime')) for record in records) if ms is not None]
+            reached_end = len(records) < TIMELINE_PAGE_SIZE
+            oldest = min(starts, default=None)
+            lower = None if reached_end else oldest
+
+            page_changed = await asyncio.to_thread(self._save_page, scope, records, lower, to_ms)
+            if page_changed:
+                # 每页单独提交，写入后立即递增版本号，之后的页面请求失败时缓存的片段也会重新加载
+                self._revisions[scope] = self._revisions.get(scope, 0) + 1
+            changed += page_changed
+            if reached_end:
+                return changed, pages, True
+            if (stop_when_unchanged and not page_changed) or oldest is None or (to_ms is not None and oldest >= to_ms):
+                break
+            to_ms = oldest
+        return changed, pages, False
+
+    async def is_active(self, auth_token: str) -> bool:
+        """
+        会话是否使用过存档（调用过 /pomodoros/analytics）
+
+        后台同步只刷新使用过的存档，没有使用过的会话不会在后台翻页同步全部历史记录。
+        """
+        scope = session_scope(auth_token)
+        if scope not in self._active and await asyncio.to_thread(self._has_state, scope):
+            self._active.add(scope)
+        return scope in self._active
+
+    async def sync(self, auth_token: str, csrf_token: str) -> Dict[str, Any]:
+        """立即同步，返回本次变化的记录数和存档状态"""
+        scope = session_scope(auth_token)
+        async with self._lock:
+            return await self._sync(scope, auth_token, csrf_token)
+
+    async def _sync(self, scope: str, auth_token: str, csrf_token: str) -> Dict[str, Any]:
+        started = time.perf_counter()
+        state = await asyncio.to_thread(self._load_state, scope)
+        complete = state['complete']
+
+        # 最新的记录：翻到没有变化的一页为止
+        changed, pages, reached_end = await self._walk(
+            scope, auth_token, csrf_token, None, self.max_pages, stop_when_unchanged=state['records'] > 0
+        )
+        complete = complete or reached_end
+
+        # 历史记录尚未完整时从本地最早的记录继续向前补齐
+        if not complete and pages < self.max_pages:
+            oldest = (await asyncio.to_thread(self._load_state, scope))['oldest_ms']
+            backfilled, backfill_pages, complete = await self._walk(
+                scope, auth_token, csrf_token, oldest, self.max_pages - pages, stop_when_unchanged=False
+            )
+            changed += backfilled
+            pages += backfill_pages
+
+        await asyncio.to_thread(self._save_state, scope, complete)
+        self._revisions.setdefault(scope, 1)
+        self._syncs += 1
+
+        took_ms = round((time.perf_counter() - started) * 1000, 1)
+        app_logger.info(f"专注记录同步完成: {changed} 条变化，请求 {pages} 页，"
+                        f"{'已' if complete else '未'}到达最早记录，耗时 {took_ms}ms")
+        return {"changed": changed, "pages": pages, "complete": complete, "revision": self._revisions[scope]}
+
+    async def ensure_synced(self, auth_token: str, csrf_token: str,
+                            max_age: Optional[float] = None) -> Dict[str, Any]:
+        """
+        确保存档不超过 max_age 秒，过期或从未同步时进行同步
+
+        Returns:
+            Dict[str, Any]: 存档状态（records、complete、synced_at、stale）
+
+        Raises:
+            RuntimeError: 同步失败且本地没有数据
+        """
+        max_age = self.max_age if max_age is None else max_age
+        scope = session_scope(auth_token)
+        stale = False
+        state = await asyncio.to_thread(self._load_state, scope)
+        if state['synced_at'] is None or time.time() - state['synced_at'] > max_age:
+            async with self._lock:
+                state = await asyncio.to_thread(self._load_state, scope)
+                # 等待期间其他请求已经完成了同步
+                if state['synced_at'] is None or time.time() - state['synced_at'] > max_age:
+                    try:
+                        await self._sync(scope, auth_token, csrf_token)
+                    except Exception as e:
+                        if not state['records']:
+                            raise
+                        stale = True
+                        app_logger.warning(f"专注记录同步失败，使用本地存档: {e}")
+                    state = await asyncio.to_thread(self._load_state, scope)
+
+        return {
+            "records": state['records'],
+            "complete": state['complete'],
+            "synced_at": int(state['synced_at'] * 1000) if state['synced_at'] else None,
+            "stale": stale,
+        }
+
+    async def get_segments(self, auth_token: str) -> FocusSegments:
+        """获取会话的专注片段（内存缓存，记录变化后重新加载）"""
+        scope = session_scope(auth_token)
+        revision = self._revisions.setdefault(scope, 1)
+        cached = self._segments.get(scope)
+        if cached is None or cached[0] != revision:
+            segments = await asyncio.to_thread(self._load_segments, scope)
+            self._segments[scope] = cached = (revision, segments)
+        return cached[1]
+
+    async def get_focus_analytics(self, auth_token: str, csrf_token: str, start_date: str, end_date: str,
+                                  bucket_days: int = 1, bucket_minutes: int = 60,
+                                  refresh: bool = False) -> Dict[str, Any]:
+        """
+        根据本地存档计算专注统计
+
+        Args:
+            start_date / end_date: 日期范围，格式 YYYYMMDD
+            bucket_days: 热力图每个桶的天数
+            bucket_minutes: 时段分布每个桶的分钟数，需能整除 1440
+            refresh: 是否立即同步上游
+
+        Returns:
+            Dict[str, Any]: 统计结果，archive 中为存档状态
+        """
+        self._requests += 1
+        self._active.add(session_scope(auth_token))
+        try:
+            archive = await self.ensure_synced(auth_token, csrf_token, max_age=0 if refresh else None)
+        except Exception as e:
+            app_logger.error(f"同步专注记录失败: {e}")
+            return {"error": "sync_failed", "message": str(e)}
+
+        segments = await self.get_segments(auth_token)
+        try:
+            result = analyze(segments, parse_date(start_date), parse_date(end_date),
+                             bucket_days, bucket_minutes, max_cells=self.max_cells)
+        except ValueError as e:
+            return {"error": "invalid_parameter", "message": str(e)}
+
+        archive["segments"] = len(segments)
+        result["archive"] = archive
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """存档状态"""
+        return {
+            "requests": self._requests,
+            "syncs": self._syncs,
+            "pages": self._pages,
+            "active_sessions": len(self._active),
+            "cached_sessions": len(self._segments),
+        }
+
+
+# 全局专注记录存档
+focus_archive = FocusArchive(
+    db_path=config.get('focus_archive.db_path', "output/databases/focus_records.db"),
+    max_age=config.get('focus_archive.max_age', 300),
+    max_pages=config.get('focus_archive.max_pages', 200),
+    max_cells=config.get('focus_archive.max_cells', DEFAULT_MAX_CELLS),
+)
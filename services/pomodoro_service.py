@@ -1,17 +1,32 @@
 """番茄专注服务模块"""
+import asyncio
 import time
 import uuid
 from dataclasses import dataclass, field
 from threading import Lock
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
 
-import httpx
+from core.http_client import create_http_client
 from datetime import datetime, timezone, timedelta
-from core import urls, config
+from core import urls, config, response_cache
+from core.cache import is_error_result, session_scope
 from models import FocusOperation, FocusOperationRequest
+from services.range_fetcher import range_fetcher
 from utils import app_logger, generate_object_id
 
 
+def _merge_heatmap_chunks(chunks: List[Any]) -> list:
+    """合并分块请求的热力图数据，按日期去重并排序"""
+    days: Dict[str, Any] = {}
+    for chunk in chunks:
+        if not isinstance(chunk, list):
+            continue
+        for item in chunk:
+            if isinstance(item, dict) and item.get('day'):
+                days[item['day']] = item
+    return [days[day] for day in sorted(days)]
+
+
 @dataclass
 class FocusSessionState:
     """本地缓存的番茄钟会话状态"""
@@ -47,10 +62,13 @@ class PomodoroService:
     def __init__(self):
         self.request_config = config.get('request_config', {})
         timeout = self.request_config.get('timeout', 30.0)
-        self.client = httpx.AsyncClient(timeout=timeout)
+        self.client = create_http_client(timeout)
         self.web_domain = urls.DIDA_API_BASE.get("web_domain", "https://dida365.com")
+        self.general_cache_config = config.get('cache.pomodoro_general', {})
         self._focus_state = FocusSessionState()
         self._state_lock = Lock()
+        # 超时或调用方取消后仍在后台完成的专注看板请求
+        self._background_tasks: Set[asyncio.Task] = set()
 
     def _generate_trace_id(self) -> str:
         """生成TraceID"""
@@ -106,14 +124,30 @@ class PomodoroService:
         except Exception as e:
             raise ValueError(f"时间转换失败: {e}")
     
-    async def get_general_for_desktop(self, auth_token: str, csrf_token: str) -> dict:
-        """获取番茄专注概览（桌面版），直接返回原始响应"""
+    async def get_general_for_desktop(self, auth_token: str, csrf_token: str, refresh: bool = False) -> dict:
+        """
+        获取番茄专注概览（桌面版），直接返回原始响应
+
+        使用 stale-while-revalidate 缓存，番茄钟操作后清除缓存，概览中的今日数据随之更新。
+        """
+        return await response_cache.get_or_revalidate(
+            f"pomodoro:general:{session_scope(auth_token)}",
+            lambda: self._fetch_general_for_desktop(auth_token, csrf_token),
+            soft_ttl=self.general_cache_config.get('soft_ttl', 30),
+            hard_ttl=self.general_cache_config.get('hard_ttl', 600),
+            bypass=refresh,
+        )
+
+    async def _fetch_general_for_desktop(self, auth_token: str, csrf_token: str) -> dict:
+        """请求滴答清单获取番茄专注概览"""
         try:
             url = urls.build_dida_api_url(urls.DIDA_POMODORO_APIS["general_for_desktop"])
             headers = self._build_auth_headers(auth_token, csrf_token)
             cookies = self._build_auth_cookies(auth_token, csrf_token)
 
-            response = await self.client.get(url, headers=headers, cookies=cookies)
+            response = await self.client.get(
+                url, headers=headers, cookies=cookies, extensions={"stale_fallback": True}
+            )
 
             if response.status_code == 200:
                 return response.json()
@@ -168,9 +202,16 @@ class PomodoroService:
             headers = self._build_focus_operation_headers(auth_token, csrf_token)
             cookies = self._build_auth_cookies(auth_token, csrf_token)
 
-            response = await self.client.post(url, headers=headers, cookies=cookies, json=payload)
+            # 不包含操作的请求只用于查询当前状态，可以安全地重试和对冲
+            extensions = {"idempotent": True} if not payload.get("opList") else None
+            response = await self.client.post(
+                url, headers=headers, cookies=cookies, json=payload, extensions=extensions
+            )
 
             if response.status_code == 200:
+                if payload.get("opList"):
+                    # 操作会改变今日专注数据
+                    response_cache.invalidate(f"pomodoro:general:{session_scope(auth_token)}")
                 return response.json()
             else:
                 app_logger.error(f"番茄钟操作请求失败，状态码: {response.status_code}, 响应: {response.text}")
@@ -594,9 +635,26 @@ class PomodoroService:
         self._update_focus_state_from_response(result)
         return result
     
+    async def _get_range_cached(self, name: str, auth_token: str, start_date: str, end_date: str,
+                                loader: Callable[[], Awaitable[Any]]) -> Any:
+        """按日期范围缓存上游响应，已经过去的日期范围缓存时间更长"""
+        return await response_cache.get_or_load(
+            f"pomodoro:{name}:{session_scope(auth_token)}:{start_date}:{end_date}",
+            loader,
+            range_fetcher.range_ttl(end_date),
+        )
+
     async def get_focus_distribution(self, auth_token: str, csrf_token: str,
                                    start_date: str, end_date: str) -> dict:
         """获取专注详情分布，直接返回原始响应"""
+        return await self._get_range_cached(
+            "distribution", auth_token, start_date, end_date,
+            lambda: self._fetch_focus_distribution(auth_token, csrf_token, start_date, end_date),
+        )
+
+    async def _fetch_focus_distribution(self, auth_token: str, csrf_token: str,
+                                        start_date: str, end_date: str) -> dict:
+        """请求滴答清单获取专注详情分布"""
         try:
             endpoint = f"{urls.DIDA_POMODORO_APIS['focus_distribution']}/{start_date}/{end_date}"
             url = urls.build_dida_api_url(endpoint)
@@ -645,7 +703,24 @@ class PomodoroService:
 
     async def get_focus_heatmap(self, auth_token: str, csrf_token: str,
                                start_date: str, end_date: str) -> dict:
-        """获取专注趋势热力图，直接返回原始响应"""
+        """
+        获取专注趋势热力图，直接返回原始响应
+
+        较长的日期范围会按月/季度拆分后并发请求，分块结果单独缓存并按日期合并。
+        """
+        return await range_fetcher.fetch(
+            f"pomodoro:heatmap:{session_scope(auth_token)}",
+            start_date,
+            end_date,
+            lambda chunk_start, chunk_end: self._fetch_focus_heatmap(
+                auth_token, csrf_token, chunk_start, chunk_end
+            ),
+            _merge_heatmap_chunks,
+        )
+
+    async def _fetch_focus_heatmap(self, auth_token: str, csrf_token: str,
+                                   start_date: str, end_date: str) -> dict:
+        """请求单个日期范围的专注趋势热力图"""
         try:
             endpoint = f"{urls.DIDA_POMODORO_APIS['focus_heatmap']}/{start_date}/{end_date}"
             url = urls.build_dida_api_url(endpoint)
@@ -664,6 +739,14 @@ class PomodoroService:
     async def get_focus_time_distribution(self, auth_token: str, csrf_token: str,
                                          start_date: str, end_date: str) -> dict:
         """获取专注时间分布（按时间段），直接返回原始响应"""
+        return await self._get_range_cached(
+            "time_distribution", auth_token, start_date, end_date,
+            lambda: self._fetch_focus_time_distribution(auth_token, csrf_token, start_date, end_date),
+        )
+
+    async def _fetch_focus_time_distribution(self, auth_token: str, csrf_token: str,
+                                             start_date: str, end_date: str) -> dict:
+        """请求滴答清单获取专注时间分布"""
         try:
             endpoint = f"{urls.DIDA_POMODORO_APIS['focus_time_distribution']}/{start_date}/{end_date}"
             url = urls.build_dida_api_url(endpoint)
@@ -682,6 +765,14 @@ class PomodoroService:
     async def get_focus_hour_distribution(self, auth_token: str, csrf_token: str,
                                          start_date: str, end_date: str) -> dict:
         """获取专注时间按小时分布，直接返回原始响应"""
+        return await self._get_range_cached(
+            "hour_distribution", auth_token, start_date, end_date,
+            lambda: self._fetch_focus_hour_distribution(auth_token, csrf_token, start_date, end_date),
+        )
+
+    async def _fetch_focus_hour_distribution(self, auth_token: str, csrf_token: str,
+                                             start_date: str, end_date: str) -> dict:
+        """请求滴答清单获取专注时间按小时分布"""
         try:
             endpoint = f"{urls.DIDA_POMODORO_APIS['focus_hour_distribution']}/{start_date}/{end_date}"
             url = urls.build_dida_api_url(endpoint)
@@ -697,6 +788,73 @@ class PomodoroService:
         except Exception as e:
             return {"error": str(e)}
     
+    async def get_focus_dashboard(self, auth_token: str, csrf_token: str,
+                                  start_date: str, end_date: str, part_timeout: float = 10.0) -> dict:
+        """
+        并发获取专注页面需要的全部数据
+
+        概览、详情分布、热力图、时间分布、按小时分布同时请求，各部分沿用单独接口的缓存。
+        超过 part_timeout 秒仍未完成的部分返回 timeout 错误，不阻塞其他部分；
+        该请求不会被取消，完成后写入缓存，下次获取时可直接命中。
+
+        Returns:
+            dict: 各部分的原始响应，以及 parts 中每部分的状态和耗时
+        """
+        started = time.perf_counter()
+        loaders = {
+            "general": lambda: self.get_general_for_desktop(auth_token, csrf_token),
+            "distribution": lambda: self.get_focus_distribution(auth_token, csrf_token, start_date, end_date),
+            "heatmap": lambda: self.get_focus_heatmap(auth_token, csrf_token, start_date, end_date),
+            "time_distribution": lambda: self.get_focus_time_distribution(
+                auth_token, csrf_token, start_date, end_date
+            ),
+            "hour_distribution": lambda: self.get_focus_hour_distribution(
+                auth_token, csrf_token, start_date, end_date
+            ),
+        }
+        timings: Dict[str, float] = {}
+
+        async def load(name: str, loader: Callable[[], Awaitable[Any]]) -> Any:
+            part_started = time.perf_counter()
+            try:
+                return await loader()
+            finally:
+                timings[name] = round((time.perf_counter() - part_started) * 1000, 1)
+
+        tasks = {name: asyncio.create_task(load(name, loader)) for name, loader in loaders.items()}
+        try:
+            _, pending = await asyncio.wait(tasks.values(), timeout=part_timeout)
+        except asyncio.CancelledError:
+            # 调用方被取消（客户端断开、批量调用超时）时未完成的部分同样在后台继续，完成后写入缓存
+            self._keep_running(task for task in tasks.values() if not task.done())
+            raise
+        self._keep_running(pending)
+
+        result: Dict[str, Any] = {"start_date": start_date, "end_date": end_date}
+        parts: Dict[str, Any] = {}
+        for name, task in tasks.items():
+            if task in pending:
+                data = {"error": "timeout", "message": f"{part_timeout} 秒内未获取到数据，稍后重试可命中缓存"}
+                status = "timeout"
+            else:
+                try:
+                    data = task.result()
+                except Exception as e:
+                    data = {"error": str(e)}
+                status = "error" if is_error_result(data) else "ok"
+            result[name] = data
+            parts[name] = {"status": status, "took_ms": timings.get(name)}
+
+        result["parts"] = parts
+        result["took_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return result
+
+    def _keep_running(self, tasks: Iterable[asyncio.Task]) -> None:
+        """保留未完成任务的引用，让它们在后台继续执行"""
+        for task in tasks:
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+
     async def query_focus_state(
         self,
         auth_token: str,
@@ -1,8 +1,10 @@
 """项目管理服务模块"""
-import httpx
+from core.http_client import create_http_client
 from typing import Optional
 from utils import app_logger
-from core import urls
+from core import config, urls, response_cache
+from core.cache import session_scope
+from core.payload import UpstreamPayload
 # 不再使用响应模型，直接返回原始响应
 
 
@@ -10,19 +12,39 @@ class ProjectService:
     """项目管理服务类"""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = create_http_client()
+        self.cache_config = config.get('cache.projects', {})
     
-    async def get_projects(self, auth_token: str, csrf_token: str) -> dict:
+    async def get_projects(self, auth_token: str, csrf_token: str, refresh: bool = False,
+                           raw: bool = False) -> dict:
         """
         获取项目/清单列表
 
+        使用 stale-while-revalidate 缓存：软过期后立即返回缓存并在后台刷新，
+        硬过期或 refresh=True 时同步请求滴答清单。缓存中保存的是上游原始字节。
+
         Args:
             auth_token: 认证令牌
             csrf_token: CSRF令牌
+            refresh: 是否跳过缓存强制刷新
+            raw: 为 True 时返回 UpstreamPayload（上游原始字节），不解析 JSON
 
         Returns:
             dict: 原始响应数据
         """
+        result = await response_cache.get_or_revalidate(
+            f"projects:{session_scope(auth_token)}",
+            lambda: self._fetch_projects(auth_token, csrf_token),
+            soft_ttl=self.cache_config.get('soft_ttl', 60),
+            hard_ttl=self.cache_config.get('hard_ttl', 3600),
+            bypass=refresh,
+        )
+        if isinstance(result, UpstreamPayload) and not raw:
+            return result.json()
+        return result
+
+    async def _fetch_projects(self, auth_token: str, csrf_token: str) -> dict:
+        """请求滴答清单获取项目/清单列表"""
         try:
             # 构建请求URL
             url = urls.build_dida_api_url(urls.DIDA_PROJECT_APIS["get_projects"])
@@ -46,14 +68,17 @@ class ProjectService:
             app_logger.info(f"请求获取项目列表: {url}")
             
             # 发送请求
-            response = await self.client.get(url, headers=headers, cookies=cookies)
+            # 原样透传的响应不保存熔断降级快照
+            response = await self.client.get(
+                url, headers=headers, cookies=cookies, extensions={"stale_fallback": False}
+            )
             
             if response.status_code == 200:
-                response_data = response.json()
-                app_logger.info(f"成功获取项目列表，项目数: {len(response_data) if isinstance(response_data, list) else 0}")
+                payload = UpstreamPayload.from_response(response)
+                app_logger.info(f"成功获取项目列表，响应大小: {payload.size} 字节")
 
                 # 直接返回原始响应
-                return response_data
+                return payload
             else:
                 app_logger.error(f"获取项目列表失败，状态码: {response.status_code}")
                 return {"error": f"HTTP {response.status_code}", "text": response.text}
@@ -0,0 +1,96 @@
+"""日期范围分块请求服务模块"""
+import asyncio
+from datetime import date
+from typing import Any, Awaitable, Callable, List
+
+from core import config, response_cache
+from core.cache import is_error_result
+from utils import app_logger, split_date_range
+from utils.date_range import parse_date, range_days
+
+
+class RangeFetcher:
+    """
+    长日期范围分块请求服务类
+
+    将跨度较大的日期范围按月/季度拆分，在并发上限内并行请求各个分块，
+    每个分块单独缓存，最后由各接口提供的合并函数汇总结果。
+    """
+
+    def __init__(self):
+        self.range_config = config.get('range_fetch', {})
+        self.cache_config = config.get('cache', {})
+        self.chunk_unit = self.range_config.get('chunk_unit', 'month')
+        self.chunk_threshold_days = self.range_config.get('chunk_threshold_days', 62)
+        self.max_concurrency = self.range_config.get('max_concurrency', 4)
+
+    def range_ttl(self, end_date: str) -> float:
+        """
+        计算日期范围数据的缓存时间
+
+        完全处于过去的数据基本不会再变化，缓存时间较长；
+        包含今天的数据仍在变化，只做短时间缓存。
+        """
+        if parse_date(end_date) < date.today():
+            return self.cache_config.get('historical_ttl', 21600)
+        return self.cache_config.get('recent_ttl', 60)
+
+    async def fetch(
+        self,
+        namespace: str,
+        start_date: str,
+        end_date: str,
+        fetch_chunk: Callable[[str, str], Awaitable[Any]],
+        merge: Callable[[List[Any]], Any],
+    ) -> Any:
+        """
+        分块获取日期范围数据
+
+        Args:
+            namespace: 缓存命名空间，需包含接口名和会话标识
+            start_date: 开始日期，格式 YYYYMMDD
+            end_date: 结束日期，格式 YYYYMMDD
+            fetch_chunk: 请求单个分块的异步函数，参数为 (开始日期, 结束日期)
+            merge: 合并各分块结果的函数，参数为按时间顺序排列的分块结果列表
+
+        Returns:
+            Any: 合并后的结果；任一分块失败时返回该分块的错误结果
+        """
+        try:
+            if range_days(start_date, end_date) <= self.chunk_threshold_days:
+                chunks = [(start_date, end_date)]
+            else:
+                chunks = split_date_range(start_date, end_date, self.chunk_unit)
+        except ValueError as e:
+            return {"error": "invalid_date_range", "message": str(e)}
+
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def load_chunk(chunk_start: str, chunk_end: str) -> Any:
+            async with semaphore:
+                return await fetch_chunk(chunk_start, chunk_end)
+
+        async def get_chunk(chunk_start: str, chunk_end: str) -> Any:
+            key = f"{namespace}:{chunk_start}:{chunk_end}"
+            return await response_cache.get_or_load(
+                key,
+                lambda: load_chunk(chunk_start, chunk_end),
+                self.range_ttl(chunk_end),
+            )
+
+        if len(chunks) > 1:
+            app_logger.info(f"日期范围 {start_date}-{end_date} 拆分为 {len(chunks)} 个分块并发请求: {namespace}")
+
+        results = await asyncio.gather(*(get_chunk(s, e) for s, e in chunks))
+
+        for result in results:
+            if is_error_result(result):
+                return result
+
+        if len(results) == 1:
+            return results[0]
+        return merge(list(results))
+
+
+# 全局日期范围分块请求服务实例
+range_fetcher = RangeFetcher()
@@ -1,14 +1,77 @@
 """统计服务模块"""
-import httpx
+from typing import Any, Dict, List
+
+from core.http_client import create_http_client
 from utils import app_logger
 from core import urls
+from core.cache import session_scope
+from services.range_fetcher import range_fetcher
+
+# 合并列表类统计项时用于识别同一对象的字段
+_STAT_IDENTITY_KEYS = ('projectId', 'tagName', 'id', 'name', 'day')
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _merge_stat_items(items: List[Any]) -> List[Any]:
+    """合并列表类统计项（如 projectStats、tagStats），同一对象的数值字段相加"""
+    merged: Dict[Any, Dict[str, Any]] = {}
+    others = []
+    for item in items:
+        if not isinstance(item, dict):
+            others.append(item)
+            continue
+        identity_key = next((key for key in _STAT_IDENTITY_KEYS if key in item), None)
+        if identity_key is None:
+            others.append(item)
+            continue
+        identity = (identity_key, item[identity_key])
+        if identity not in merged:
+            merged[identity] = dict(item)
+            continue
+        target = merged[identity]
+        for key, value in item.items():
+            if _is_number(value) and _is_number(target.get(key)):
+                target[key] += value
+    return list(merged.values()) + others
+
+
+def _merge_task_statistics_chunks(chunks: List[Any]) -> Any:
+    """
+    合并分块请求的任务统计数据
+
+    - 列表格式（按天统计）：拼接后按日期去重
+    - 对象格式（汇总统计）：数值字段相加，列表字段按项目/标签合并
+    """
+    if all(isinstance(chunk, list) for chunk in chunks):
+        return _merge_stat_items([item for chunk in chunks for item in chunk])
+
+    merged: Dict[str, Any] = {}
+    for chunk in chunks:
+        if not isinstance(chunk, dict):
+            continue
+        for key, value in chunk.items():
+            if key not in merged:
+                merged[key] = list(value) if isinstance(value, list) else value
+            elif _is_number(value) and _is_number(merged[key]):
+                merged[key] += value
+            elif isinstance(value, list) and isinstance(merged[key], list):
+                merged[key] = _merge_stat_items(merged[key] + value)
+
+    # 上游按完成数量降序返回项目和标签统计，合并后保持一致
+    for value in merged.values():
+        if isinstance(value, list) and all(isinstance(item, dict) and 'completedCount' in item for item in value):
+            value.sort(key=lambda item: item['completedCount'], reverse=True)
+    return merged
 
 
 class StatisticsService:
     """统计服务类"""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = create_http_client()
     
     def _build_auth_headers(self, auth_token: str, csrf_token: str) -> dict:
         """构建认证请求头"""
@@ -35,7 +98,9 @@ class StatisticsService:
             headers = self._build_auth_headers(auth_token, csrf_token)
             cookies = self._build_auth_cookies(auth_token, csrf_token)
             
-            response = await self.client.get(url, headers=headers, cookies=cookies)
+            response = await self.client.get(
+                url, headers=headers, cookies=cookies, extensions={"stale_fallback": True}
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -51,7 +116,9 @@ class StatisticsService:
             headers = self._build_auth_headers(auth_token, csrf_token)
             cookies = self._build_auth_cookies(auth_token, csrf_token)
             
-            response = await self.client.get(url, headers=headers, cookies=cookies)
+            response = await self.client.get(
+                url, headers=headers, cookies=cookies, extensions={"stale_fallback": True}
+            )
             
             if response.status_code == 200:
                 return response.json()
@@ -62,7 +129,24 @@ class StatisticsService:
     
     async def get_task_statistics(self, auth_token: str, csrf_token: str, 
                                 start_date: str, end_date: str) -> dict:
-        """获取任务统计信息，直接返回原始响应"""
+        """
+        获取任务统计信息，直接返回原始响应
+
+        较长的日期范围会按月/季度拆分后并发请求，分块结果单独缓存后合并。
+        """
+        return await range_fetcher.fetch(
+            f"statistics:tasks:{session_scope(auth_token)}",
+            start_date,
+            end_date,
+            lambda chunk_start, chunk_end: self._fetch_task_statistics(
+                auth_token, csrf_token, chunk_start, chunk_end
+            ),
+            _merge_task_statistics_chunks,
+        )
+
+    async def _fetch_task_statistics(self, auth_token: str, csrf_token: str,
+                                     start_date: str, end_date: str) -> dict:
+        """请求单个日期范围的任务统计信息"""
         try:
             endpoint = f"{urls.DIDA_STATISTICS_APIS['task_statistics']}/{start_date}/{end_date}"
             url = urls.build_dida_api_url(endpoint)
@@ -0,0 +1,313 @@
+"""后台同步调度模块
+
+SyncScheduler 由 main.lifespan 启动，按当前认证会话在后台定期刷新任务、清单、习惯、专注概览和专注记录存档，
+接口读取时多数命中已经预热的本地存储和缓存，不必在请求中等待上游。
+
+刷新间隔按数据的变化情况和用户活动自适应调整：
+- 每种数据的间隔在 [最短, 最长] 范围内，刷新后数据有变化则间隔减半，无变化则乘以 backoff，
+  经常变化的数据刷新得更勤，长期不变的数据逐渐放宽
+- 刷新失败时间隔加倍，避免在上游异常时持续请求
+- 超过 idle_after 秒没有请求时间隔乘以 idle_multiplier，超过 sleep_after 秒暂停，收到请求后立即恢复
+- 每次间隔随机浮动 jitter 比例，避免各项刷新集中在同一时刻
+- 全局并发上限 max_concurrency，后台刷新不会占满上游限流配额
+
+切换认证会话时全部调度状态重新开始。
+"""
+import asyncio
+import hashlib
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from core import config
+from core.cache import is_error_result
+from core.payload import UpstreamPayload
+from core.responses import render_json
+from services.dida_service import dida_service
+from services.focus_archive import focus_archive
+from services.habit_service import habit_service
+from services.pomodoro_service import pomodoro_service
+from services.project_service import project_service
+from services.task_store import task_store
+from utils import app_logger
+
+# 刷新函数：参数为 (auth_token, csrf_token)，返回数据指纹，用于判断是否变化
+RefreshFunc = Callable[[str, str], Awaitable[str]]
+
+
+def fingerprint(result: Any) -> str:
+    """
+    计算服务返回值的指纹
+
+    Raises:
+        RuntimeError: 服务返回了错误结果
+    """
+    if is_error_result(result):
+        raise RuntimeError(result.get('error') if isinstance(result, dict) else "empty result")
+    if isinstance(result, UpstreamPayload):
+        return result.etag
+    return hashlib.blake2b(render_json(result), digest_size=16).hexdigest()
+
+
+@dataclass
+class SyncJob:
+    """一项后台刷新"""
+    name: str
+    refresh: RefreshFunc
+    min_interval: float
+    max_interval: float
+    interval: float = 0.0
+    next_run: float = 0.0
+    last_run: Optional[float] = None
+    fingerprint: Optional[str] = None
+    runs: int = 0
+    changes: int = 0
+    failures: int = 0
+    last_duration_ms: Optional[float] = None
+
+    def reset(self, now: float) -> None:
+        self.interval = self.min_interval
+        self.next_run = now
+        self.last_run = None
+        self.fingerprint = None
+
+
+class SyncScheduler:
+    """按会话自适应调度的后台同步"""
+
+    def __init__(self, max_concurrency: int = 2, jitter: float = 0.2, backoff: float = 1.5,
+                 idle_after: float = 600.0, idle_multiplier: float = 4.0, sleep_after: float = 3600.0,
+                 check_interval: float = 10.0):
+        self.max_concurrency = max_concurrency
+        self.jitter = jitter
+        self.backoff = backoff
+        self.idle_after = idle_after
+        self.idle_multiplier = idle_multiplier
+        self.sleep_after = sleep_after
+        self.check_interval = check_interval
+        self.jobs: List[SyncJob] = []
+        self.session_id: Optional[str] = None
+        self._last_activity = time.monotonic()
+        self._requests = 0
+        self._resumed = asyncio.Event()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._running: Set[str] = set()
+        self._tasks: Set[asyncio.Task] = set()
+        self._loop_task: Optional[asyncio.Task] = None
+
+    def add_job(self, name: str, refresh: RefreshFunc, min_interval: float, max_interval: float) -> SyncJob:
+        """注册一项后台刷新"""
+        job = SyncJob(name, refresh, min_interval, max(min_interval, max_interval))
+        job.reset(time.monotonic())
+        self.jobs.append(job)
+        return job
+
+    # ================================
+    # 用户活动
+    # ================================
+
+    @property
+    def idle_seconds(self) -> float:
+        return time.monotonic() - self._last_activity
+
+    def record_activity(self) -> None:
+        """记录一次用户请求，空闲后的第一次请求会唤醒调度"""
+        was_idle = self.idle_seconds > self.idle_after
+        self._last_activity = time.monotonic()
+        self._requests += 1
+        if was_idle:
+            self._resumed.set()
+
+    def _resume(self, now: float) -> None:
+        """从空闲恢复：已经超过正常间隔的数据立即刷新"""
+        for job in self.jobs:
+            if job.last_run is not None:
+                due = job.last_run + job.interval
+                job.next_run = min(job.next_run, max(now, due) + random.uniform(0, self.jitter * job.min_interval))
+
+    def _delay(self, job: SyncJob) -> float:
+        delay = job.interval
+        if self.idle_seconds > self.idle_after:
+            delay *= self.idle_multiplier
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    # ================================
+    # 调度
+    # ================================
+
+    def start(self) -> None:
+        """启动调度循环"""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+            app_logger.info(f"后台同步已启动，共 {len(self.jobs)} 项，并发上限 {self.max_concurrency}")
+
+    async def stop(self) -> None:
+        """停止调度并取消进行中的刷新"""
+        tasks = list(self._tasks)
+        if self._loop_task is not None:
+            tasks.append(self._loop_task)
+            self._loop_task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _wait(self, timeout: float) -> None:
+        try:
+            await asyncio.wait_for(self._resumed.wait(), timeout=max(timeout, 0.05))
+        except asyncio.TimeoutError:
+            pass
+
+    async def _run(self) -> None:
+        while True:
+            # 每轮都先消费唤醒信号，否则没有会话时信号一直保持，_wait 会立即返回形成空转
+            now = time.monotonic()
+            if self._resumed.is_set():
+                self._resumed.clear()
+                self._resume(now)
+
+            session = dida_service.current_session
+            if not session or self.idle_seconds > self.sleep_after:
+                await self._wait(self.check_interval)
+                continue
+
+            session_id = session.get('session_id')
+            if session_id != self.session_id:
+                self.session_id = session_id
+                for job in self.jobs:
+                    job.reset(now + random.uniform(0, self.jitter * job.min_interval))
+
+            for job in self.jobs:
+                if job.next_run <= now and job.name not in self._running:
+                    self._running.add(job.name)
+                    task = asyncio.create_task(
+                        self._execute(job, session_id, session['auth_token'], session['csrf_token'])
+                    )
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+            pending = [job.next_run for job in self.jobs if job.name not in self._running]
+            next_run = min(pending, default=now + self.check_interval)
+            await self._wait(min(next_run - now, self.check_interval))
+
+    async def _execute(self, job: SyncJob, session_id: str, auth_token: str, csrf_token: str) -> None:
+        try:
+            async with self._semaphore:
+                started = time.perf_counter()
+                try:
+                    value = await job.refresh(auth_token, csrf_token)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    value = None
+                    app_logger.warning(f"后台同步 {job.name} 失败: {e}")
+                job.last_duration_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            if session_id != self.session_id:
+                # 刷新期间切换了会话，结果不再适用
+                return
+
+            job.runs += 1
+            if value is None:
+                job.failures += 1
+                job.interval = min(job.max_interval, job.interval * 2)
+            elif job.fingerprint is not None and value != job.fingerprint:
+                job.changes += 1
+                job.interval = max(job.min_interval, job.interval / 2)
+            elif job.fingerprint is not None:
+                job.interval = min(job.max_interval, job.interval * self.backoff)
+            if value is not None:
+                job.fingerprint = value
+
+            job.last_run = time.monotonic()
+            job.next_run = job.last_run + self._delay(job)
+        finally:
+            self._running.discard(job.name)
+
+    def stats(self) -> Dict[str, Any]:
+        """调度状态"""
+        now = time.monotonic()
+        return {
+            "running": self._loop_task is not None and not self._loop_task.done(),
+            "idle_seconds": round(self.idle_seconds, 1),
+            "requests": self._requests,
+            "jobs": {
+                job.name: {
+                    "interval_seconds": round(job.interval, 1),
+                    "next_run_in": round(max(job.next_run - now, 0), 1),
+                    "runs": job.runs,
+                    "changes": job.changes,
+                    "failures": job.failures,
+                    "last_duration_ms": job.last_duration_ms,
+                }
+                for job in self.jobs
+            },
+        }
+
+
+class ActivityMiddleware:
+    """把每个 HTTP 请求记录为用户活动（ASGI 中间件）"""
+
+    def __init__(self, app, scheduler: SyncScheduler):
+        self.app = app
+        self.scheduler = scheduler
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http":
+            self.scheduler.record_activity()
+        await self.app(scope, receive, send)
+
+
+async def _refresh_tasks(auth_token: str, csrf_token: str) -> str:
+    # 会话读取过本地任务存储（搜索、统计、增量变化等）之后才在后台同步
+    if not task_store.is_active():
+        return "inactive"
+    await task_store.sync()
+    return str(task_store.changes.cursor)
+
+
+async def _refresh_projects(auth_token: str, csrf_token: str) -> str:
+    return fingerprint(await project_service.get_projects(auth_token, csrf_token, refresh=True, raw=True))
+
+
+async def _refresh_habits(auth_token: str, csrf_token: str) -> str:
+    return fingerprint(await habit_service.get_habits(auth_token, csrf_token, refresh=True, raw=True))
+
+
+async def _refresh_focus(auth_token: str, csrf_token: str) -> str:
+    return fingerprint(await pomodoro_service.get_general_for_desktop(auth_token, csrf_token, refresh=True))
+
+
+async def _refresh_focus_records(auth_token: str, csrf_token: str) -> str:
+    # 会话使用过 /pomodoros/analytics 之后才在后台同步专注记录存档
+    if not await focus_archive.is_active(auth_token):
+        return "inactive"
+    return str((await focus_archive.sync(auth_token, csrf_token))['revision'])
+
+
+def _create_sync_scheduler() -> SyncScheduler:
+    """根据配置创建后台同步调度"""
+    scheduler_config = config.get('sync_scheduler', {})
+    scheduler = SyncScheduler(
+        max_concurrency=scheduler_config.get('max_concurrency', 2),
+        jitter=scheduler_config.get('jitter', 0.2),
+        backoff=scheduler_config.get('backoff', 1.5),
+        idle_after=scheduler_config.get('idle_after', 600),
+        idle_multiplier=scheduler_config.get('idle_multiplier', 4),
+        sleep_after=scheduler_config.get('sleep_after', 3600),
+    )
+    intervals = scheduler_config.get('intervals', {})
+    for name, refresh, default in (
+        ("tasks", _refresh_tasks, (30, 600)),
+        ("projects", _refresh_projects, (60, 1800)),
+        ("habits", _refresh_habits, (60, 1800)),
+        ("focus", _refresh_focus, (30, 900)),
+        ("focus_records", _refresh_focus_records, (300, 3600)),
+    ):
+        min_interval, max_interval = intervals.get(name, default)
+        scheduler.add_job(name, refresh, min_interval, max_interval)
+    return scheduler
+
+
+# 全局后台同步调度
+sync_scheduler = _create_sync_scheduler()
@@ -0,0 +1,519 @@
+"""任务内存索引模块
+
+注册到 task_store 上、由任务同步增量维护的内存索引：
+- TaskHierarchyIndex: 父子任务邻接表，子树和祖先查询的耗时与结果大小成正比
+- TaskIntervalIndex: 开始/截止时间区间索引，按时间窗口查询重叠的任务
+- TaskInvertedIndex: 标签/项目 -> 任务的倒排索引，分组列表和计数不需要遍历全部任务
+- TaskCounterIndex: 任务统计计数（总数、已完成、按项目、按优先级），读取为 O(1)
+
+每个索引的查询函数会先确保任务存储不超过 [task_store] max_age 秒。
+"""
+import math
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from dateutil.rrule import rrulestr
+
+from models import CompactTask
+from services.task_store import TaskIndex, task_store
+from utils.task_query import format_dida_time, parse_dida_time
+
+
+class TaskHierarchyIndex(TaskIndex):
+    """
+    父子任务邻接表
+
+    以任务的 parentId 为准建立 父任务 -> {子任务: sortOrder} 的映射，
+    子任务按 sortOrder 排序。遍历时记录已访问的任务，数据中存在环时不会死循环。
+    """
+
+    def __init__(self):
+        self.parents: Dict[str, str] = {}
+        self.children: Dict[str, Dict[str, int]] = {}
+
+    def reset(self) -> None:
+        self.parents = {}
+        self.children = {}
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        if task.parent_id:
+            self.parents[task.id] = task.parent_id
+            self.children.setdefault(task.parent_id, {})[task.id] = task.sort_order or 0
+
+    def remove(self, task: CompactTask) -> None:
+        parent_id = self.parents.pop(task.id, None)
+        if parent_id is None:
+            return
+        siblings = self.children.get(parent_id)
+        if siblings is not None:
+            siblings.pop(task.id, None)
+            if not siblings:
+                del self.children[parent_id]
+
+    def children_of(self, task_id: str) -> List[str]:
+        """直接子任务ID，按 sortOrder 排序"""
+        siblings = self.children.get(task_id)
+        if not siblings:
+            return []
+        return sorted(siblings, key=siblings.__getitem__)
+
+    def subtree(self, task_id: str, max_depth: Optional[int] = None) -> List[Tuple[str, int]]:
+        """
+        深度优先遍历子树（不含根任务）
+
+        Returns:
+            List[Tuple[str, int]]: 按先序排列的 (任务ID, 深度)，直接子任务深度为 1
+        """
+        result = []
+        visited = {task_id}
+        stack = [(child_id, 1) for child_id in reversed(self.children_of(task_id))]
+        while stack:
+            current, depth = stack.pop()
+            if current in visited:
+                continue
+            visited.add(current)
+            result.append((current, depth))
+            if max_depth is None or depth < max_depth:
+                stack.extend((child_id, depth + 1) for child_id in reversed(self.children_of(current)))
+        return result
+
+    def ancestors(self, task_id: str) -> List[str]:
+        """从直接父任务到根任务的ID列表"""
+        result = []
+        visited = {task_id}
+        parent_id = self.parents.get(task_id)
+        while parent_id is not None and parent_id not in visited:
+            visited.add(parent_id)
+            result.append(parent_id)
+            parent_id = self.parents.get(parent_id)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {"child_tasks": len(self.parents), "parent_tasks": len(self.children)}
+
+
+def task_interval(task: CompactTask) -> Optional[Tuple[datetime, datetime]]:
+    """
+    任务的时间区间：只有一个时间时为单点区间，都没有时返回 None
+    """
+    start = parse_dida_time(task.start_date)
+    end = parse_dida_time(task.due_date)
+    if start is None and end is None:
+        return None
+    start = start or end
+    end = end or start
+    return (start, end) if end >= start else (start, start)
+
+
+def next_occurrence(start: datetime, end: datetime, repeat_flag: str, time_zone: Optional[str],
+                    now: datetime) -> Optional[Tuple[datetime, datetime]]:
+    """
+    计算重复任务当前或下一次的时间区间（结束时间不早于 now 的第一次重复）
+
+    重复规则按任务的时区展开（例如每周一在本地时间计算）。滴答清单扩展的 TT_ 参数会被忽略，
+    无法解析的规则（如按日期列表的 ERULE）和已经结束的重复返回 None。
+    """
+    if not repeat_flag.startswith("RRULE:"):
+        return None
+    rule_text = ";".join(
+        part for part in repeat_flag[len("RRULE:"):].split(";") if part and not part.startswith("TT_")
+    )
+    try:
+        tz = ZoneInfo(time_zone) if time_zone else timezone.utc
+    except (ZoneInfoNotFoundError, ValueError):
+        tz = timezone.utc
+
+    duration = end - start
+    try:
+        rule = rrulestr(rule_text, dtstart=start.astimezone(tz))
+        occurrence = rule.after(now - duration, inc=True)
+    except (ValueError, TypeError):
+        return None
+    if occurrence is None:
+        return None
+    return occurrence, occurrence + duration
+
+
+class TaskIntervalIndex(TaskIndex):
+    """
+    任务时间区间索引
+
+    区间按开始时间排序保存在数组中，并以数组中点为根构成隐式平衡二叉树，
+    每个节点记录子树中最大的结束时间。窗口查询跳过最大结束时间早于窗口开始、
+    或开始时间晚于窗口结束的子树，耗时为 O(log n + k)。
+
+    任务变化后在下次查询时重建数组（O(n log n)，每次同步最多一次）。
+    重复任务使用当前或下一次重复的区间，当前重复结束后在下次查询时重新计算。
+    """
+
+    def __init__(self):
+        self.intervals: Dict[str, Tuple[float, float]] = {}
+        self.repeating: Dict[str, Tuple[datetime, datetime, str, Optional[str]]] = {}
+        self._ids: List[str] = []
+        self._starts: List[float] = []
+        self._ends: List[float] = []
+        self._max_ends: List[float] = []
+        self._dirty = False
+        self._refresh_at = math.inf
+
+    def reset(self) -> None:
+        self.intervals = {}
+        self.repeating = {}
+        self._dirty = True
+        self._refresh_at = math.inf
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        interval = task_interval(task)
+        if interval is None:
+            return
+        start, end = interval
+        if task.repeat_flag:
+            self.repeating[task.id] = (start, end, task.repeat_flag, task.time_zone)
+            # 重复任务的区间在下次查询时计算
+            self._refresh_at = -math.inf
+        else:
+            self.intervals[task.id] = (start.timestamp(), end.timestamp())
+        self._dirty = True
+
+    def remove(self, task: CompactTask) -> None:
+        found = self.intervals.pop(task.id, None) is not None
+        found = self.repeating.pop(task.id, None) is not None or found
+        if found:
+            self._dirty = True
+
+    def _refresh_repeating(self, now: float) -> None:
+        """重新计算重复任务的当前/下一次区间"""
+        current = datetime.fromtimestamp(now, timezone.utc)
+        self._refresh_at = math.inf
+        for task_id, (start, end, repeat_flag, time_zone) in self.repeating.items():
+            occurrence = next_occurrence(start, end, repeat_flag, time_zone, current) or (start, end)
+            occurrence_end = occurrence[1].timestamp()
+            self.intervals[task_id] = (occurrence[0].timestamp(), occurrence_end)
+            if occurrence_end >= now:
+                self._refresh_at = min(self._refresh_at, occurrence_end)
+        self._dirty = True
+
+    def _build(self) -> None:
+        """按开始时间排序并计算各子树的最大结束时间"""
+        ordered = sorted(self.intervals.items(), key=lambda item: item[1][0])
+        self._ids = [task_id for task_id, _ in ordered]
+        self._starts = [start for _, (start, _) in ordered]
+        self._ends = [end for _, (_, end) in ordered]
+        self._max_ends = [0.0] * len(ordered)
+
+        def build(lo: int, hi: int) -> float:
+            if lo >= hi:
+                return -math.inf
+            mid = (lo + hi) // 2
+            max_end = max(self._ends[mid], build(lo, mid), build(mid + 1, hi))
+            self._max_ends[mid] = max_end
+            return max_end
+
+        build(0, len(ordered))
+        self._dirty = False
+
+    def overlapping(self, window_start: datetime, window_end: datetime) -> List[Tuple[str, float, float]]:
+        """
+        查询与 [window_start, window_end] 重叠的任务
+
+        Returns:
+            List[Tuple[str, float, float]]: 按开始时间排序的 (任务ID, 开始时间戳, 结束时间戳)
+        """
+        now = time.time()
+        if now >= self._refresh_at:
+            self._refresh_repeating(now)
+        if self._dirty:
+            self._build()
+
+        low, high = window_start.timestamp(), window_end.timestamp()
+        result = []
+        # 中序遍历，只进入可能包含重叠区间的子树
+        stack: List[Tuple[int, int]] = []
+        lo, hi = 0, len(self._ids)
+        while stack or lo < hi:
+            if lo < hi:
+                mid = (lo + hi) // 2
+                if self._max_ends[mid] < low:
+                    lo = hi
+                    continue
+                stack.append((mid, hi))
+                hi = mid
+                continue
+            mid, hi = stack.pop()
+            if self._starts[mid] > high:
+                # 右侧区间开始得更晚，整个子树都不会重叠
+                lo = hi
+                continue
+            if self._ends[mid] >= low:
+                result.append((self._ids[mid], self._starts[mid], self._ends[mid]))
+            lo = mid + 1
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "dated_tasks": len(self.intervals.keys() | self.repeating.keys()),
+            "repeating_tasks": len(self.repeating),
+        }
+
+
+class TaskInvertedIndex(TaskIndex):
+    """
+    倒排索引：键（标签、项目ID等） -> 任务ID集合
+
+    同时按键维护未完成任务数，读取计数的耗时只与键的数量有关。
+    """
+
+    def __init__(self, keys: Callable[[CompactTask], Iterable[str]]):
+        self._keys = keys
+        self.members: Dict[str, Set[str]] = {}
+        self.pending: Dict[str, int] = {}
+
+    def reset(self) -> None:
+        self.members = {}
+        self.pending = {}
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        pending = not task.is_completed
+        for key in self._keys(task):
+            self.members.setdefault(key, set()).add(task.id)
+            if pending:
+                self.pending[key] = self.pending.get(key, 0) + 1
+
+    def remove(self, task: CompactTask) -> None:
+        pending = not task.is_completed
+        for key in self._keys(task):
+            members = self.members.get(key)
+            if members is None or task.id not in members:
+                continue
+            members.discard(task.id)
+            if pending:
+                self.pending[key] -= 1
+            if not members:
+                del self.members[key]
+                self.pending.pop(key, None)
+
+    def task_ids(self, key: str) -> Set[str]:
+        return self.members.get(key, set())
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """各键的任务总数和未完成任务数"""
+        return {
+            key: {"total": len(members), "pending": self.pending.get(key, 0)}
+            for key, members in self.members.items()
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {"keys": len(self.members)}
+
+
+class TaskCounterIndex(TaskIndex):
+    """
+    任务统计计数
+
+    随任务变化增量更新总数、已完成数以及按项目、按优先级的计数，/tasks/summary 直接读取。
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.total = 0
+        self.completed = 0
+        self.by_project: Dict[str, List[int]] = {}
+        self.by_priority: Dict[int, List[int]] = {}
+
+    def _apply(self, task: CompactTask, delta: int) -> None:
+        completed = delta if task.is_completed else 0
+        self.total += delta
+        self.completed += completed
+        for groups, key in ((self.by_project, task.project_id or ""), (self.by_priority, task.priority or 0)):
+            counts = groups.setdefault(key, [0, 0])
+            counts[0] += delta
+            counts[1] += completed
+            if counts[0] == 0:
+                del groups[key]
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        self._apply(task, 1)
+
+    def remove(self, task: CompactTask) -> None:
+        self._apply(task, -1)
+
+    @staticmethod
+    def _format(groups: Dict[Any, List[int]]) -> Dict[str, Dict[str, int]]:
+        return {
+            str(key): {"total": total, "completed": completed, "pending": total - completed}
+            for key, (total, completed) in groups.items()
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        pending = self.total - self.completed
+        return {
+            "total_tasks": self.total,
+            "completed_tasks": self.completed,
+            "pending_tasks": pending,
+            "completion_rate": round(self.completed / self.total * 100, 2) if self.total else 0,
+            "by_project": self._format(self.by_project),
+            "by_priority": self._format(dict(sorted(self.by_priority.items()))),
+        }
+
+
+def _tag_keys(task: CompactTask) -> Iterable[str]:
+    # 标签不区分大小写，同一任务的重复标签只计一次
+    return {tag.casefold() for tag in task.tags if tag}
+
+
+def _project_keys(task: CompactTask) -> Iterable[str]:
+    return (task.project_id,) if task.project_id else ()
+
+
+def _sorted_tasks(task_ids: Iterable[str], status: Optional[int]) -> List[Dict[str, Any]]:
+    """按 sortOrder 排序并转换为字典，可按状态筛选"""
+    tasks = [task_store.get(task_id) for task_id in task_ids]
+    tasks = [task for task in tasks if task is not None and (status is None or task.status == status)]
+    tasks.sort(key=lambda task: task.sort_order or 0)
+    return [task.to_dict() for task in tasks]
+
+
+async def get_tag_counts() -> Dict[str, Any]:
+    """
+    获取各标签的任务数
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    counts = tag_index.counts()
+    tags = [{"tag": tag, **counts[tag]} for tag in sorted(counts)]
+    return {"count": len(tags), "tags": tags}
+
+
+async def get_tag_tasks(tag: str, status: Optional[int] = None) -> Dict[str, Any]:
+    """获取带有指定标签（不区分大小写）的任务"""
+    await task_store.ensure_synced()
+    tasks = _sorted_tasks(tag_index.task_ids(tag.casefold()), status)
+    return {"tag": tag, "count": len(tasks), "tasks": tasks}
+
+
+async def get_project_counts() -> Dict[str, Any]:
+    """
+    获取各项目的任务数，项目名称来自同步时的 projectProfiles
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    names = task_store.project_names
+    projects = [
+        {"projectId": project_id, "name": names.get(project_id, ""), **count}
+        for project_id, count in project_index.counts().items()
+    ]
+    projects.sort(key=lambda project: (project["name"], project["projectId"]))
+    return {"count": len(projects), "projects": projects}
+
+
+async def get_project_tasks(project_id: str, status: Optional[int] = None) -> Dict[str, Any]:
+    """获取指定项目中的任务"""
+    await task_store.ensure_synced()
+    tasks = _sorted_tasks(project_index.task_ids(project_id), status)
+    return {
+        "projectId": project_id,
+        "name": task_store.project_names.get(project_id, ""),
+        "count": len(tasks),
+        "tasks": tasks,
+    }
+
+
+async def get_summary() -> Dict[str, Any]:
+    """
+    获取任务统计（读取增量维护的计数）
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    return counter_index.summary()
+
+
+async def get_subtree(task_id: str, max_depth: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """
+    获取任务的全部子孙任务，任务不存在时返回 None
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    root = task_store.get(task_id)
+    if root is None:
+        return None
+    tasks = []
+    for descendant_id, depth in hierarchy_index.subtree(task_id, max_depth):
+        task = task_store.get(descendant_id)
+        if task is not None:
+            tasks.append({"depth": depth, **task.to_dict()})
+    return {"task": root.to_dict(), "count": len(tasks), "tasks": tasks}
+
+
+async def get_ancestors(task_id: str) -> Optional[Dict[str, Any]]:
+    """
+    获取任务的祖先任务（从直接父任务到根任务），任务不存在时返回 None
+
+    父任务不在任务列表中（例如已删除）时到此为止。
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    task = task_store.get(task_id)
+    if task is None:
+        return None
+    tasks = []
+    for ancestor_id in hierarchy_index.ancestors(task_id):
+        ancestor = task_store.get(ancestor_id)
+        if ancestor is None:
+            break
+        tasks.append(ancestor.to_dict())
+    return {"task": task.to_dict(), "count": len(tasks), "tasks": tasks}
+
+
+async def get_window(window_start: datetime, window_end: datetime) -> Dict[str, Any]:
+    """
+    获取时间区间与窗口重叠的任务
+
+    返回的任务带有 occurrenceStart / occurrenceEnd，重复任务为当前或下一次重复的时间。
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    tasks = []
+    for task_id, start, end in interval_index.overlapping(window_start, window_end):
+        task = task_store.get(task_id)
+        if task is not None:
+            tasks.append({
+                **task.to_dict(),
+                "occurrenceStart": format_dida_time(datetime.fromtimestamp(start, timezone.utc)),
+                "occurrenceEnd": format_dida_time(datetime.fromtimestamp(end, timezone.utc)),
+            })
+    return {
+        "from": format_dida_time(window_start),
+        "to": format_dida_time(window_end),
+        "count": len(tasks),
+        "tasks": tasks,
+    }
+
+
+# 全局索引
+hierarchy_index = task_store.register(TaskHierarchyIndex())
+interval_index = task_store.register(TaskIntervalIndex())
+tag_index = task_store.register(TaskInvertedIndex(_tag_keys))
+project_index = task_store.register(TaskInvertedIndex(_project_keys))
+counter_index = task_store.register(TaskCounterIndex())
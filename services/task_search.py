@@ -0,0 +1,151 @@
+"""任务全文搜索模块
+
+在内存 SQLite FTS5 表中索引任务标题、内容和检查项，由任务同步增量维护，
+/tasks/search 直接查询本地索引，不再下载全部任务后在客户端逐个匹配。
+
+FTS5 内置的 unicode61 分词器把连续的中文当作一个词，无法搜索词中间的部分，
+因此写入前先在 Python 中分词：
+- 中日韩文字切分为重叠的二元组（"会议纪要" -> 会议 议纪 纪要），每段末尾的字单独作为一个词，
+  使单字查询可以用前缀匹配命中任意位置
+- 其他文字按单词切分并转为小写
+查询按同样的规则分词，连续的中文作为短语匹配，结果按 bm25 排序（标题权重最高）。
+"""
+import re
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from models import CompactTask
+from services.task_store import TaskIndex, task_store
+
+_CJK_RANGES = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"
+_TOKEN_PATTERN = re.compile(f"([{_CJK_RANGES}]+)|([^\\W_{_CJK_RANGES}]+)")
+
+# bm25 列权重：task_id, title, content, items
+_BM25_WEIGHTS = (0.0, 10.0, 1.0, 3.0)
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """把文本切分为索引使用的词"""
+    tokens = []
+    for cjk, word in _TOKEN_PATTERN.findall(text or ""):
+        if word:
+            tokens.append(word.lower())
+            continue
+        tokens.extend(cjk[i:i + 2] for i in range(len(cjk) - 1))
+        tokens.append(cjk[-1])
+    return tokens
+
+
+def build_match_query(query: str) -> Optional[str]:
+    """
+    把用户输入转换为 FTS5 MATCH 表达式
+
+    各部分之间为"与"关系；最后一个英文单词按前缀匹配，便于边输入边搜索。
+    """
+    terms = []
+    parts = _TOKEN_PATTERN.findall(query or "")
+    for position, (cjk, word) in enumerate(parts):
+        if word:
+            last = position == len(parts) - 1
+            terms.append(f'"{word.lower()}"' + ("*" if last else ""))
+        elif len(cjk) == 1:
+            terms.append(f'"{cjk}"*')
+        else:
+            bigrams = " ".join(cjk[i:i + 2] for i in range(len(cjk) - 1))
+            terms.append(f'"{bigrams}"')
+    return " ".join(terms) or None
+
+
+class TaskSearchIndex(TaskIndex):
+    """基于 SQLite FTS5 的任务全文索引"""
+
+    raw_fields = ('items',)
+
+    def __init__(self):
+        self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._rowids: Dict[str, int] = {}
+        self._next_rowid = 1
+        self._create_table()
+
+    def _create_table(self) -> None:
+        self._db.execute("DROP TABLE IF EXISTS task_fts")
+        self._db.execute(
+            "CREATE VIRTUAL TABLE task_fts USING fts5("
+            "task_id UNINDEXED, title, content, items, tokenize='unicode61 remove_diacritics 2')"
+        )
+
+    def reset(self) -> None:
+        self._rowids = {}
+        self._next_rowid = 1
+        self._create_table()
+        self._db.commit()
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        rowid = self._next_rowid
+        self._next_rowid += 1
+        self._rowids[task.id] = rowid
+        content = " ".join(filter(None, (task.content, task.desc)))
+        items = " ".join(item.get('title') or "" for item in raw.get('items') or ())
+        self._db.execute(
+            "INSERT INTO task_fts(rowid, task_id, title, content, items) VALUES (?, ?, ?, ?, ?)",
+            (rowid, task.id, " ".join(tokenize(task.title)), " ".join(tokenize(content)),
+             " ".join(tokenize(items))),
+        )
+
+    def remove(self, task: CompactTask) -> None:
+        rowid = self._rowids.pop(task.id, None)
+        if rowid is not None:
+            self._db.execute("DELETE FROM task_fts WHERE rowid = ?", (rowid,))
+
+    def flush(self) -> None:
+        self._db.commit()
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """
+        搜索任务
+
+        Returns:
+            List[Tuple[str, float]]: 按相关度排序的 (任务ID, 得分)，得分越高越相关
+        """
+        match = build_match_query(query)
+        if match is None:
+            return []
+        weights = ", ".join(str(weight) for weight in _BM25_WEIGHTS)
+        rows = self._db.execute(
+            f"SELECT task_id, bm25(task_fts, {weights}) AS score FROM task_fts "
+            f"WHERE task_fts MATCH ? ORDER BY score LIMIT ?",
+            (match, limit),
+        ).fetchall()
+        # bm25 越小越相关，取反后作为得分
+        return [(task_id, round(-score, 4)) for task_id, score in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"indexed_tasks": len(self._rowids)}
+
+
+async def search_tasks(query: str, limit: int = 20) -> Dict[str, Any]:
+    """
+    同步任务后在本地索引中搜索
+
+    Raises:
+        ValueError: 未设置认证会话
+        httpx.HTTPError: 同步任务失败
+    """
+    await task_store.ensure_synced()
+    started = time.perf_counter()
+    results = []
+    for task_id, score in task_search_index.search(query, limit):
+        task = task_store.get(task_id)
+        if task is not None:
+            results.append({"score": score, **task.to_dict()})
+    return {
+        "query": query,
+        "count": len(results),
+        "took_ms": round((time.perf_counter() - started) * 1000, 2),
+        "results": results,
+    }
+
+
+# 全局搜索索引
+task_search_index = task_store.register(TaskSearchIndex())
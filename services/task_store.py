@@ -0,0 +1,330 @@
+"""本地任务存储模块
+
+TaskStore 把 /batch/check/0 中的任务以 CompactTask 的形式保存在内存中，
+搜索、层级、日期窗口等本地索引注册到存储上，由任务同步统一维护：
+
+- 同步时流式遍历上游任务，按任务ID和 etag 判断新增、修改和删除（utils/task_diff.py）
+- 只有发生变化的任务才会通知索引（先 remove 旧任务，再 add 新任务），上游数据全部读完后才统一应用，
+  同步失败时保留上一次的结果
+- 每次同步的变化记录在 changes 中，按游标提供增量变化
+- 切换认证会话时清空存储和全部索引
+
+用法::
+
+    await task_store.ensure_synced()
+    task = task_store.get(task_id)
+"""
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from core import config
+from models import CompactTask
+from services.dida_service import dida_service
+from utils import ValuePool, app_logger
+from utils.task_diff import UNCHANGED, TaskDiff, TaskDiffer
+
+
+class TaskIndex:
+    """
+    任务索引基类
+
+    上游任务流读完后，对每个变化的任务调用 remove / add，一次同步结束后调用 flush。
+    add 同时收到原始任务中 raw_fields 列出的字段，索引可以读取 CompactTask 未保存的字段（如检查项）。
+    """
+
+    # add 需要的原始任务字段，同步时只为变化的任务保留这些字段
+    raw_fields: Tuple[str, ...] = ()
+
+    def reset(self) -> None:
+        """清空索引"""
+
+    def add(self, task: CompactTask, raw: Dict[str, Any]) -> None:
+        """加入一个任务"""
+
+    def remove(self, task: CompactTask) -> None:
+        """移除一个任务"""
+
+    def flush(self) -> None:
+        """一次同步应用完成"""
+
+
+class TaskChangeLog:
+    """
+    任务变化记录
+
+    每次有变化的同步记录为一个条目，游标为记录时的毫秒时间戳（严格递增，服务重启后也不会回退）。
+    最多保留 max_entries 个条目，更早的游标无法再计算增量，需要客户端重新获取全量数据。
+    """
+
+    def __init__(self, max_entries: int = 100):
+        self.max_entries = max_entries
+        self.entries: Deque[Tuple[int, TaskDiff]] = deque()
+        self.listeners: List[Callable[[], None]] = []
+        self.cursor = 0
+        self.base = self.cursor = self._next_cursor()
+
+    def _next_cursor(self) -> int:
+        return max(int(time.time() * 1000), self.cursor + 1)
+
+    def reset(self) -> None:
+        """清空记录，之前的游标全部失效"""
+        self.entries.clear()
+        self.base = self.cursor = self._next_cursor()
+        self._notify()
+
+    def record(self, diff: TaskDiff) -> int:
+        """记录一次变化，返回新的游标"""
+        self.cursor = self._next_cursor()
+        self.entries.append((self.cursor, diff))
+        while len(self.entries) > self.max_entries:
+            self.base = self.entries.popleft()[0]
+        self._notify()
+        return self.cursor
+
+    def _notify(self) -> None:
+        for listener in self.listeners:
+            listener()
+
+    def since(self, cursor: int) -> Optional[TaskDiff]:
+        """
+        合并游标之后的全部变化
+
+        Returns:
+            Optional[TaskDiff]: 游标已过期或不属于当前记录时返回 None
+        """
+        if cursor < self.base or cursor > self.cursor:
+            return None
+        return TaskDiff.merge(diff for entry_cursor, diff in self.entries if entry_cursor > cursor)
+
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    """调用方已取消时由回调取走同步异常，避免 "Task exception was never retrieved" 警告"""
+    if not task.cancelled():
+        task.exception()
+
+
+class TaskStore:
+    """内存中的任务存储，由任务同步保持最新"""
+
+    def __init__(self, max_age: float = 30.0, change_log_size: int = 100):
+        self.max_age = max_age
+        self.tasks: Dict[str, CompactTask] = {}
+        self.checkpoint: Optional[int] = None
+        self.project_names: Dict[str, str] = {}
+        self.synced_at: Optional[float] = None
+        self.session_id: Optional[str] = None
+        self.indexes: List[TaskIndex] = []
+        # 任务间共享项目ID、标签等重复值，切换会话时随存储一起清空
+        self.pool = ValuePool()
+        self.changes = TaskChangeLog(change_log_size)
+        self._lock = asyncio.Lock()
+        self._syncs = 0
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def register(self, index: TaskIndex) -> TaskIndex:
+        """注册索引（在首次同步之前注册）"""
+        self.indexes.append(index)
+        return index
+
+    def get(self, task_id: str) -> Optional[CompactTask]:
+        return self.tasks.get(task_id)
+
+    def __len__(self) -> int:
+        return len(self.tasks)
+
+    def __iter__(self) -> Iterator[CompactTask]:
+        return iter(self.tasks.values())
+
+    @property
+    def age(self) -> Optional[float]:
+        """距上次同步的秒数，从未同步时返回 None"""
+        return None if self.synced_at is None else time.monotonic() - self.synced_at
+
+    def reset(self) -> None:
+        """清空任务和全部索引"""
+        self.tasks = {}
+        self.checkpoint = None
+        self.project_names = {}
+        self.pool = ValuePool()
+        self.changes.reset()
+        self.synced_at = None
+        for index in self.indexes:
+            index.reset()
+
+    def _check_session(self) -> str:
+        """确认认证会话，会话变化时清空存储"""
+        session = dida_service.current_session
+        if not session:
+            raise ValueError("未设置认证会话，请先登录")
+        session_id = session.get('session_id')
+        if session_id != self.session_id:
+            if self.session_id is not None:
+                app_logger.info("认证会话已变化，清空本地任务存储")
+            self.reset()
+            self.session_id = session_id
+        return session_id
+
+    def is_active(self) -> bool:
+        """
+        当前会话是否使用过任务存储（完成过一次同步）
+
+        后台同步只刷新使用过的存储，没有读取过本地任务的会话不会在后台反复下载全部任务。
+        """
+        self._check_session()
+        return self.synced_at is not None
+
+    async def ensure_synced(self, max_age: Optional[float] = None) -> None:
+        """
+        确保任务数据不超过 max_age 秒，过期或从未同步时进行同步
+
+        Raises:
+            ValueError: 未设置认证会话
+            httpx.HTTPError: 请求上游失败
+        """
+        max_age = self.max_age if max_age is None else max_age
+        self._check_session()
+        if self.age is not None and self.age <= max_age:
+            return
+        syncs = self._syncs
+        async with self._lock:
+            # 等待期间其他请求已经完成了同步
+            if self._syncs != syncs and self.age is not None and self.age <= max_age:
+                return
+            await self._sync()
+
+    async def sync(self) -> Dict[str, int]:
+        """立即同步，返回新增、修改、删除的任务数"""
+        self._check_session()
+        async with self._lock:
+            return await self._sync()
+
+    async def _sync(self) -> Dict[str, int]:
+        """
+        在独立的任务中同步
+
+        调用方被取消（客户端断开、批量调用超时、推送停止）时同步继续完成；
+        同步失败时保留上一次同步的任务、索引和变化记录。
+        """
+        previous = self._sync_task
+        if previous is not None and not previous.done():
+            # 上一次同步的调用方已被取消，等它完成后再开始新的同步
+            await asyncio.wait({previous})
+        task = asyncio.create_task(self._apply_upstream())
+        task.add_done_callback(_retrieve_exception)
+        self._sync_task = task
+        return await asyncio.shield(task)
+
+    async def _apply_upstream(self) -> Dict[str, int]:
+        started = time.perf_counter()
+        previous = self.tasks
+        current: Dict[str, CompactTask] = {}
+        # (旧任务, 新任务, 索引需要的原始字段)，流读完后再统一应用到索引
+        changed: List[Tuple[Optional[CompactTask], CompactTask, Dict[str, Any]]] = []
+        raw_fields = {field for index in self.indexes for field in index.raw_fields}
+        differ = TaskDiffer(previous, etag=lambda task: task.etag)
+
+        async with dida_service.stream_all_tasks() as stream:
+            async for raw in stream:
+                task_id = raw.get('id')
+                if not task_id:
+                    continue
+                state = differ.observe(task_id, raw.get('etag'))
+                if state is None:
+                    continue
+                if state == UNCHANGED:
+                    current[task_id] = previous[task_id]
+                    continue
+
+                task = CompactTask.from_dict(raw, self.pool)
+                fields = {field: raw[field] for field in raw_fields if field in raw}
+                changed.append((previous.get(task_id), task, fields))
+                current[task_id] = task
+            checkpoint = stream.rest.get('checkPoint')
+            project_profiles = stream.rest.get('projectProfiles') or []
+
+        diff = differ.finish()
+
+        # 以下到返回之间没有 await，读取方看到的索引和任务总是同一次同步的完整结果
+        for old, task, fields in changed:
+            for index in self.indexes:
+                if old is not None:
+                    index.remove(old)
+                index.add(task, fields)
+        for task_id in diff.deleted:
+            for index in self.indexes:
+                index.remove(previous[task_id])
+        for index in self.indexes:
+            index.flush()
+
+        self.tasks = current
+        self.checkpoint = checkpoint
+        self.project_names = {p['id']: p.get('name', '') for p in project_profiles if p.get('id')}
+        self.synced_at = time.monotonic()
+        self._syncs += 1
+        if diff:
+            self.changes.record(diff)
+
+        elapsed = (time.perf_counter() - started) * 1000
+        app_logger.info(
+            f"任务同步完成，共 {len(current)} 个任务，新增 {len(diff.added)}，修改 {len(diff.modified)}，"
+            f"删除 {len(diff.deleted)}，耗时 {elapsed:.0f}ms"
+        )
+        return {"total": len(current), **diff.counts()}
+
+    async def changes_since(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        同步后获取游标之后的任务变化
+
+        Raises:
+            ValueError: 未设置认证会话
+            httpx.HTTPError: 同步任务失败
+        """
+        await self.ensure_synced()
+        return self.changes_payload(since)
+
+    def changes_payload(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """
+        当前数据中游标之后的任务变化
+
+        没有游标或游标已过期（超出保留的记录、切换过会话、服务重启前的游标在记录之外）时
+        返回 reset=True，added 为当前全部任务，客户端应以此替换本地数据。
+        """
+        diff = self.changes.since(since) if since is not None else None
+        reset = diff is None
+        if reset:
+            diff = TaskDiff(added=list(self.tasks))
+
+        def tasks(task_ids: List[str]) -> List[Dict[str, Any]]:
+            return [self.tasks[task_id].to_dict() for task_id in task_ids if task_id in self.tasks]
+
+        return {
+            "cursor": self.changes.cursor,
+            "since": since,
+            "reset": reset,
+            "added": tasks(diff.added),
+            "modified": tasks(diff.modified),
+            "deleted": diff.deleted,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """存储状态"""
+        age = self.age
+        return {
+            "tasks": len(self.tasks),
+            "checkpoint": self.checkpoint,
+            "age_seconds": round(age, 1) if age is not None else None,
+            "syncs": self._syncs,
+            "shared_values": len(self.pool),
+            "change_cursor": self.changes.cursor,
+            "change_entries": len(self.changes.entries),
+            "indexes": [type(index).__name__ for index in self.indexes],
+        }
+
+
+# 全局任务存储
+task_store = TaskStore(
+    max_age=config.get('task_store.max_age', 30),
+    change_log_size=config.get('task_store.change_log_size', 100),
+)
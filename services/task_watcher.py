@@ -0,0 +1,199 @@
+"""任务变化推送模块
+
+TaskWatcher 在后台轮询上游任务，把变化通过 Server-Sent Events 推送给任意数量的客户端：
+
+- 只要有订阅者，就由一个后台任务定期同步 task_store，上游请求数与客户端数量无关
+- 轮询间隔自适应：有变化时回到 min_interval，连续无变化时按 backoff 倍数逐渐放宽到 max_interval
+- 其他接口触发的同步也会唤醒推送，不必等到下一次轮询
+- 每次变化只编码一次，所有订阅者共享同一份事件数据
+
+每个订阅者记录自己的游标。事件的起点与订阅者游标不一致时（刚连接、队列已满丢弃过事件），
+改为从变化记录中按订阅者自己的游标重新计算，保证客户端收到的变化不重复也不遗漏。
+"""
+import asyncio
+from typing import Any, AsyncIterator, Dict, Optional, Set, Tuple
+
+from core import config
+from core.responses import render_json
+from services.task_store import task_store
+from utils import app_logger
+
+# (起点游标, 新游标, 编码后的事件数据)
+WatchEvent = Tuple[Optional[int], int, bytes]
+
+
+def format_event(event: str, data: bytes, event_id: Optional[int] = None) -> bytes:
+    """格式化为 text/event-stream 的一条事件（data 为单行 JSON）"""
+    head = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{head}event: {event}\n".encode() + b"data: " + data + b"\n\n"
+
+
+def _has_changes(payload: Dict[str, Any]) -> bool:
+    return payload['reset'] or bool(payload['added'] or payload['modified'] or payload['deleted'])
+
+
+class TaskSubscriber:
+    """一个推送连接"""
+
+    def __init__(self, cursor: Optional[int], queue_size: int):
+        self.cursor = cursor
+        self.queue: "asyncio.Queue[WatchEvent]" = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def offer(self, event: WatchEvent) -> None:
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # 客户端读取过慢，清空队列，下次按自己的游标从变化记录中补齐
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(event)
+
+
+class TaskWatcher:
+    """共享的任务变化轮询和推送"""
+
+    def __init__(self, min_interval: float = 5.0, max_interval: float = 60.0, backoff: float = 1.5,
+                 heartbeat: float = 15.0, queue_size: int = 16):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.heartbeat = heartbeat
+        self.queue_size = queue_size
+        self.interval = min_interval
+        self.cursor: Optional[int] = None
+        self._subscribers: Set[TaskSubscriber] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._polls = 0
+        self._events = 0
+        task_store.changes.listeners.append(self._wakeup.set)
+
+    def subscribe(self, cursor: Optional[int]) -> TaskSubscriber:
+        """加入订阅者，第一个订阅者加入时启动轮询"""
+        subscriber = TaskSubscriber(cursor, self.queue_size)
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self.cursor = task_store.changes.cursor
+            self.interval = self.min_interval
+            self._task = asyncio.create_task(self._run())
+            app_logger.info("任务变化推送已启动")
+        return subscriber
+
+    def unsubscribe(self, subscriber: TaskSubscriber) -> None:
+        """移除订阅者，没有订阅者时唤醒轮询使其退出"""
+        self._subscribers.discard(subscriber)
+        if not self._subscribers:
+            # 不取消轮询任务：取消进行中的同步会清空任务存储，由轮询在当前同步完成后自行退出
+            self._wakeup.set()
+
+    async def stop(self) -> None:
+        """停止轮询（服务关闭时调用）"""
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        while self._subscribers:
+            try:
+                woken = await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+            except asyncio.TimeoutError:
+                woken = False
+            self._wakeup.clear()
+            if not self._subscribers:
+                break
+
+            if not woken:
+                try:
+                    # 其他请求刚同步过时不重复请求上游
+                    await task_store.ensure_synced(max_age=self.interval)
+                    self._polls += 1
+                except Exception as e:
+                    app_logger.warning(f"任务变化推送同步失败: {e}")
+                    self.interval = self.max_interval
+                    continue
+                self._wakeup.clear()
+
+            if self._publish():
+                self.interval = self.min_interval
+            elif not woken:
+                self.interval = min(self.max_interval, self.interval * self.backoff)
+        app_logger.info("任务变化推送已停止（没有订阅者）")
+
+    def _publish(self) -> bool:
+        """把上次推送之后的变化发给全部订阅者，返回是否有变化"""
+        if task_store.synced_at is None:
+            # 存储刚被清空，等重新同步后再推送（届时游标已过期，会推送 reset）
+            return False
+        payload = task_store.changes_payload(self.cursor)
+        if payload['cursor'] == self.cursor or not _has_changes(payload):
+            return False
+
+        event = (self.cursor, payload['cursor'], render_json(payload))
+        self.cursor = payload['cursor']
+        self._events += 1
+        for subscriber in self._subscribers:
+            subscriber.offer(event)
+        return True
+
+    async def stream(self, since: Optional[int] = None) -> AsyncIterator[bytes]:
+        """
+        订阅任务变化，生成 text/event-stream 数据
+
+        连接后先发送 since 之后的变化（since 为空或已过期时为 reset 和全部任务），
+        之后每次有变化发送一条 changes 事件，空闲时定期发送注释行保持连接。
+        调用前需先确保任务已同步（task_store.ensure_synced）。
+        """
+        subscriber = self.subscribe(since)
+        try:
+            yield f"retry: {int(self.min_interval * 1000)}\n\n".encode()
+            initial = task_store.changes_payload(since)
+            subscriber.cursor = initial['cursor']
+            if _has_changes(initial):
+                yield format_event("changes", render_json(initial), initial['cursor'])
+
+            while True:
+                try:
+                    start, cursor, data = await asyncio.wait_for(subscriber.queue.get(), timeout=self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield b": ping\n\n"
+                    continue
+
+                if cursor <= subscriber.cursor:
+                    continue
+                if start != subscriber.cursor or subscriber.overflowed:
+                    subscriber.overflowed = False
+                    payload = task_store.changes_payload(subscriber.cursor)
+                    cursor, data = payload['cursor'], render_json(payload)
+                    if not _has_changes(payload):
+                        subscriber.cursor = cursor
+                        continue
+                subscriber.cursor = cursor
+                yield format_event("changes", data, cursor)
+        finally:
+            self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, Any]:
+        """推送状态"""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "subscribers": len(self._subscribers),
+            "interval_seconds": round(self.interval, 1),
+            "polls": self._polls,
+            "events": self._events,
+        }
+
+
+# 全局任务变化推送
+task_watcher = TaskWatcher(
+    min_interval=config.get('task_watcher.min_interval', 5),
+    max_interval=config.get('task_watcher.max_interval', 60),
+    backoff=config.get('task_watcher.backoff', 1.5),
+    heartbeat=config.get('task_watcher.heartbeat', 15),
+    queue_size=config.get('task_watcher.queue_size', 16),
+)
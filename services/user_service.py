@@ -1,6 +1,7 @@
 """用户信息服务模块"""
-import httpx
-from core import urls
+from core.http_client import create_http_client
+from core import config, urls, response_cache
+from core.cache import session_scope
 from utils import app_logger
 
 
@@ -8,7 +9,8 @@ class UserService:
     """用户信息服务类"""
     
     def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self.client = create_http_client()
+        self.cache_config = config.get('cache.user_profile', {})
     
     def _build_auth_headers(self, auth_token: str, csrf_token: str) -> dict:
         """构建认证headers"""
@@ -30,17 +32,31 @@ class UserService:
             '_csrf_token': csrf_token
         }
     
-    async def get_user_profile(self, auth_token: str, csrf_token: str) -> dict:
+    async def get_user_profile(self, auth_token: str, csrf_token: str, refresh: bool = False) -> dict:
         """
         获取用户信息，直接返回原始响应
+
+        使用 stale-while-revalidate 缓存：软过期后立即返回缓存并在后台刷新，
+        硬过期或 refresh=True 时同步请求滴答清单。
         
         Args:
             auth_token: 认证令牌
             csrf_token: CSRF令牌
+            refresh: 是否跳过缓存强制刷新
             
         Returns:
             dict: 原始API响应
         """
+        return await response_cache.get_or_revalidate(
+            f"user_profile:{session_scope(auth_token)}",
+            lambda: self._fetch_user_profile(auth_token, csrf_token),
+            soft_ttl=self.cache_config.get('soft_ttl', 300),
+            hard_ttl=self.cache_config.get('hard_ttl', 86400),
+            bypass=refresh,
+        )
+
+    async def _fetch_user_profile(self, auth_token: str, csrf_token: str) -> dict:
+        """请求滴答清单获取用户信息"""
         try:
             url = urls.build_dida_api_url(urls.DIDA_AUTH_APIS["user_profile"])
             headers = self._build_auth_headers(auth_token, csrf_token)
@@ -1,5 +1,11 @@
 # 工具模块
 from .logger import app_logger
 from .object_id import ObjectIdGenerator, generate_object_id
+from .date_range import split_date_range
+from .json_stream import JsonArrayStream
+from .task_query import TaskQuery
+from .interning import ValuePool
+from .task_diff import TaskDiff, TaskDiffer, diff_snapshots
 
-__all__ = ['app_logger', 'ObjectIdGenerator', 'generate_object_id']
+__all__ = ['app_logger', 'ObjectIdGenerator', 'generate_object_id', 'split_date_range', 'JsonArrayStream', 'TaskQuery',
+           'ValuePool', 'TaskDiff', 'TaskDiffer', 'diff_snapshots']
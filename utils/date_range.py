@@ -0,0 +1,73 @@
+"""日期范围工具
+
+用于把较长的 YYYYMMDD 日期范围按自然月或自然季度拆分成多个连续的小区间。
+区间边界与日历对齐，这样不同查询中重叠的完整月份/季度可以复用同一个缓存块。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Tuple
+
+DATE_FORMAT = "%Y%m%d"
+
+CHUNK_UNITS = ("month", "quarter")
+
+
+def parse_date(value: str) -> date:
+    """解析 YYYYMMDD 格式的日期字符串"""
+    return datetime.strptime(value, DATE_FORMAT).date()
+
+
+def format_date(value: date) -> str:
+    """格式化为 YYYYMMDD 字符串"""
+    return value.strftime(DATE_FORMAT)
+
+
+def _next_boundary(current: date, unit: str) -> date:
+    """获取 current 之后下一个月/季度的第一天"""
+    months = 1 if unit == "month" else 3
+    # 季度按 1/4/7/10 月对齐
+    month_index = current.month - 1
+    if unit == "quarter":
+        month_index -= month_index % 3
+    month_index += months
+    year = current.year + month_index // 12
+    return date(year, month_index % 12 + 1, 1)
+
+
+def split_date_range(start_date: str, end_date: str, unit: str = "month") -> List[Tuple[str, str]]:
+    """
+    按自然月或自然季度拆分日期范围
+
+    Args:
+        start_date: 开始日期，格式 YYYYMMDD
+        end_date: 结束日期，格式 YYYYMMDD（包含）
+        unit: 拆分单位，month 或 quarter
+
+    Returns:
+        List[Tuple[str, str]]: 按时间顺序排列的 (开始日期, 结束日期) 列表
+
+    Example:
+        >>> split_date_range("20230115", "20230310")
+        [('20230115', '20230131'), ('20230201', '20230228'), ('20230301', '20230310')]
+    """
+    if unit not in CHUNK_UNITS:
+        raise ValueError(f"不支持的拆分单位: {unit}")
+
+    start = parse_date(start_date)
+    end = parse_date(end_date)
+    if start > end:
+        raise ValueError("开始日期不能晚于结束日期")
+
+    chunks = []
+    current = start
+    while current <= end:
+        chunk_end = min(_next_boundary(current, unit) - timedelta(days=1), end)
+        chunks.append((format_date(current), format_date(chunk_end)))
+        current = chunk_end + timedelta(days=1)
+
+    return chunks
+
+
+def range_days(start_date: str, end_date: str) -> int:
+    """计算日期范围包含的天数"""
+    return (parse_date(end_date) - parse_date(start_date)).days + 1
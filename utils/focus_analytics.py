@@ -0,0 +1,221 @@
+"""专注统计工具
+
+基于 NumPy 在本地计算专注统计，可以替代上游的热力图、按小时分布、按天分时段分布和详情分布接口，
+并支持上游不提供的任意日期范围和桶大小（例如按周的热力图、按 15 分钟的时段分布）。
+
+专注记录按其中的任务片段（tasks[].startTime ~ endTime，不含暂停）统计。
+核心是累计函数 F(t)：时刻 t 之前的专注总时长
+    F(t) = Σ(t - 开始时间, 开始 < t) - Σ(t - 结束时间, 结束 < t)
+把全部片段的开始、结束时间分别排序并计算前缀和后，任意一组时刻的 F 都可以用 searchsorted 一次算出。
+每个桶的专注时长就是桶两端 F 的差，跨越桶边界（例如跨过零点）的片段按实际时间拆分到各个桶中，
+复杂度 O((片段数 + 桶数) · log 片段数)。时间使用 int64 毫秒，前缀和没有精度损失。
+"""
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from utils.task_query import CHINA_TZ
+
+MINUTE_MS = 60 * 1000
+DAY_MS = 24 * 60 * MINUTE_MS
+MINUTES_PER_DAY = 24 * 60
+# clock_by_day 矩阵（天数 × 每天的桶数）的默认单元格上限
+DEFAULT_MAX_CELLS = 50000
+
+# (开始毫秒, 结束毫秒, 任务ID, 任务标题, 项目名称)
+SegmentRow = Tuple[int, int, Optional[str], Optional[str], Optional[str]]
+
+
+def _minutes(values: np.ndarray) -> List[float]:
+    """毫秒转换为分钟，保留一位小数"""
+    return np.round(values / MINUTE_MS, 1).tolist()
+
+
+def day_start_ms(day: date) -> int:
+    """中国时区当天零点的毫秒时间戳"""
+    return int(datetime.combine(day, time.min, tzinfo=CHINA_TZ).timestamp() * 1000)
+
+
+class FocusSegments:
+    """专注片段的列式数组"""
+
+    __slots__ = ("starts", "ends", "task_codes", "project_codes", "tasks", "projects",
+                 "_sorted_starts", "_start_prefix", "_sorted_ends", "_end_prefix")
+
+    def __init__(self, starts: np.ndarray, ends: np.ndarray, task_codes: np.ndarray,
+                 project_codes: np.ndarray, tasks: List[Tuple[str, str, str]], projects: List[str]):
+        """
+        Args:
+            starts / ends: 片段开始、结束时间（int64 毫秒）
+            task_codes / project_codes: 片段所属任务、项目在 tasks / projects 中的下标
+            tasks: (任务ID, 标题, 项目名称)
+            projects: 项目名称
+        """
+        self.starts = starts
+        self.ends = ends
+        self.task_codes = task_codes
+        self.project_codes = project_codes
+        self.tasks = tasks
+        self.projects = projects
+        self._sorted_starts = np.sort(starts)
+        self._sorted_ends = np.sort(ends)
+        self._start_prefix = np.concatenate(([0], np.cumsum(self._sorted_starts, dtype=np.int64)))
+        self._end_prefix = np.concatenate(([0], np.cumsum(self._sorted_ends, dtype=np.int64)))
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[SegmentRow]) -> "FocusSegments":
+        """从 (开始, 结束, 任务ID, 标题, 项目) 行创建，忽略结束不晚于开始的片段"""
+        task_index: Dict[Tuple[str, str], int] = {}
+        project_index: Dict[str, int] = {}
+        tasks: List[Tuple[str, str, str]] = []
+        starts, ends, task_codes, project_codes = [], [], [], []
+
+        for start, end, task_id, title, project in rows:
+            if end <= start:
+                continue
+            project = project or ""
+            task_key = (task_id or "", title or "")
+            task_code = task_index.get(task_key)
+            if task_code is None:
+                task_code = task_index[task_key] = len(tasks)
+                tasks.append((task_key[0], task_key[1], project))
+            project_code = project_index.setdefault(project, len(project_index))
+            starts.append(start)
+            ends.append(end)
+            task_codes.append(task_code)
+            project_codes.append(project_code)
+
+        return cls(
+            np.array(starts, dtype=np.int64),
+            np.array(ends, dtype=np.int64),
+            np.array(task_codes, dtype=np.intp),
+            np.array(project_codes, dtype=np.intp),
+            tasks,
+            list(project_index),
+        )
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def cumulative(self, moments: np.ndarray) -> np.ndarray:
+        """F(t)：每个时刻之前的专注总毫秒数（支持任意形状的数组）"""
+        moments = np.asarray(moments, dtype=np.int64)
+        started = np.searchsorted(self._sorted_starts, moments, side="right")
+        ended = np.searchsorted(self._sorted_ends, moments, side="right")
+        return (started * moments - self._start_prefix[started]) - (ended * moments - self._end_prefix[ended])
+
+    def bucketize(self, edges: np.ndarray) -> np.ndarray:
+        """按最后一维相邻边界划分的桶内专注毫秒数"""
+        return np.diff(self.cumulative(edges), axis=-1)
+
+    def clipped(self, lower: int, upper: int) -> np.ndarray:
+        """每个片段落在 [lower, upper) 内的毫秒数"""
+        return np.clip(self.ends, lower, upper) - np.clip(self.starts, lower, upper)
+
+
+def heatmap(segments: FocusSegments, start: date, end: date, bucket_days: int = 1) -> List[Dict[str, Any]]:
+    """
+    按天（或每 bucket_days 天）汇总专注时长
+
+    Returns:
+        List[Dict]: [{"day": 桶的第一天 YYYYMMDD, "duration": 分钟}]，最后一个桶截止到 end
+    """
+    days = (end - start).days + 1
+    origin = day_start_ms(start)
+    offsets = np.append(np.arange(0, days, bucket_days), days)
+    durations = segments.bucketize(origin + offsets * DAY_MS)
+    return [
+        {"day": (start + timedelta(days=int(offset))).strftime("%Y%m%d"), "duration": duration}
+        for offset, duration in zip(offsets[:-1], _minutes(durations))
+    ]
+
+
+def clock_labels(bucket_minutes: int) -> List[str]:
+    """一天内各时段桶的开始时间 HH:MM"""
+    return [f"{minute // 60:02d}:{minute % 60:02d}" for minute in range(0, MINUTES_PER_DAY, bucket_minutes)]
+
+
+def clock_by_day(segments: FocusSegments, start: date, end: date, bucket_minutes: int = 60) -> np.ndarray:
+    """
+    按天、按一天内的时段汇总专注时长
+
+    Returns:
+        np.ndarray: 形状为 (天数, 每天的桶数) 的毫秒数矩阵
+    """
+    days = (end - start).days + 1
+    day_starts = day_start_ms(start) + np.arange(days, dtype=np.int64) * DAY_MS
+    offsets = np.arange(0, MINUTES_PER_DAY + bucket_minutes, bucket_minutes, dtype=np.int64) * MINUTE_MS
+    return segments.bucketize(day_starts[:, None] + offsets[None, :])
+
+
+def distribution(segments: FocusSegments, start: date, end: date) -> Dict[str, List[Dict[str, Any]]]:
+    """按任务和项目汇总日期范围内的专注时长，按时长降序排列"""
+    durations = segments.clipped(day_start_ms(start), day_start_ms(end + timedelta(days=1)))
+    by_task = np.bincount(segments.task_codes, weights=durations, minlength=len(segments.tasks))
+    by_project = np.bincount(segments.project_codes, weights=durations, minlength=len(segments.projects))
+
+    task_order = np.argsort(-by_task, kind="stable")
+    project_order = np.argsort(-by_project, kind="stable")
+    task_minutes = _minutes(by_task[task_order])
+    project_minutes = _minutes(by_project[project_order])
+    return {
+        "tasks": [
+            {"task_id": segments.tasks[code][0], "title": segments.tasks[code][1],
+             "project": segments.tasks[code][2], "duration": minutes}
+            for code, minutes in zip(task_order.tolist(), task_minutes) if minutes > 0
+        ],
+        "projects": [
+            {"project": segments.projects[code], "duration": minutes}
+            for code, minutes in zip(project_order.tolist(), project_minutes) if minutes > 0
+        ],
+    }
+
+
+def analyze(segments: FocusSegments, start: date, end: date, bucket_days: int = 1,
+            bucket_minutes: int = 60, max_cells: int = DEFAULT_MAX_CELLS) -> Dict[str, Any]:
+    """
+    计算日期范围内的全部专注统计
+
+    Args:
+        segments: 专注片段
+        start / end: 日期范围（含两端，中国时区）
+        bucket_days: 热力图每个桶的天数
+        bucket_minutes: 时段分布每个桶的分钟数，需能整除 1440
+        max_cells: clock_by_day 矩阵的单元格上限（天数 × 每天的桶数），避免单次响应过大
+
+    Raises:
+        ValueError: 参数不合法
+    """
+    if end < start:
+        raise ValueError("start_date 不能晚于 end_date")
+    if bucket_days < 1:
+        raise ValueError("bucket_days 必须大于 0")
+    if bucket_minutes < 1 or MINUTES_PER_DAY % bucket_minutes:
+        raise ValueError("bucket_minutes 必须能整除 1440（如 5、15、30、60、120）")
+    days = (end - start).days + 1
+    cells = days * (MINUTES_PER_DAY // bucket_minutes)
+    if cells > max_cells:
+        raise ValueError(f"日期范围过大：{days} 天 × 每天 {MINUTES_PER_DAY // bucket_minutes} 个时段 = {cells}，"
+                         f"超过上限 {max_cells}，请缩小日期范围或增大 bucket_minutes")
+
+    matrix = clock_by_day(segments, start, end, bucket_minutes)
+    days = [(start + timedelta(days=offset)).strftime("%Y%m%d") for offset in range(len(matrix))]
+    labels = clock_labels(bucket_minutes)
+    return {
+        "start_date": start.strftime("%Y%m%d"),
+        "end_date": end.strftime("%Y%m%d"),
+        "bucket_days": bucket_days,
+        "bucket_minutes": bucket_minutes,
+        "total_duration": _minutes(matrix.sum()),
+        "heatmap": heatmap(segments, start, end, bucket_days),
+        "clock": [
+            {"start": label, "duration": duration}
+            for label, duration in zip(labels, _minutes(matrix.sum(axis=0)))
+        ],
+        "clock_by_day": {
+            "buckets": labels,
+            "days": [{"day": day, "durations": row} for day, row in zip(days, _minutes(matrix))],
+        },
+        **distribution(segments, start, end),
+    }
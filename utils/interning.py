@@ -0,0 +1,35 @@
+"""值共享工具
+
+大量任务中 projectId、timeZone、kind、columnId、标签等字段只有少数几种取值，
+但 JSON 解析会为每个任务创建独立的字符串对象。ValuePool 把相等的值映射到同一个对象，
+重复的值只保存一份。
+
+与 sys.intern 不同，ValuePool 也可以共享整数和元组（如标签元组），
+并且生命周期由持有者决定（例如一次导出结束后整个池随之释放）。
+"""
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class ValuePool:
+    """把相等的可哈希值映射到同一个对象"""
+
+    __slots__ = ("_values",)
+
+    def __init__(self):
+        self._values: Dict[Hashable, Any] = {}
+
+    def __call__(self, value: Any) -> Any:
+        """返回与 value 相等的共享对象，None 原样返回"""
+        if value is None:
+            return None
+        return self._values.setdefault(value, value)
+
+    def tuple(self, values: Optional[Iterable[Any]]) -> Tuple[Any, ...]:
+        """共享元组及其中的每个元素，适用于标签列表"""
+        return self(tuple(self(value) for value in values or ()))
+
+    def clear(self) -> None:
+        self._values.clear()
+
+    def __len__(self) -> int:
+        return len(self._values)
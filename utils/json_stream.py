@@ -0,0 +1,174 @@
+"""流式 JSON 解析工具
+
+从字节流中增量解析 JSON，逐个产出指定路径下数组的元素，例如 /batch/check/0
+响应中的 syncTaskBean.update。数组元素逐个解析后即可丢弃，不需要把整个响应体
+读入内存再解析；路径以外的字段会完整解析并保存在 rest 中。
+"""
+import codecs
+import json
+from typing import Any, AsyncIterator, Dict, Sequence
+
+_WHITESPACE = ' \t\n\r'
+# 数字中可能出现的字符，数字后面只剩这些字符时无法确定数字已经结束
+_NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+
+class _TextBuffer:
+    """把字节流增量解码为文本，并维护当前解析位置"""
+
+    def __init__(self, chunks: AsyncIterator[bytes]):
+        self._chunks = chunks.__aiter__()
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._json = json.JSONDecoder()
+        self.text = ''
+        self.pos = 0
+        self.eof = False
+        self.bytes_read = 0
+
+    async def fill(self, min_size: int = 0) -> bool:
+        """
+        读取数据，直到未解析的部分至少有 min_size 个字符（至少读取一块），已读完时返回 False
+
+        多块数据先收集后一次拼接，避免每读一块就复制一次整个缓冲区。
+        """
+        if self.eof:
+            return False
+        parts = [self.text[self.pos:]]
+        size = len(parts[0])
+        while True:
+            try:
+                chunk = await self._chunks.__anext__()
+            except StopAsyncIteration:
+                self.eof = True
+                chunk = b''
+            self.bytes_read += len(chunk)
+            decoded = self._decoder.decode(chunk, final=self.eof)
+            parts.append(decoded)
+            size += len(decoded)
+            if self.eof or size >= min_size:
+                break
+        # 丢弃已解析的部分，缓冲区只保留尚未解析的数据
+        self.text = ''.join(parts)
+        self.pos = 0
+        return True
+
+    async def peek(self) -> str:
+        """跳过空白字符并返回下一个字符（不消费），数据结束时返回空字符串"""
+        while True:
+            while self.pos < len(self.text) and self.text[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not await self.fill():
+                return ''
+
+    async def next_char(self) -> str:
+        """跳过空白字符并消费下一个字符"""
+        char = await self.peek()
+        if not char:
+            raise ValueError("JSON 数据意外结束")
+        self.pos += 1
+        return char
+
+    async def expect(self, char: str) -> None:
+        found = await self.next_char()
+        if found != char:
+            raise ValueError(f"JSON 格式错误：期望 {char!r}，实际为 {found!r}")
+
+    async def value(self) -> Any:
+        """解析一个完整的 JSON 值"""
+        await self.peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self.text, self.pos)
+            except json.JSONDecodeError:
+                # 值超出了缓冲区：缓冲区至少扩大一倍后再重新解析，
+                # 大值的重复解析总量与其长度成线性关系
+                if not await self.fill(min_size=2 * (len(self.text) - self.pos)):
+                    raise
+                continue
+            # 数字可能被截断在缓冲区末尾（如 "1." 只解析出 1），需要读取更多数据确认
+            if not self.eof and (end == len(self.text) or (
+                    isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and _NUMBER_CHARS.issuperset(self.text[end:]))):
+                await self.fill()
+                continue
+            self.pos = end
+            return value
+
+
+class JsonArrayStream:
+    """
+    流式读取 JSON 中指定路径的数组元素
+
+    用法::
+
+        stream = JsonArrayStream(response.aiter_bytes(), ("syncTaskBean", "update"))
+        async for task in stream:
+            ...
+        stream.rest          # 路径以外的字段，例如 {"checkPoint": ..., "syncTaskBean": {"delete": [...]}}
+        stream.bytes_read    # 已读取的字节数
+    """
+
+    def __init__(self, chunks: AsyncIterator[bytes], path: Sequence[str]):
+        self._buffer = _TextBuffer(chunks)
+        self.path = tuple(path)
+        self.rest: Dict[str, Any] = {}
+        self.count = 0
+
+    @property
+    def bytes_read(self) -> int:
+        return self._buffer.bytes_read
+
+    def __aiter__(self) -> AsyncIterator[Any]:
+        return self._iterate()
+
+    async def _iterate(self) -> AsyncIterator[Any]:
+        async for item in self._walk_object(self.path, self.rest):
+            self.count += 1
+            yield item
+        # 读完剩余数据，保证 bytes_read 为完整的响应大小
+        while await self._buffer.fill():
+            pass
+
+    async def _walk_object(self, path: Sequence[str], rest: Dict[str, Any]) -> AsyncIterator[Any]:
+        buffer = self._buffer
+        # 响应体不是对象（例如上游返回了数组或错误文本）时报错，而不是当作没有数据
+        await buffer.expect('{')
+        if await buffer.peek() == '}':
+            buffer.pos += 1
+            return
+
+        while True:
+            key = await buffer.value()
+            await buffer.expect(':')
+            next_char = await buffer.peek()
+            if key == path[0] and len(path) == 1 and next_char == '[':
+                async for item in self._walk_array():
+                    yield item
+            elif key == path[0] and len(path) > 1 and next_char == '{':
+                async for item in self._walk_object(path[1:], rest.setdefault(key, {})):
+                    yield item
+            else:
+                rest[key] = await buffer.value()
+
+            separator = await buffer.next_char()
+            if separator == '}':
+                return
+            if separator != ',':
+                raise ValueError(f"JSON 格式错误：对象中出现 {separator!r}")
+
+    async def _walk_array(self) -> AsyncIterator[Any]:
+        buffer = self._buffer
+        await buffer.expect('[')
+        if await buffer.peek() == ']':
+            buffer.pos += 1
+            return
+
+        while True:
+            yield await buffer.value()
+            separator = await buffer.next_char()
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"JSON 格式错误：数组中出现 {separator!r}")
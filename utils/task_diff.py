@@ -0,0 +1,114 @@
+"""任务快照差异工具
+
+按任务ID和 etag 比较两次 /batch/check/0 的任务列表，计算新增、修改和删除的任务，
+耗时与任务数成线性关系。滴答清单在任务每次修改后都会更新 etag，
+因此 etag 相同的任务不需要逐字段比较。
+
+新快照可以逐个输入（例如流式解析时），不需要先把完整列表读入内存::
+
+    differ = TaskDiffer(previous_etags)
+    for task in tasks:
+        differ.observe(task['id'], task.get('etag'))
+    diff = differ.finish()
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+ADDED = "added"
+MODIFIED = "modified"
+UNCHANGED = "unchanged"
+DELETED = "deleted"
+
+
+@dataclass
+class TaskDiff:
+    """两次快照之间的任务变化（任务ID列表）"""
+    added: List[str] = field(default_factory=list)
+    modified: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+
+    def __len__(self) -> int:
+        return len(self.added) + len(self.modified) + len(self.deleted)
+
+    def counts(self) -> Dict[str, int]:
+        return {ADDED: len(self.added), MODIFIED: len(self.modified), DELETED: len(self.deleted)}
+
+    @classmethod
+    def merge(cls, diffs: Iterable["TaskDiff"]) -> "TaskDiff":
+        """
+        按时间顺序合并多次变化
+
+        新增后又修改仍为新增，新增后又删除则抵消，删除后又新增视为修改。
+        """
+        states: Dict[str, str] = {}
+        for diff in diffs:
+            for task_id in diff.added:
+                states[task_id] = MODIFIED if states.get(task_id) == DELETED else ADDED
+            for task_id in diff.modified:
+                if states.get(task_id) != ADDED:
+                    states[task_id] = MODIFIED
+            for task_id in diff.deleted:
+                if states.get(task_id) == ADDED:
+                    del states[task_id]
+                else:
+                    states[task_id] = DELETED
+
+        merged = cls()
+        for task_id, state in states.items():
+            getattr(merged, state).append(task_id)
+        return merged
+
+
+class TaskDiffer:
+    """把新快照中的任务逐个与旧快照比较"""
+
+    def __init__(self, previous: Mapping[str, Any], etag: Callable[[Any], Optional[str]] = lambda value: value):
+        """
+        Args:
+            previous: 旧快照，任务ID -> etag（或通过 etag 参数取得 etag 的对象）
+            etag: 从旧快照的值中取得 etag 的函数
+        """
+        self.previous = previous
+        self._etag = etag
+        self._seen: Set[str] = set()
+        self.diff = TaskDiff()
+
+    def observe(self, task_id: str, etag: Optional[str]) -> Optional[str]:
+        """
+        比较新快照中的一个任务
+
+        Returns:
+            ADDED / MODIFIED / UNCHANGED，同一任务重复出现时返回 None
+        """
+        if task_id in self._seen:
+            return None
+        self._seen.add(task_id)
+        if task_id not in self.previous:
+            self.diff.added.append(task_id)
+            return ADDED
+        old_etag = self._etag(self.previous[task_id])
+        # 缺少 etag 时无法判断，按修改处理
+        if old_etag is None or old_etag != etag:
+            self.diff.modified.append(task_id)
+            return MODIFIED
+        return UNCHANGED
+
+    def finish(self) -> TaskDiff:
+        """新快照输入完毕，旧快照中未出现的任务视为删除"""
+        self.diff.deleted = [task_id for task_id in self.previous if task_id not in self._seen]
+        return self.diff
+
+
+def diff_snapshots(previous: Mapping[str, Optional[str]],
+                   current: Iterable[Tuple[str, Optional[str]]]) -> TaskDiff:
+    """
+    比较两次快照
+
+    Args:
+        previous: 旧快照，任务ID -> etag
+        current: 新快照的 (任务ID, etag)
+    """
+    differ = TaskDiffer(previous)
+    for task_id, etag in current:
+        differ.observe(task_id, etag)
+    return differ.finish()
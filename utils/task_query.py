@@ -0,0 +1,171 @@
+"""任务查询工具
+
+在服务端按条件筛选 /batch/check/0 中的任务，并只保留指定字段（稀疏字段集），
+客户端只需要部分任务、部分字段时，响应体大小和解析耗时按比例减少。
+
+筛选条件之间为"与"关系，同一条件内逗号分隔的多个值为"或"关系：
+- project_ids: 项目ID
+- statuses: 任务状态（0=未完成，2=已完成，-1=已放弃）
+- tags: 标签（不区分大小写）
+- due_from / due_to: 截止时间窗口，没有截止时间的任务不匹配
+- priorities: 优先级（0=无，1=低，3=中，5=高）
+"""
+from datetime import datetime, time, timedelta, timezone
+from typing import Any, Dict, FrozenSet, Optional, Tuple
+
+# 滴答清单的时间格式，例如 2024-06-02T01:00:00.000+0000
+DIDA_TIME_FORMAT = "%Y-%m-%dT%H:%M:%S.%f%z"
+
+# 只有日期的查询参数按中国时区解析
+CHINA_TZ = timezone(timedelta(hours=8))
+
+# 不论 fields 是否包含，投影结果总是保留任务ID
+ALWAYS_INCLUDED_FIELDS = ("id",)
+
+
+def parse_dida_time(value: Optional[str]) -> Optional[datetime]:
+    """解析滴答清单的时间字符串，空值或格式错误时返回 None"""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, DIDA_TIME_FORMAT)
+    except ValueError:
+        return None
+
+
+def format_dida_time(value: datetime) -> str:
+    """格式化为滴答清单的时间字符串（UTC）"""
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000+0000")
+
+
+def parse_query_time(value: str, end_of_day: bool = False) -> datetime:
+    """
+    解析查询参数中的时间
+
+    支持 YYYYMMDD、YYYY-MM-DD（按中国时区的整天计算）和 ISO 8601 时间（未带时区时按中国时区）。
+
+    Args:
+        value: 时间字符串
+        end_of_day: 只有日期时是否取当天结束（用于窗口的结束边界）
+
+    Raises:
+        ValueError: 格式无法识别
+    """
+    value = value.strip()
+    for date_format in ("%Y%m%d", "%Y-%m-%d"):
+        try:
+            day = datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+        start = datetime.combine(day, time.min, tzinfo=CHINA_TZ)
+        return start + timedelta(days=1) - timedelta(microseconds=1) if end_of_day else start
+
+    parsed = datetime.fromisoformat(value)
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=CHINA_TZ)
+
+
+def _split(value: Optional[str]) -> Tuple[str, ...]:
+    """拆分逗号分隔的参数，忽略空项"""
+    if not value:
+        return ()
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _split_ints(value: Optional[str], name: str) -> Optional[FrozenSet[int]]:
+    items = _split(value)
+    if not items:
+        return None
+    try:
+        return frozenset(int(item) for item in items)
+    except ValueError:
+        raise ValueError(f"{name} 参数必须是逗号分隔的整数: {value}")
+
+
+class TaskQuery:
+    """任务筛选条件和字段投影"""
+
+    __slots__ = ("fields", "project_ids", "statuses", "tags", "priorities", "due_from", "due_to")
+
+    def __init__(self, fields: Optional[Tuple[str, ...]] = None,
+                 project_ids: Optional[FrozenSet[str]] = None,
+                 statuses: Optional[FrozenSet[int]] = None,
+                 tags: Optional[FrozenSet[str]] = None,
+                 priorities: Optional[FrozenSet[int]] = None,
+                 due_from: Optional[datetime] = None,
+                 due_to: Optional[datetime] = None):
+        self.fields = fields
+        self.project_ids = project_ids
+        self.statuses = statuses
+        self.tags = tags
+        self.priorities = priorities
+        self.due_from = due_from
+        self.due_to = due_to
+
+    @classmethod
+    def from_params(cls, fields: Optional[str] = None, project_id: Optional[str] = None,
+                    status: Optional[str] = None, tag: Optional[str] = None,
+                    priority: Optional[str] = None, due_from: Optional[str] = None,
+                    due_to: Optional[str] = None) -> "TaskQuery":
+        """
+        从逗号分隔的查询参数创建
+
+        Raises:
+            ValueError: 参数格式错误
+        """
+        field_names = _split(fields)
+        if field_names:
+            field_names = ALWAYS_INCLUDED_FIELDS + tuple(
+                name for name in dict.fromkeys(field_names) if name not in ALWAYS_INCLUDED_FIELDS
+            )
+
+        query = cls(
+            fields=field_names or None,
+            project_ids=frozenset(_split(project_id)) or None,
+            statuses=_split_ints(status, "status"),
+            tags=frozenset(item.casefold() for item in _split(tag)) or None,
+            priorities=_split_ints(priority, "priority"),
+            due_from=parse_query_time(due_from) if due_from else None,
+            due_to=parse_query_time(due_to, end_of_day=True) if due_to else None,
+        )
+        if query.due_from and query.due_to and query.due_from > query.due_to:
+            raise ValueError("due_from 不能晚于 due_to")
+        return query
+
+    @property
+    def has_filters(self) -> bool:
+        """是否包含筛选条件（不含字段投影）"""
+        return any(value is not None for value in (
+            self.project_ids, self.statuses, self.tags, self.priorities, self.due_from, self.due_to
+        ))
+
+    @property
+    def is_empty(self) -> bool:
+        """既没有筛选条件也没有字段投影"""
+        return self.fields is None and not self.has_filters
+
+    def matches(self, task: Dict[str, Any]) -> bool:
+        """判断原始任务字典是否满足全部筛选条件"""
+        if self.project_ids is not None and task.get('projectId') not in self.project_ids:
+            return False
+        if self.statuses is not None and task.get('status') not in self.statuses:
+            return False
+        if self.priorities is not None and task.get('priority', 0) not in self.priorities:
+            return False
+        if self.tags is not None:
+            if not any(tag.casefold() in self.tags for tag in task.get('tags') or ()):
+                return False
+        if self.due_from is not None or self.due_to is not None:
+            due = parse_dida_time(task.get('dueDate'))
+            if due is None:
+                return False
+            if self.due_from is not None and due < self.due_from:
+                return False
+            if self.due_to is not None and due > self.due_to:
+                return False
+        return True
+
+    def project(self, task: Dict[str, Any]) -> Dict[str, Any]:
+        """只保留 fields 中指定的字段，任务中不存在的字段会被省略"""
+        if self.fields is None:
+            return task
+        return {name: task[name] for name in self.fields if name in task}